@@ -0,0 +1,394 @@
+import threading
+import time
+
+import patterns
+import threats
+import zobrist
+
+COMPUTER_NAME = "Computer"
+DEFAULT_TIME_BUDGET = 0.2
+
+# Value of a window of five cells by the number of stones of one player, if the other
+# player has no stone in it. Windows with stones of both players are worth nothing.
+WINDOW_SCORES = [0, 1, 12, 150, 2000, 100000]
+WIN_SCORE = 10000000
+MAX_BRANCHING = 12
+# Number of likely moves of the other player answered while pondering
+PONDER_REPLIES = 4
+# Positions the threat search may visit before the alpha-beta search starts
+VCF_NODE_LIMIT = 1000
+
+# Clock of the time budgets and deadlines, in seconds
+clock = time.perf_counter
+
+_windows_cache = {}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def cell_windows(cols, rows):
+    """
+    Enumerates all windows of five cells in one line and maps each cell to the windows containing it.
+
+    :cols: Number of columns.
+    :rows: Number of rows.
+    :return: Bi-tuple of the number of windows and a column-major array of per-cell window index lists.
+    """
+    key = (cols, rows)
+    if key not in _windows_cache:
+        windows_of_cell = [[[] for _ in range(rows)] for _ in range(cols)]
+        count = 0
+        for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            for col in range(cols):
+                for row in range(rows):
+                    end_col, end_row = col + 4 * dc, row + 4 * dr
+                    if not (0 <= end_col < cols and 0 <= end_row < rows):
+                        continue
+                    for i in range(5):
+                        windows_of_cell[col + i * dc][row + i * dr].append(count)
+                    count += 1
+        _windows_cache[key] = (count, windows_of_cell)
+
+    return _windows_cache[key]
+
+
+class Position:
+    """
+    Search position that keeps the stone counts of every window of five cells and the
+    resulting score up to date as stones are placed and taken back.
+    The score is positive if the position is better for player A.
+    """
+
+    def __init__(self, grid):
+        """
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+            The grid is copied, the search does not modify it.
+        """
+        self.cols, self.rows = len(grid), len(grid[0])
+        window_count, self.windows_of_cell = cell_windows(self.cols, self.rows)
+        self.grid = [[None] * self.rows for _ in range(self.cols)]
+        self.count_a = [0] * window_count
+        self.count_b = [0] * window_count
+        self.score = 0
+        self.stones = []
+        self.keys_a, self.keys_b = zobrist.zobrist_keys(self.cols, self.rows)
+        self.key = 0
+        for col in range(self.cols):
+            for row in range(self.rows):
+                if grid[col][row] is not None:
+                    self.place(col, row, grid[col][row])
+
+    def move_value(self, col, row, is_player_a):
+        """
+        :return: Score gain for the player from placing a stone on the empty cell (col, row).
+        """
+        own, other = (self.count_a, self.count_b) if is_player_a else (self.count_b, self.count_a)
+        value = 0
+        for window in self.windows_of_cell[col][row]:
+            if other[window] == 0:
+                value += WINDOW_SCORES[own[window] + 1] - WINDOW_SCORES[own[window]]
+            elif own[window] == 0:
+                value += WINDOW_SCORES[other[window]]
+        return value
+
+    def place(self, col, row, is_player_a):
+        """
+        Places a stone and updates the window counts and the score.
+
+        :return: True if the stone completed five in a row.
+        """
+        own, other = (self.count_a, self.count_b) if is_player_a else (self.count_b, self.count_a)
+        value = 0
+        won = False
+        for window in self.windows_of_cell[col][row]:
+            count = own[window]
+            own[window] = count + 1
+            if other[window] == 0:
+                value += WINDOW_SCORES[count + 1] - WINDOW_SCORES[count]
+                if count == 4:
+                    won = True
+            elif count == 0:
+                value += WINDOW_SCORES[other[window]]
+
+        self.grid[col][row] = is_player_a
+        self.key ^= self.keys_a[col][row] if is_player_a else self.keys_b[col][row]
+        self.score += value if is_player_a else -value
+        self.stones.append((col, row, value if is_player_a else -value))
+        return won
+
+    def undo(self):
+        """
+        Takes back the stone placed last.
+        """
+        col, row, value = self.stones.pop()
+        if self.grid[col][row]:
+            own = self.count_a
+            self.key ^= self.keys_a[col][row]
+        else:
+            own = self.count_b
+            self.key ^= self.keys_b[col][row]
+        for window in self.windows_of_cell[col][row]:
+            own[window] -= 1
+        self.grid[col][row] = None
+        self.score -= value
+
+    def candidates(self):
+        """
+        :return: Empty cells within patterns.NEIGHBORHOOD cells of a placed stone, see patterns.candidates.
+        """
+        return patterns.candidates(self.grid)
+
+    def ordered_moves(self, is_player_a):
+        """
+        :return: The most promising candidate moves, ordered by their value for attack and defense.
+        """
+        scored = [(self.move_value(col, row, is_player_a) + self.move_value(col, row, not is_player_a), (col, row))
+                  for col, row in self.candidates()]
+        scored.sort(reverse=True)
+        return [move for _, move in scored[:MAX_BRANCHING]]
+
+
+class Search:
+    """
+    Iterative-deepening alpha-beta (negamax) search with a wall-clock deadline.
+    Results are stored in a transposition table, so positions reached by different
+    move orders and in later iterations are not searched again.
+    """
+
+    def __init__(self, position, deadline, table=None, cancel=None):
+        """
+        :position: The Position to search.
+        :deadline: clock() value at which the search stops with SearchTimeout.
+        :table: Optional zobrist.TranspositionTable, a new one by default.
+        :cancel: Optional threading.Event that stops the search with SearchTimeout when set.
+        """
+        self.position = position
+        self.deadline = deadline
+        self.table = table if table is not None else zobrist.TranspositionTable()
+        self.cancel = cancel
+        self.nodes = 0
+
+    def negamax(self, depth, alpha, beta, is_player_a):
+        self.nodes += 1
+        if self.nodes & 7 == 0 and (clock() > self.deadline
+                                    or (self.cancel is not None and self.cancel.is_set())):
+            raise SearchTimeout()
+
+        position = self.position
+        if depth == 0:
+            return position.score if is_player_a else -position.score
+
+        entry = self.table.probe(position.key)
+        hash_move = None
+        if entry is not None:
+            _, entry_depth, score, bound, hash_move = entry
+            if entry_depth >= depth:
+                if bound == zobrist.EXACT:
+                    return score
+                if bound == zobrist.LOWER and score >= beta:
+                    return score
+                if bound == zobrist.UPPER and score <= alpha:
+                    return score
+
+        moves = position.ordered_moves(is_player_a)
+        if len(moves) == 0:
+            return 0
+        if hash_move is not None:
+            if hash_move in moves:
+                moves.remove(hash_move)
+            moves.insert(0, hash_move)
+
+        original_alpha = alpha
+        best = -WIN_SCORE * 2
+        best_move = None
+        for col, row in moves:
+            if position.place(col, row, is_player_a):
+                value = WIN_SCORE + depth
+            else:
+                value = -self.negamax(depth - 1, -beta, -alpha, not is_player_a)
+            position.undo()
+
+            if value > best:
+                best = value
+                best_move = (col, row)
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best <= original_alpha:
+            bound = zobrist.UPPER
+        elif best >= beta:
+            bound = zobrist.LOWER
+        else:
+            bound = zobrist.EXACT
+        self.table.store(position.key, depth, best, bound, best_move)
+        return best
+
+    def search_root(self, moves, depth, is_player_a):
+        """
+        :return: Bi-tuple of the best move and its value, searched to the given depth.
+        """
+        position = self.position
+        alpha, beta = -WIN_SCORE * 2, WIN_SCORE * 2
+        best_move = moves[0]
+        for col, row in moves:
+            if position.place(col, row, is_player_a):
+                value = WIN_SCORE + depth
+            else:
+                value = -self.negamax(depth - 1, -beta, -alpha, not is_player_a)
+            position.undo()
+
+            if value > alpha:
+                alpha = value
+                best_move = (col, row)
+
+        return best_move, alpha
+
+
+def choose_move(grid, is_player_a, time_budget=DEFAULT_TIME_BUDGET, max_depth=10, table=None,
+                vcf_nodes=VCF_NODE_LIMIT):
+    """
+    Chooses a move for the player with iterative-deepening alpha-beta search. Only cells
+    near existing stones are considered and the search stops when the time budget is used up.
+    A forced win by continuous fours is played without search.
+
+    :grid: The grid as two-dimensional array of columns and per-column row values.
+    :is_player_a: Boolean that is true if the computer plays player A.
+    :time_budget: Wall-clock seconds the search may take.
+    :max_depth: Maximum search depth in plies.
+    :table: Optional zobrist.TranspositionTable to reuse results between moves of a game.
+    :vcf_nodes: Node limit of the threat search, 0 to skip it.
+    :return: Bi-tuple (col_index, row_index) of the chosen empty cell.
+    """
+    start = clock()
+    if vcf_nodes > 0:
+        line = threats.find_forced_win(grid, is_player_a, vcf_nodes)
+        if line is not None:
+            return line[0]
+
+    # keep a safety margin for the last nodes and returning the move
+    search = Search(Position(grid), start + time_budget * 0.9, table)
+    moves = search.position.ordered_moves(is_player_a)
+    best_move = moves[0]
+
+    for depth in range(1, max_depth + 1):
+        try:
+            move, value = search.search_root(moves, depth, is_player_a)
+        except SearchTimeout:
+            break
+
+        best_move = move
+        if abs(value) >= WIN_SCORE:
+            break
+        # the next depth takes several times longer, don't start it without enough time left
+        if clock() - start > time_budget / 3:
+            break
+
+        moves.remove(move)
+        moves.insert(0, move)
+
+    return best_move
+
+
+class Ponderer:
+    """
+    Searches in a background thread while the other player thinks: the most likely moves of
+    the other player are answered with deepening searches in turn, until the thread is stopped.
+    When the other player made one of these moves, its answer is taken without a new search.
+    The searches fill the transposition table, which the next search reuses for other moves.
+    """
+
+    def __init__(self, table, max_depth=10, replies=PONDER_REPLIES):
+        """
+        :table: zobrist.TranspositionTable shared with the searches of the game. It is only
+            used by the background thread between start() and stop().
+        :max_depth: Maximum search depth in plies.
+        :replies: Number of moves of the other player to answer.
+        """
+        self.table = table
+        self.max_depth = max_depth
+        self.replies = replies
+        self.thread = None
+        self.cancel = None
+        # position key -> tri-tuple (move, seconds searched, whether the search is finished)
+        self.results = {}
+        # set when a result was stored, and when all replies were searched to max_depth
+        self.updated = threading.Event()
+        self.done = threading.Event()
+
+    def start(self, grid, is_player_a):
+        """
+        Starts pondering, stops pondering on a previous position first.
+
+        :grid: The grid after the move of the computer. The grid is copied.
+        :is_player_a: Boolean that is true if player A is at turn, i.e. the other player.
+        """
+        self.stop()
+        self.results = {}
+        self.updated, self.done = threading.Event(), threading.Event()
+        self.cancel = threading.Event()
+        grid = [list(column) for column in grid]
+        self.thread = threading.Thread(target=self.__run, args=(grid, is_player_a, self.cancel), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Cancels the search and waits for the background thread to end.
+        """
+        if self.thread is not None:
+            self.cancel.set()
+            self.thread.join()
+            self.thread = None
+
+    def take(self, grid, time_budget=DEFAULT_TIME_BUDGET, key=None):
+        """
+        Stops pondering and returns the answer to the current position, if it was searched at
+        least as long as a regular search would take.
+
+        :grid: The grid after the move of the other player.
+        :time_budget: Wall-clock seconds of a regular search.
+        :key: Zobrist key of the grid if known, e.g. gomoku.GameState.key, saves hashing the grid.
+        :return: Bi-tuple (col_index, row_index) or None if the position wasn't searched long enough.
+        """
+        self.stop()
+        result = self.results.get(key if key is not None else zobrist.grid_key(grid))
+        if result is None:
+            return None
+        move, seconds, is_finished = result
+        return move if is_finished or seconds >= time_budget else None
+
+    def __run(self, grid, is_player_a, cancel):
+        position = Position(grid)
+        searches = []
+        for col, row in position.ordered_moves(is_player_a)[:self.replies]:
+            if position.place(col, row, is_player_a):
+                # the other player wins, there's nothing to answer
+                position.undo()
+                continue
+            reply = Position(position.grid)
+            position.undo()
+            moves = reply.ordered_moves(not is_player_a)
+            if len(moves) > 0:
+                searches.append([Search(reply, float("inf"), self.table, cancel), moves, 0.0])
+
+        for depth in range(1, self.max_depth + 1):
+            for entry in searches:
+                search, moves, seconds = entry
+                key = search.position.key
+                if key in self.results and self.results[key][2]:
+                    continue
+
+                start = clock()
+                try:
+                    move, value = search.search_root(moves, depth, not is_player_a)
+                except SearchTimeout:
+                    return
+                entry[2] = seconds + clock() - start
+                self.results[key] = (move, entry[2], abs(value) >= WIN_SCORE or depth == self.max_depth)
+                self.updated.set()
+                moves.remove(move)
+                moves.insert(0, move)
+        self.done.set()
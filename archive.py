@@ -0,0 +1,226 @@
+import mmap
+import os
+import random
+import struct
+import sys
+
+import records
+
+INDEX_SUFFIX = ".idx"
+
+_OFFSET = struct.Struct("<Q")
+
+
+def index_path(path):
+    return path + INDEX_SUFFIX
+
+
+def _map(path):
+    """
+    Maps a file read-only into memory.
+
+    :return: The mmap or empty bytes for an empty or missing file, which can't be mapped.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return b""
+
+
+def _close(buffer):
+    if isinstance(buffer, mmap.mmap):
+        buffer.close()
+
+
+def update_index(path):
+    """
+    Brings the offset index of a game file up to date. The index holds the offset of every game
+    as 8-byte integer, so game #N is found without reading the games before it. Games appended
+    since the last update, e.g. by simulate, are added to the index. The index is rebuilt when it
+    doesn't match the game file anymore. Games are expected to be appended by one process at a time.
+
+    :path: Path of the game file.
+    :return: Number of indexed games. A game cut off at the end of the file is not indexed.
+        0 for a missing game file, no index is written for it.
+    """
+    if not os.path.exists(path):
+        return 0
+    data = _map(path)
+    try:
+        try:
+            index_size = os.path.getsize(index_path(path))
+        except OSError:
+            index_size = 0
+        count = index_size // _OFFSET.size
+
+        position = 0
+        if count > 0:
+            with open(index_path(path), "rb") as f:
+                f.seek((count - 1) * _OFFSET.size)
+                last_offset = _OFFSET.unpack(f.read(_OFFSET.size))[0]
+            try:
+                _, position = records.decode_game(data, last_offset)
+            except ValueError:
+                # the game file was replaced or truncated
+                count, position = 0, 0
+
+        offsets = []
+        while position < len(data):
+            try:
+                _, end = records.decode_game(data, position)
+            except ValueError:
+                break
+            offsets.append(position)
+            position = end
+    finally:
+        _close(data)
+
+    with open(index_path(path), "r+b" if os.path.exists(index_path(path)) else "wb") as f:
+        f.truncate(count * _OFFSET.size)
+        f.seek(count * _OFFSET.size)
+        f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+    return count + len(offsets)
+
+
+def append_games(game_records, path):
+    """
+    Appends games to a game file and its index.
+
+    :game_records: List of records.GameRecords.
+    :path: Path of the game file.
+    :return: Number of games in the file.
+    """
+    records.write_games(game_records, path)
+    return update_index(path)
+
+
+def _boards(record, move_counts):
+    """
+    Replays a game once and yields a copy of the grid whenever a selected number of moves is reached.
+
+    :record: The records.GameRecord.
+    :move_counts: Sorted list of numbers of moves.
+    :return: Generator of bi-tuples (move count, grid).
+    """
+    grid = [[None] * record.rows for _ in range(record.cols)]
+    placed = []
+    targets = iter(move_counts)
+    target = next(targets, None)
+    for count in range(len(record.moves) + 1):
+        while target == count:
+            yield count, [list(col) for col in grid]
+            target = next(targets, None)
+        if target is None or count == len(record.moves):
+            return
+        records.apply_move(grid, placed, record.moves[count])
+
+
+class GameArchive:
+    """
+    Game file opened as memory map together with its offset index, so any game is located in
+    constant time and decoded straight from the mapped file, without reading the games before it.
+    Games appended after opening are visible after reopening the archive.
+    """
+
+    def __init__(self, path):
+        """
+        :path: Path of the game file. Its index is updated first. A missing game file is an empty archive.
+        """
+        self.path = path
+        if update_index(path) > 0:
+            self.data = _map(path)
+            self.index = _map(index_path(path))
+        else:
+            self.data, self.index = b"", b""
+
+    def close(self):
+        _close(self.data)
+        _close(self.index)
+        self.data, self.index = b"", b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.index) // _OFFSET.size
+
+    def offset(self, number):
+        """
+        :number: Number of the game, starting at 0. Negative numbers count from the end.
+        :return: Offset of the game in the game file.
+        """
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("game number out of range")
+        return _OFFSET.unpack_from(self.index, number * _OFFSET.size)[0]
+
+    def __getitem__(self, number):
+        """
+        :number: Number of the game, starting at 0. Negative numbers count from the end.
+        :return: The records.GameRecord.
+        """
+        record, _ = records.decode_game(self.data, self.offset(number))
+        return record
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+    def board(self, number, move_count=None):
+        """
+        :number: Number of the game.
+        :move_count: Number of moves to replay, all moves by default.
+        :return: The grid of the game after the moves.
+        """
+        return records.replay(self[number], move_count)
+
+    def boards(self, move_counts, numbers=None):
+        """
+        Yields the grids of many games at selected numbers of moves, replaying every game only once.
+
+        :move_counts: Numbers of moves, e.g. [10, 20, 30]. Games with fewer moves yield only the
+            grids they reach.
+        :numbers: Numbers of the games, all games by default.
+        :return: Generator of tri-tuples (game number, move count, grid).
+        """
+        move_counts = sorted(set(move_counts))
+        for number in range(len(self)) if numbers is None else numbers:
+            for move_count, grid in _boards(self[number], move_counts):
+                yield number, move_count, grid
+
+    def sample(self, count, seed=None):
+        """
+        :count: Number of games, at most the number of games of the archive.
+        :seed: Optional seed of the random choice.
+        :return: List of bi-tuples (game number, records.GameRecord) of randomly chosen games.
+        """
+        numbers = random.Random(seed).sample(range(len(self)), count)
+        return [(number, self[number]) for number in numbers]
+
+
+def main(argv=None):
+    """
+    Shows the grid of a game of a game file: python archive.py FILE GAME [MOVES]
+    """
+    import ui
+
+    argv = sys.argv[1:] if argv is None else argv
+    with GameArchive(argv[0]) as archive:
+        number = int(argv[1])
+        record = archive[number]
+        move_count = int(argv[2]) if len(argv) > 2 else None
+        ui.display_grid(records.replay(record, move_count))
+        print(f"game {number} of {len(archive)}: {record.name_a} vs. {record.name_b}, "
+              f"{len(record.moves) if move_count is None else min(move_count, len(record.moves))} "
+              f"of {len(record.moves)} moves")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+
+import gomoku
+
+STONE_A = 1
+STONE_B = -1
+EMPTY = 0
+
+
+def grids_to_array(grids):
+    """
+    Stacks grids of the same size into one array for evaluate_boards.
+
+    :grids: List of grids as two-dimensional arrays of columns and per-column row values.
+        None indicates empty fields, True coins of player A and False coins of player B.
+    :return: int8 array of shape (N, cols, rows) with 1 for player A, -1 for player B and 0 for empty fields.
+    """
+    codes = {None: EMPTY, True: STONE_A, False: STONE_B}
+    return np.array([[[codes[value] for value in column] for column in grid] for grid in grids], dtype=np.int8)
+
+
+def __has_five(stones):
+    """
+    Evaluates per board whether the stones contain five in one line, by ANDing five shifted
+    windows of the boards in each of the four directions.
+
+    :stones: bool array of shape (N, cols, rows).
+    :return: bool array of shape (N,).
+    """
+    n, cols, rows = stones.shape
+    found = np.zeros(n, dtype=bool)
+    if cols >= 5:
+        window = stones[:, 0:cols - 4, :].copy()
+        for i in range(1, 5):
+            window &= stones[:, i:cols - 4 + i, :]
+        found |= window.any(axis=(1, 2))
+    if rows >= 5:
+        window = stones[:, :, 0:rows - 4].copy()
+        for i in range(1, 5):
+            window &= stones[:, :, i:rows - 4 + i]
+        found |= window.any(axis=(1, 2))
+    if cols >= 5 and rows >= 5:
+        # diagonal up-right
+        window = stones[:, 0:cols - 4, 0:rows - 4].copy()
+        for i in range(1, 5):
+            window &= stones[:, i:cols - 4 + i, i:rows - 4 + i]
+        found |= window.any(axis=(1, 2))
+        # diagonal down-right
+        window = stones[:, 0:cols - 4, 4:rows].copy()
+        for i in range(1, 5):
+            window &= stones[:, i:cols - 4 + i, 4 - i:rows - i]
+        found |= window.any(axis=(1, 2))
+
+    return found
+
+
+def evaluate_boards(boards, chunk_size=65536):
+    """
+    Evaluates win and draw status of many boards at once.
+
+    :boards: int8 array of shape (N, cols, rows) in the column-major layout of ui.display_grid,
+        with 1 for player A, -1 for player B and 0 for empty fields (see grids_to_array).
+    :chunk_size: Number of boards evaluated per step, bounds the memory of temporary arrays.
+    :return: Tri-tuple of bool arrays of shape (N,): whether player A has five in a row,
+        whether player B has five in a row and whether the board is full without a winner.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    n = boards.shape[0]
+    wins_a = np.zeros(n, dtype=bool)
+    wins_b = np.zeros(n, dtype=bool)
+    draws = np.zeros(n, dtype=bool)
+
+    for start in range(0, n, chunk_size):
+        chunk = boards[start:start + chunk_size]
+        end = start + len(chunk)
+        wins_a[start:end] = __has_five(chunk == STONE_A)
+        wins_b[start:end] = __has_five(chunk == STONE_B)
+        is_full = (chunk != EMPTY).all(axis=(1, 2))
+        draws[start:end] = is_full & ~wins_a[start:end] & ~wins_b[start:end]
+
+    return wins_a, wins_b, draws
+
+
+def random_boards(n, cols, rows, fill=0.5, seed=0):
+    """
+    Generates random positions for benchmarks.
+
+    :n: Number of boards.
+    :cols: Number of columns.
+    :rows: Number of rows.
+    :fill: Probability of a field to be occupied.
+    :seed: Seed of the random number generator.
+    :return: int8 array of shape (n, cols, rows).
+    """
+    rng = np.random.default_rng(seed)
+    occupied = rng.random((n, cols, rows)) < fill
+    colors = np.where(rng.random((n, cols, rows)) < 0.5, STONE_A, STONE_B)
+    return np.where(occupied, colors, EMPTY).astype(np.int8)
+
+
+def benchmark(n=20000, sizes=((10, 10), (15, 15), (20, 20))):
+    """
+    Compares evaluate_boards with gomoku.is_game_won and prints boards per second.
+
+    :n: Number of boards per board size.
+    :sizes: Board sizes as bi-tuples (cols, rows).
+    """
+    for cols, rows in sizes:
+        boards = random_boards(n, cols, rows, fill=0.3)
+        grids = [[[None if value == EMPTY else value == STONE_A for value in column] for column in board]
+                 for board in boards.tolist()]
+
+        start = time.perf_counter()
+        wins_a, wins_b, _ = evaluate_boards(boards)
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [gomoku.is_game_won(grid) for grid in grids]
+        pure_python = time.perf_counter() - start
+
+        assert list(wins_a | wins_b) == expected
+        print(f'{cols}x{rows}: evaluate_boards {n / vectorized:,.0f} boards/s, '
+              f'is_game_won {n / pure_python:,.0f} boards/s ({pure_python / vectorized:.0f}x)')
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,261 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import broadcast
+import gomoku
+import scorelog
+import ui
+
+SIZES = (10, 15, 20)
+SCOREBOARD_SIZES = (10, 1000, 100000)
+VIEWER_COUNTS = (10, 100, 1000)
+MIN_SECONDS = 0.2
+REPEAT = 5
+
+
+def measure(function, min_seconds=None, repeat=REPEAT):
+    """
+    Times a function like timeit: the number of calls per run is doubled until a run takes
+    min_seconds, then the runs are repeated and the fastest one counts.
+
+    :function: Function without parameters.
+    :min_seconds: Minimum seconds of a run, MIN_SECONDS by default.
+    :repeat: Number of runs.
+    :return: Dictionary with the seconds per call of the fastest and the mean run, the calls
+        per second of the fastest run, the calls per run and the number of runs.
+    """
+    min_seconds = MIN_SECONDS if min_seconds is None else min_seconds
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        seconds = time.perf_counter() - start
+        if seconds >= min_seconds or number >= 1 << 20:
+            break
+        number *= 2
+
+    runs = [seconds]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        runs.append(time.perf_counter() - start)
+
+    best = min(runs) / number
+    return {
+        'seconds': best,
+        'mean_seconds': sum(runs) / len(runs) / number,
+        'calls_per_second': 1 / best if best > 0 else 0.0,
+        'number': number,
+        'repeat': len(runs),
+    }
+
+
+def random_grid(cols, rows, fill, seed=0):
+    """
+    :return: Grid with the given share of cells filled randomly with stones of both players.
+    """
+    generator = random.Random(seed)
+    return [[(generator.random() < 0.5) if generator.random() < fill else None for _ in range(rows)]
+            for _ in range(cols)]
+
+
+def draw_moves(n):
+    """
+    :return: List of inputs "row col" that fill an n x n grid without five in a row. Pairs of
+        rows alternate between starting with A and starting with B, and a cell is swapped with
+        the next one where the players would otherwise not alternate.
+    """
+    cells = [(row, col, (col % 2 == 1) == (((row - 1) // 2) % 2 == 0))
+             for row in range(1, n + 1) for col in range(1, n + 1)]
+    moves = []
+    for index in range(len(cells)):
+        if cells[index][2] != (index % 2 == 0):
+            cells[index], cells[index + 1] = cells[index + 1], cells[index]
+        moves.append(f"{cells[index][0]} {cells[index][1]}")
+    return moves
+
+
+@contextlib.contextmanager
+def scripted_input(lines):
+    """
+    Replaces STDIN by the given lines and discards all output.
+    """
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(''.join(line + '\n' for line in lines))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.stdin = stdin
+
+
+def bench_rules(results):
+    for size in SIZES:
+        for name, grid in [('empty', [[None] * size for _ in range(size)]),
+                           ('half', random_grid(size, size, 0.5)),
+                           ('full', [[(row // 2 + col) % 2 == 0 for row in range(size)] for col in range(size)])]:
+            results[f'is_game_won/{size}x{size}/{name}'] = measure(lambda: gomoku.is_game_won(grid))
+            results[f'is_grid_full/{size}x{size}/{name}'] = measure(lambda: gomoku.is_grid_full(grid))
+
+
+def bench_ui(results):
+    for size in SIZES:
+        grid = random_grid(size, size, 0.5)
+        def display():
+            with contextlib.redirect_stdout(io.StringIO()):
+                ui.display_grid(grid)
+        results[f'display_grid/{size}x{size}'] = measure(display)
+
+
+def bench_play_turn(results):
+    for size in SIZES:
+        grid = random_grid(size, size, 0.5)
+        # an invalid input, an occupied cell and a free cell
+        col, row = next((col, row) for col in range(size) for row in range(size) if grid[col][row] is None)
+        occupied = next((col, row) for col in range(size) for row in range(size) if grid[col][row] is not None)
+        lines = ['x', f'{size - occupied[1]} {occupied[0] + 1}', f'{size - row} {col + 1}']
+        def turn():
+            with scripted_input(lines):
+                gomoku.play_turn(grid, 'Player A', True, False)
+            grid[col][row] = None
+        results[f'play_turn/{size}x{size}'] = measure(turn)
+
+
+def bench_scoreboard(results, directory):
+    path = os.path.join(directory, 'scoreboard.dat')
+    for players in SCOREBOARD_SIZES:
+        scores = {f'player {index}': index % 97 + 1 for index in range(players)}
+        results[f'scoreboard_save/{players}'] = measure(lambda: scorelog.save(scores, path), repeat=3)
+        results[f'scoreboard_load/{players}'] = measure(lambda: scorelog.load(path), repeat=3)
+
+
+def bench_games(results):
+    for size in SIZES:
+        lines = [str(size), str(size), 'Player A', 'Player B'] + draw_moves(size) + ['']
+        def game():
+            with scripted_input(lines):
+                assert gomoku.play_game() is None
+        results[f'game/{size}x{size}/draw'] = measure(game, repeat=3)
+
+
+class NullWriter:
+    """
+    Connection of a spectator that takes every write at once.
+    """
+
+    def __init__(self):
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def write(self, data):
+        pass
+
+    def is_closing(self):
+        return False
+
+
+def bench_broadcast(results):
+    for viewers in VIEWER_COUNTS:
+        channel = broadcast.Channel(lambda: ('SNAPSHOT', 1, 15, 15, 'Ann', 'Bob', 0, '.' * 225))
+        for _ in range(viewers):
+            channel.subscribe(NullWriter())
+        results[f'broadcast_move/{viewers}'] = measure(lambda: channel.publish('MOVED', 'X', 8, 8))
+
+
+BENCHMARKS = {
+    'rules': bench_rules,
+    'ui': bench_ui,
+    'play_turn': bench_play_turn,
+    'scoreboard': bench_scoreboard,
+    'games': bench_games,
+    'broadcast': bench_broadcast,
+}
+
+
+def run(names=None):
+    """
+    Runs the benchmarks in a temporary directory, so no scoreboard or game file is touched.
+
+    :names: Names of the groups in BENCHMARKS to run, all by default.
+    :return: Dictionary with information about the environment and the results per benchmark.
+    """
+    results = {}
+    cwd = os.getcwd()
+    record_file = gomoku.GAME_RECORD_FILE
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        gomoku.GAME_RECORD_FILE = None
+        try:
+            for name in names or BENCHMARKS:
+                if name == 'scoreboard':
+                    bench_scoreboard(results, directory)
+                else:
+                    BENCHMARKS[name](results)
+        finally:
+            os.chdir(cwd)
+            gomoku.GAME_RECORD_FILE = record_file
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def compare(previous, current, threshold=0.1):
+    """
+    :previous: Output of an earlier run.
+    :current: Output of this run.
+    :threshold: Relative slowdown reported as regression.
+    :return: List of lines with the change of every benchmark found in both runs.
+    """
+    lines = []
+    for name, result in current['results'].items():
+        if name not in previous['results']:
+            continue
+        change = result['seconds'] / previous['results'][name]['seconds'] - 1
+        marker = '  REGRESSION' if change > threshold else ''
+        lines.append(f'{name}: {result["seconds"] * 1e6:,.1f} us ({change:+.1%}){marker}')
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Times the game primitives and full games and prints JSON results.')
+    parser.add_argument('groups', nargs='*', metavar='GROUP',
+                        help=f'benchmark groups to run, all by default: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--output', metavar='FILE', help='write the JSON results to a file instead of STDOUT')
+    parser.add_argument('--compare', metavar='FILE', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args(argv)
+    unknown = [group for group in args.groups if group not in BENCHMARKS]
+    if len(unknown) > 0:
+        parser.error(f'unknown benchmark groups: {", ".join(unknown)}')
+
+    report = run(args.groups)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            print('\n'.join(compare(json.load(f), report)), file=sys.stderr)
+    return report
+
+
+if __name__ == '__main__':
+    main()
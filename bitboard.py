@@ -0,0 +1,133 @@
+class BitBoard:
+    """
+    Compact board of a game stored as two integers, one bit mask per player.
+
+    Cell (col, row) is bit col * (rows + 1) + row, i.e. the columns are stored one after
+    another with one empty padding bit on top of each column. The padding bits are never
+    set, so lines shifted across a column border are interrupted and five in a row can be
+    detected with a few shifts and ANDs per direction.
+    """
+
+    __slots__ = ('cols', 'rows', 'stones_a', 'stones_b')
+
+    def __init__(self, cols, rows, stones_a=0, stones_b=0):
+        """
+        :cols: Number of columns.
+        :rows: Number of rows.
+        :stones_a: Bit mask of the stones of player A.
+        :stones_b: Bit mask of the stones of player B.
+        """
+        self.cols = cols
+        self.rows = rows
+        self.stones_a = stones_a
+        self.stones_b = stones_b
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Creates a bitboard from a grid.
+
+        :grid: The grid as two-dimensional array of columns and per-column row values,
+            from left to right and bottom to top. None indicates empty fields, True coins
+            of player A and False coins of player B.
+        :return: The new bitboard.
+        """
+        cols, rows = len(grid), len(grid[0])
+        stones_a = stones_b = 0
+        for col in range(cols):
+            offset = col * (rows + 1)
+            for row, value in enumerate(grid[col]):
+                if value is True:
+                    stones_a |= 1 << (offset + row)
+                elif value is False:
+                    stones_b |= 1 << (offset + row)
+
+        return cls(cols, rows, stones_a, stones_b)
+
+    def to_grid(self):
+        """
+        Creates a grid in the format used by play_turn and ui.display_grid.
+
+        :return: The grid as two-dimensional array of columns and per-column row values.
+        """
+        return [[self.get(col, row) for row in range(self.rows)] for col in range(self.cols)]
+
+    def bit(self, col, row):
+        """
+        :return: Bit mask with only the bit of cell (col, row) set.
+        """
+        return 1 << (col * (self.rows + 1) + row)
+
+    def get(self, col, row):
+        """
+        :return: True if player A has a stone on the cell, False if player B has one, else None.
+        """
+        bit = self.bit(col, row)
+        if self.stones_a & bit:
+            return True
+        if self.stones_b & bit:
+            return False
+        return None
+
+    def is_occupied(self, col, row):
+        return bool((self.stones_a | self.stones_b) & self.bit(col, row))
+
+    def place(self, col, row, is_player_a):
+        """
+        Places a stone on a cell. The cell is expected to be empty.
+
+        :col: Column index of the cell.
+        :row: Row index of the cell.
+        :is_player_a: Boolean that is true if the stone belongs to player A.
+        """
+        if is_player_a:
+            self.stones_a |= self.bit(col, row)
+        else:
+            self.stones_b |= self.bit(col, row)
+
+    def remove(self, col, row):
+        """
+        Removes the stone from a cell, if there is one.
+        """
+        mask = ~self.bit(col, row)
+        self.stones_a &= mask
+        self.stones_b &= mask
+
+    def is_full(self):
+        return (self.stones_a | self.stones_b).bit_count() == self.cols * self.rows
+
+    def has_five(self, is_player_a):
+        """
+        Evaluates whether a player has five stones in one line.
+
+        :is_player_a: Boolean that is true to check the stones of player A.
+        :return: True if the player has at least five stones next to each other in one line.
+        """
+        stones = self.stones_a if is_player_a else self.stones_b
+        height = self.rows + 1
+        # vertical, horizontal, diagonal up-right, diagonal down-right
+        for shift in (1, height, height + 1, height - 1):
+            pairs = stones & (stones >> shift)
+            fours = pairs & (pairs >> 2 * shift)
+            if fours & (stones >> 4 * shift):
+                return True
+
+        return False
+
+    def is_won(self):
+        return self.has_five(True) or self.has_five(False)
+
+    def copy(self):
+        return BitBoard(self.cols, self.rows, self.stones_a, self.stones_b)
+
+    def key(self):
+        """
+        :return: Hashable tuple identifying the position.
+        """
+        return (self.cols, self.rows, self.stones_a, self.stones_b)
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
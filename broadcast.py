@@ -0,0 +1,124 @@
+import collections
+
+# bytes waiting in the buffer of a connection before a viewer is skipped and later sent a snapshot
+HIGH_WATER = 64 * 1024
+# events a viewer may miss in a row before it is dropped
+DROP_AFTER = 256
+# events between the snapshots sent to all viewers
+SNAPSHOT_INTERVAL = 32
+
+
+def encode(words):
+    return (' '.join(str(word) for word in words) + '\n').encode('utf-8')
+
+
+class Subscriber:
+    """
+    Viewer of a channel.
+    """
+
+    __slots__ = ('writer', 'channel', 'missed')
+
+    def __init__(self, writer, channel):
+        self.writer = writer
+        self.channel = channel
+        # events missed since the viewer was last sent something
+        self.missed = 0
+
+    def is_subscribed(self):
+        return self.channel is not None
+
+
+class Channel:
+    """
+    Fans the events of a game out to its viewers. Every event is encoded once and the same bytes
+    are written to all viewers, without waiting for any of them, so a slow viewer never stalls
+    the game. A viewer whose connection has more than high_water bytes waiting is skipped, and
+    the events it missed are coalesced into one snapshot of the game as soon as its buffer
+    drained. A viewer that missed drop_after events in a row, e.g. one that stopped reading, is
+    dropped. Every snapshot_interval events all viewers get a snapshot, so clients can check
+    their state.
+    """
+
+    def __init__(self, snapshot, high_water=HIGH_WATER, drop_after=DROP_AFTER, snapshot_interval=SNAPSHOT_INTERVAL):
+        """
+        :snapshot: Function returning the words of a snapshot of the current state.
+        :high_water: Bytes waiting in the buffer of a viewer before it is skipped.
+        :drop_after: Events a viewer may miss in a row before it is dropped.
+        :snapshot_interval: Events between snapshots sent to all viewers.
+        """
+        self.snapshot = snapshot
+        self.high_water = high_water
+        self.drop_after = drop_after
+        self.snapshot_interval = snapshot_interval
+        self.subscribers = set()
+        self.events = 0
+        self.counts = collections.Counter()
+
+    def subscribe(self, writer):
+        """
+        Adds a viewer and sends it a snapshot.
+
+        :writer: asyncio.StreamWriter of the connection of the viewer.
+        :return: The Subscriber.
+        """
+        subscriber = Subscriber(writer, self)
+        self.subscribers.add(subscriber)
+        writer.write(encode(self.snapshot()))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.channel = None
+        self.subscribers.discard(subscriber)
+
+    def __drop(self, subscriber):
+        self.unsubscribe(subscriber)
+        subscriber.writer.close()
+        self.counts['dropped'] += 1
+
+    def publish(self, *words):
+        """
+        Sends an event to all viewers, the snapshot instead to viewers that missed events.
+        Called after the state changed, so the snapshot includes the event.
+        """
+        self.events += 1
+        line = encode(words)
+        snapshot = None
+        if self.events % self.snapshot_interval == 0:
+            snapshot = encode(self.snapshot())
+            line += snapshot
+
+        for subscriber in list(self.subscribers):
+            if subscriber.writer.is_closing():
+                self.unsubscribe(subscriber)
+                continue
+            if subscriber.writer.transport.get_write_buffer_size() > self.high_water:
+                subscriber.missed += 1
+                self.counts['coalesced'] += 1
+                if subscriber.missed >= self.drop_after:
+                    self.__drop(subscriber)
+            elif subscriber.missed > 0:
+                if snapshot is None:
+                    snapshot = encode(self.snapshot())
+                subscriber.writer.write(snapshot)
+                subscriber.missed = 0
+            else:
+                subscriber.writer.write(line)
+
+    def close(self, *words):
+        """
+        Sends the last event to all viewers, after a snapshot to viewers that missed events,
+        and removes them.
+        """
+        line = encode(words)
+        snapshot = None
+        for subscriber in list(self.subscribers):
+            if subscriber.writer.is_closing():
+                self.unsubscribe(subscriber)
+                continue
+            if subscriber.missed > 0:
+                if snapshot is None:
+                    snapshot = encode(self.snapshot())
+                subscriber.writer.write(snapshot)
+            subscriber.writer.write(line)
+            self.unsubscribe(subscriber)
@@ -1,8 +1,47 @@
+import os
 import ui
-import pickle
+import ai
+import zobrist
+import bitboard
+import scorelog
+import scoredb
+import records
+import opening
+import hints
+
+# Path of an SQLite scoreboard database to use instead of the scoreboard file
+SCOREBOARD_DATABASE = os.environ.get("GOMOKU_SCOREBOARD_DB")
+SCOREBOARD_PAGE_SIZE = 10
+# Path of a file the played games are appended to as game records
+GAME_RECORD_FILE = os.environ.get("GOMOKU_RECORD_FILE")
+# Path of an opening book the computer plays its first moves from, built with "python -m gomoku book"
+OPENING_BOOK_FILE = os.environ.get("GOMOKU_OPENING_BOOK")
+# "diff" redraws only the changed parts of the screen when running in a terminal
+RENDER_MODE = os.environ.get("GOMOKU_RENDER", "full")
+# Eingabe und Rückgabewert von menu() für das Spiel gegen den Computer
+MENU_COMPUTER_KEY = "c"
+MENU_COMPUTER = 6
+
+
+# Scoreboard kept in memory while main() runs
+scoreboard_service = None
+
+# Suggests moves when a player enters "?"
+hint_engine = hints.HintEngine()
 
 
 def main():
+    global scoreboard_service
+    ui.set_differential(RENDER_MODE == "diff")
+    scoreboard_service = scorelog.ScoreboardService()
+    try:
+        run_menu()
+    finally:
+        scoreboard_service.close()
+        scoreboard_service = None
+
+
+def run_menu():
     while True: 
         choice = menu()
         if choice == 1:
@@ -12,11 +51,16 @@ def main():
         elif choice == 3:
             play_game_with_remove()
         elif choice == 4:
-            scoreboard_data = load_scoreboard()
-            ui.display_headline("gomoku scoreboard")
-            ui.display_scoreboard(scoreboard_data)
-            ui.prompt("Please press ENTER to return to the menu")
-
+            if SCOREBOARD_DATABASE:
+                display_score_database()
+            else:
+                scoreboard_data = load_scoreboard()
+                ui.display_headline("gomoku scoreboard")
+                ui.display_scoreboard(scoreboard_data)
+                ui.prompt("Please press ENTER to return to the menu")
+
+        elif choice == MENU_COMPUTER:
+            play_game_against_computer()
         elif choice == 5:
             break
 
@@ -27,29 +71,28 @@ def menu():
 
     menu_titles = ["Play standard game", "Play game with adjustable size", "Play game with ajustable size and remove", "Scoreboard", "Exit"]
     ui.display_menu(menu_titles)  
+    # Das Spiel gegen den Computer ist kein nummerierter Punkt, damit die Nummern der anderen Punkte bleiben
+    ui.display_message(f"{MENU_COMPUTER_KEY}. Play against computer")
        
     choice = ""
-    while choice not in ["1", "2", "3", "4", "5"]:
-        choice = (ui.prompt("Please enter its number to select an item"))
+    while choice not in ["1", "2", "3", "4", "5", MENU_COMPUTER_KEY]:
+        choice = (ui.prompt("Please enter its number to select an item")).lower()
 
-    return int(choice)
+    return MENU_COMPUTER if choice == MENU_COMPUTER_KEY else int(choice)
 
 
 def save_scoreboard(scoreboard):
-    with open("scoreboard.dat", "wb") as f: 
-        pickle.dump(scoreboard, f)
+    scorelog.save(scoreboard)
     
     return None
 
 def load_scoreboard():
 
-    try: 
-        with open("scoreboard.dat", "rb") as f:
-            scoreboard = pickle.load(f)
-    
-    except:
-        return{}
-    
+    if scoreboard_service is not None:
+        scoreboard = scoreboard_service.scores()
+    else:
+        scoreboard = scorelog.load()
+
     scoreboard_filtered = {name: score for name, score in scoreboard.items() if score > 0}
 
 
@@ -59,6 +102,113 @@ def load_scoreboard():
 
 
 
+def open_score_database():
+    """
+    Opens the scoreboard database and imports the scoreboard file once.
+
+    :return: The scoredb.ScoreDatabase.
+    """
+    database = scoredb.ScoreDatabase(SCOREBOARD_DATABASE)
+    database.migrate(scorelog.SCOREBOARD_FILE)
+    return database
+
+def record_win(player_name):
+    if SCOREBOARD_DATABASE:
+        with open_score_database() as database:
+            database.add_result(player_name)
+    elif scoreboard_service is not None:
+        scoreboard_service.add_result(player_name)
+    else:
+        scorelog.append_result(player_name)
+
+def display_score_database():
+    """
+    Displays the scoreboard database page by page, loading only the players of one page.
+    """
+    with open_score_database() as database:
+        page_count = max(1, -(-database.count() // SCOREBOARD_PAGE_SIZE))
+        for page in range(page_count):
+            ui.display_headline("gomoku scoreboard")
+            first_rank = page * SCOREBOARD_PAGE_SIZE + 1
+            ui.display_ranking(database.top(SCOREBOARD_PAGE_SIZE, first_rank - 1), first_rank)
+
+            if page == page_count - 1:
+                ui.prompt("Please press ENTER to return to the menu")
+            elif ui.prompt("Please press ENTER to show the next page or enter q to return to the menu").strip() == "q":
+                break
+
+
+class GameState:
+    """
+    Wraps the grid of a running game and keeps track of the placed stones, so that
+    checking for a full grid is a counter comparison instead of a scan of all cells.
+    The Zobrist key of the position and a bitboard.BitBoard, which finds five in a row with a
+    few integer operations, are updated with every placed and removed stone.
+    """
+
+    def __init__(self, grid):
+        """
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+            Stones already on the grid are counted once.
+        """
+        self.grid = grid
+        self.cols, self.rows = len(grid), len(grid[0])
+        self.stone_count = sum(1 for column in grid for value in column if value is not None)
+        self.moves = []
+        self.keys = zobrist.zobrist_keys(self.cols, self.rows)
+        self.key = zobrist.grid_key(grid)
+        self.board = bitboard.BitBoard.from_grid(grid)
+
+    def place(self, col, row, is_player_a):
+        """
+        Places a stone on an empty cell.
+
+        :col: Column index of the cell.
+        :row: Row index of the cell.
+        :is_player_a: Boolean that is true if the stone belongs to player A.
+        """
+        self.grid[col][row] = is_player_a
+        self.record_move((col, row))
+
+    def record_move(self, move):
+        """
+        Registers a stone that was already placed on the grid, e.g. by play_turn.
+
+        :move: Bi-tuple (col_index, row_index) of the placed stone.
+        """
+        col, row = move
+        self.stone_count += 1
+        self.moves.append(move)
+        self.key ^= zobrist.stone_key(self.keys, col, row, self.grid[col][row])
+        self.board.place(col, row, self.grid[col][row])
+
+    def has_five(self, is_player_a):
+        """
+        :return: True if the player has five stones in one line.
+        """
+        return self.board.has_five(is_player_a)
+
+    def remove_last(self):
+        """
+        Removes the stone that was placed last.
+
+        :return: Bi-tuple (col_index, row_index) of the removed stone or None if no stone was placed.
+        """
+        if len(self.moves) == 0:
+            return None
+
+        col, row = self.moves.pop()
+        self.key ^= zobrist.stone_key(self.keys, col, row, self.grid[col][row])
+        self.board.remove(col, row)
+        self.grid[col][row] = None
+        self.stone_count -= 1
+        return (col, row)
+
+    def is_full(self):
+        return self.stone_count == self.cols * self.rows
+
+
+
 def is_grid_full(grid):
     for row in grid:
         for col in row:
@@ -67,36 +217,37 @@ def is_grid_full(grid):
     
     return True
 
+DIRECTIONS = [
+    (1, 0),  # horizontal
+    (0, 1),  # vertical
+    (1, 1),  # diagonal up-right
+    (1, -1)  # diagonal down-right
+]
+
 def is_game_won(grid):
     cols, rows = len(grid), len(grid[0])
-    directions = [
-        (1,0),  # horizontal
-        (0,1),  # vertical
-        (1,1),  # diagonal down-right
-        (1,-1)  # diagonal up-right
-    ]
     # check for winner
 
-    for r in range(rows):
-        for c in range(cols):
+    for c in range(cols):
+        for r in range(rows):
 
-            stone = grid[r][c]
+            stone = grid[c][r]
             if stone is None or stone == " ":
                 continue
             
             # jede Richtung prüfen
-            for dr, dc in directions:
+            for dc, dr in DIRECTIONS:
                 count = 1
 
                 # vier Steine weiter prüfen (5 in Reihe → gewonnen)
                 for i in range(1, 5):
-                    nr = r + dr * i
                     nc = c + dc * i
+                    nr = r + dr * i
 
-                    if not (0 <= nr < rows and 0 <= nc < cols):
+                    if not (0 <= nc < cols and 0 <= nr < rows):
                         break
 
-                    if grid[nr][nc] != stone:
+                    if grid[nc][nr] != stone:
                         break
 
                     count += 1
@@ -106,16 +257,155 @@ def is_game_won(grid):
 
     return False
 
+def is_winning_move(grid, move):
+    """
+    Evaluates whether the stone placed last completed five in a row. Only the four lines
+    through that stone are inspected, so the check takes constant time on any grid size.
+
+    :grid: The grid as two-dimensional array of columns and per-column row values.
+    :move: Bi-tuple (col_index, row_index) of the last placed stone as returned by play_turn.
+    :return: True if the stone is part of at least five stones of the same color in one line.
+    """
+    col, row = move
+    stone = grid[col][row]
+    if stone is None:
+        return False
+
+    cols, rows = len(grid), len(grid[0])
+    for dc, dr in DIRECTIONS:
+        count = 1
+
+        # in beide Richtungen der Linie zählen
+        for sign in (1, -1):
+            nc, nr = col + sign * dc, row + sign * dr
+            while 0 <= nc < cols and 0 <= nr < rows and grid[nc][nr] == stone:
+                count += 1
+                nc, nr = nc + sign * dc, nr + sign * dr
+
+        if count >= 5:
+            return True
+
+    return False
+
     
 
 
-def play_turn(grid, player_name, is_player_a, can_remove):
+# Status of a game
+RUNNING = "running"
+WON_BY_A = "won by A"
+WON_BY_B = "won by B"
+DRAW = "draw"
+
+class GameEngine:
+    """
+    Plays games by the rules of gomoku without any user interaction, so games can be run
+    programmatically at engine speed. Every instance holds its own game.
+    """
+
+    def __init__(self, cols=15, rows=15, allow_remove=False):
+        self.new_game(cols, rows, allow_remove)
+
+    def new_game(self, cols, rows, allow_remove):
+        """
+        Starts a new game on an empty grid, player A places the first stone.
+
+        :cols: Number of columns.
+        :rows: Number of rows.
+        :allow_remove: Boolean that is true if the stone placed last may be removed.
+        """
+        self.cols, self.rows = cols, rows
+        self.allow_remove = allow_remove
+        self.state = GameState([[None for _ in range(rows)] for _ in range(cols)])
+        self.grid = self.state.grid
+        self.is_player_a = True
+        self.result = RUNNING
+        # placed stones and None for removals, in the order they were played
+        self.history = []
+
+    def play(self, move):
+        """
+        Places a stone of the player whose turn it is.
+
+        :move: Bi-tuple (col_index, row_index) of an empty cell.
+        :return: The status of the game after the move.
+        """
+        col, row = move
+        if self.result != RUNNING:
+            raise ValueError("the game is over")
+        if not (0 <= col < self.cols and 0 <= row < self.rows) or self.grid[col][row] is not None:
+            raise ValueError(f"{move} is not an empty cell of the grid")
+
+        self.state.place(col, row, self.is_player_a)
+        self.history.append((col, row))
+        if self.state.has_five(self.is_player_a):
+            self.result = WON_BY_A if self.is_player_a else WON_BY_B
+        elif self.state.is_full():
+            self.result = DRAW
+        else:
+            self.is_player_a = not self.is_player_a
+
+        return self.result
+
+    def remove(self):
+        """
+        Removes the stone placed last and passes the turn to the other player. On an empty
+        grid nothing is removed and the same player stays at turn.
+
+        :return: Bi-tuple (col_index, row_index) of the removed stone or None.
+        """
+        if not self.allow_remove:
+            raise ValueError("the game is played without remove")
+        if self.result != RUNNING:
+            raise ValueError("the game is over")
+
+        move = self.state.remove_last()
+        if move is not None:
+            self.history.append(None)
+            self.is_player_a = not self.is_player_a
+        return move
+
+    def record(self, name_a, name_b, mode):
+        """
+        :name_a: Name of player A.
+        :name_b: Name of player B.
+        :mode: Game mode, one of the records.MODE_* constants.
+        :return: records.GameRecord of the game so far.
+        """
+        result = {RUNNING: records.RESULT_RUNNING, WON_BY_A: records.RESULT_WON_BY_A,
+                  WON_BY_B: records.RESULT_WON_BY_B, DRAW: records.RESULT_DRAW}[self.result]
+        return records.GameRecord(self.cols, self.rows, mode, result, name_a, name_b, list(self.history))
+
+    def status(self):
+        """
+        :return: RUNNING, WON_BY_A, WON_BY_B or DRAW.
+        """
+        return self.result
+
+    def legal_moves(self):
+        """
+        :return: List of the empty cells as bi-tuples (col_index, row_index), empty if the game is over.
+        """
+        if self.result != RUNNING:
+            return []
+        return [(col, row) for col in range(self.cols) for row in range(self.rows) if self.grid[col][row] is None]
+
+
+
+def ask_move(grid, player_name, is_player_a, can_remove, key=None):
+    """
+    Displays the turn start and the grid and asks the player for a valid move, without placing it.
+    The player may enter "?" to see suggested moves.
+
+    :key: Zobrist key of the grid if known, e.g. GameState.key, to look up the suggestions.
+
+    :return: Bi-tuple (col_index, row_index) of an empty cell or None if removal was requested.
+    """
     stone_color = "X" if is_player_a else "O"
     ui.display_turn_start(player_name, is_player_a)
     ui.display_grid(grid)
 
-    height = len(grid)
-    width = len(grid[0])
+    width = len(grid)
+    height = len(grid[0])
 
 
     while True:
@@ -124,6 +414,13 @@ def play_turn(grid, player_name, is_player_a, can_remove):
         #Check if removal is requested
         if can_remove and input.strip() == "-1":
             return None
+
+        # Zugvorschläge anzeigen
+        if input.strip() == "?":
+            suggestions = hint_engine.suggest(grid, is_player_a, key)
+            ui.display_hints([(height - row_index, col_index + 1, score)
+                              for (col_index, row_index), score in suggestions])
+            continue
         
         #make sure the input is two integers
         splitted = input.split()
@@ -144,7 +441,6 @@ def play_turn(grid, player_name, is_player_a, can_remove):
                 0 <= col_index < width and
                 grid[col_index][row_index] is None
             ):
-                grid[col_index][row_index] = True if is_player_a else False
                 return (col_index, row_index)
 
         
@@ -152,56 +448,71 @@ def play_turn(grid, player_name, is_player_a, can_remove):
             pass
 
 
-
-def play_standard_size_game():
-    # Input der Spielernamen
-    ui.display_headline("configure names")
-    name_a = ui.prompt("Please enter the name of player A")
-    while len(name_a.strip()) == 0:
-        name_a = ui.prompt("Please enter the name of player A")
-
-    name_b = ui.prompt("Please enter the name of player B")
-    while len(name_b.strip()) == 0 or name_b == name_a:
-        name_b = ui.prompt("Please enter the name of player B")
-
-    # 15x15 Grid
-    grid = [[None for _ in range(15)] for _ in range(15)]
-    is_player_a = True
-
-    while is_grid_full != True or is_game_won != True:
+def play_turn(grid, player_name, is_player_a, can_remove):
+    move = ask_move(grid, player_name, is_player_a, can_remove)
+    if move is not None:
+        col_index, row_index = move
+        grid[col_index][row_index] = True if is_player_a else False
+
+    return move
+
+
+
+def run_game(engine, name_a, name_b, mode, computer_move=None):
+    """
+    Lets the players take turns on a new game of the engine until a player won or the grid
+    is full and shows the result.
+
+    :engine: GameEngine with a new game.
+    :name_a: Name of player A, who places the first stone.
+    :name_b: Name of player B.
+    :mode: Game mode, one of the records.MODE_* constants, stored with the game record.
+    :computer_move: Optional function (grid, is_player_a, key) returning the move of player B,
+        who is then played by the computer. The key is the Zobrist key of the grid.
+    :return: Name of the winner or None on a draw.
+    """
+    while engine.status() == RUNNING:
+        is_player_a = engine.is_player_a
         player_name = name_a if is_player_a else name_b
 
+        if computer_move is not None and not is_player_a:
+            # Computer zieht
+            engine.play(computer_move(engine.grid, is_player_a, engine.state.key))
+        else:
+            # Turn ausführen (zeigt Grid, fragt nach Eingabe)
+            move = ask_move(engine.grid, player_name, is_player_a, engine.allow_remove, engine.state.key)
+            if move is None:
+                engine.remove()
+            else:
+                engine.play(move)
 
-        # Turn ausführen (zeigt Grid, fragt nach Eingabe)
-        play_turn(grid, player_name, is_player_a, can_remove=False)
+    if GAME_RECORD_FILE:
+        records.write_game(engine.record(name_a, name_b, mode), GAME_RECORD_FILE)
 
-        # Prüfen auf Sieg
-        if is_game_won(grid):
-            ui.display_headline("congratulations")
-            ui.display_message(f"{player_name} won the game!")
+    if engine.status() == DRAW:
+        ui.display_headline("oh no - a draw")
+        ui.display_message("Unfortunately, nobody won the game :(")
+        ui.prompt("Please press ENTER to return to the menu")
+        return None
 
-            # Scoreboard speichern
-            scoreboard = load_scoreboard()
-            scoreboard[player_name] = scoreboard.get(player_name, 0) + 1
-            save_scoreboard(scoreboard)
+    winner_name = name_a if engine.status() == WON_BY_A else name_b
+    ui.display_headline("congratulations")
+    ui.display_message(f"{winner_name} won the game!")
 
-            ui.prompt("Please press ENTER to return to the menu")
-            return player_name
+    # Scoreboard speichern
+    record_win(winner_name)
 
-        # Prüfen auf Draw
-        if is_grid_full(grid):
-            ui.display_headline("oh no - a draw")
-            ui.display_message("Unfortunately, nobody won the game :(")
-            ui.prompt("Please press ENTER to return to the menu")
-            return None
-
-        # Spieler wechseln
-        is_player_a = not is_player_a
+    ui.prompt("Please press ENTER to return to the menu")
+    return winner_name
 
 
 
-def play_game():
+def ask_grid_size():
+    """
+    Asks for the number of columns and rows of the next game.
 
+    :return: Bi-tuple (columns, rows).
+    """
     ui.display_headline("configure grid")
 
     # Spalten abfragen
@@ -216,6 +527,11 @@ def play_game():
         if 10 <= rows <= 20:
             break  # gültig → Schleife verlassen
 
+    return columns, rows
+
+
+
+def play_standard_size_game():
     # Input der Spielernamen
     ui.display_headline("configure names")
     name_a = ui.prompt("Please enter the name of player A")
@@ -226,57 +542,33 @@ def play_game():
     while len(name_b.strip()) == 0 or name_b == name_a:
         name_b = ui.prompt("Please enter the name of player B")
 
+    # 15x15 Grid
+    return run_game(GameEngine(15, 15), name_a, name_b, records.MODE_STANDARD)
 
-    grid = [[None for _ in range(columns)] for _ in range(rows)]
-    is_player_a = True
-
-    while is_grid_full != True or is_game_won != True:
-        player_name = name_a if is_player_a else name_b
 
 
-        # Turn ausführen (zeigt Grid, fragt nach Eingabe)
-        play_turn(grid, player_name, is_player_a, can_remove=False)
+def play_game():
 
-        # Prüfen auf Sieg
-        if is_game_won(grid):
-            ui.display_headline("congratulations")
-            ui.display_message(f"{player_name} won the game!")
+    columns, rows = ask_grid_size()
 
-            # Scoreboard speichern
-            scoreboard = load_scoreboard()
-            scoreboard[player_name] = scoreboard.get(player_name, 0) + 1
-            save_scoreboard(scoreboard)
+    # Input der Spielernamen
+    ui.display_headline("configure names")
+    name_a = ui.prompt("Please enter the name of player A")
+    while len(name_a.strip()) == 0:
+        name_a = ui.prompt("Please enter the name of player A")
 
-            ui.prompt("Please press ENTER to return to the menu")
-            return player_name
+    name_b = ui.prompt("Please enter the name of player B")
+    while len(name_b.strip()) == 0 or name_b == name_a:
+        name_b = ui.prompt("Please enter the name of player B")
 
-        # Prüfen auf Draw
-        if is_grid_full(grid):
-            ui.display_headline("oh no - a draw")
-            ui.display_message("Unfortunately, nobody won the game :(")
-            ui.prompt("Please press ENTER to return to the menu")
-            return None
 
-        # Spieler wechseln
-        is_player_a = not is_player_a
+    return run_game(GameEngine(columns, rows), name_a, name_b, records.MODE_ADJUSTABLE)
 
 
 
 def play_game_with_remove():
     
-    ui.display_headline("configure grid")
-
-    # Spalten abfragen
-    while True:
-        columns = int(ui.prompt("Please enter the number of columns (10..20)"))
-        if 10 <= columns <= 20:
-            break
-
-    # Zeilen abfragen
-    while True:
-        rows = int(ui.prompt("Please enter the number of rows    (10..20)"))
-        if 10 <= rows <= 20:
-            break  # gültig → Schleife verlassen
+    columns, rows = ask_grid_size()
 
     # Input der Spielernamen
     ui.display_headline("configure names")
@@ -289,39 +581,58 @@ def play_game_with_remove():
         name_b = ui.prompt("Please enter the name of player B")
 
 
-    grid = [[None for _ in range(columns)] for _ in range(rows)]
-    is_player_a = True
+    return run_game(GameEngine(columns, rows, allow_remove=True), name_a, name_b, records.MODE_REMOVE)
 
-    while (not is_grid_full(grid)) and (not is_game_won(grid)):
-        player_name = name_a if is_player_a else name_b
 
+def play_game_against_computer(time_budget=ai.DEFAULT_TIME_BUDGET, ponder=True):
+    """
+    :time_budget: Wall-clock seconds the computer searches per move.
+    :ponder: Whether the computer keeps searching while player A thinks.
+    """
 
-        # Turn ausführen (zeigt Grid, fragt nach Eingabe)
-        play_turn(grid, player_name, is_player_a, can_remove=True)
+    columns, rows = ask_grid_size()
 
-        # Prüfen auf Sieg
-        if is_game_won(grid):
-            ui.display_headline("congratulations")
-            ui.display_message(f"{player_name} won the game!")
+    # Input des Spielernamens, der Computer spielt als Player B
+    ui.display_headline("configure names")
+    name_a = ui.prompt("Please enter the name of player A")
+    while len(name_a.strip()) == 0 or name_a == ai.COMPUTER_NAME:
+        name_a = ui.prompt("Please enter the name of player A")
 
-            # Scoreboard speichern
-            scoreboard = load_scoreboard()
-            scoreboard[player_name] = scoreboard.get(player_name, 0) + 1
-            save_scoreboard(scoreboard)
 
-            ui.prompt("Please press ENTER to return to the menu")
-            return player_name
+    table = zobrist.TranspositionTable()
+    book = opening.load_book(OPENING_BOOK_FILE) if OPENING_BOOK_FILE and os.path.exists(OPENING_BOOK_FILE) else None
+    ponderer = ai.Ponderer(table)
 
-        # Prüfen auf Draw
-        if is_grid_full(grid):
-            ui.display_headline("oh no - a draw")
-            ui.display_message("Unfortunately, nobody won the game :(")
-            ui.prompt("Please press ENTER to return to the menu")
-            return None
+    def computer_move(grid, is_player_a, key):
+        # Eröffnungszüge aus dem Buch sparen die Suche
+        move = book.lookup(grid) if book is not None else None
+        if move is None:
+            move = ponderer.take(grid, time_budget, key)
+        if move is None:
+            move = ai.choose_move(grid, is_player_a, time_budget, table=table)
+
+        # Bedenkzeit des Spielers nutzen
+        next_grid = [list(column) for column in grid]
+        next_grid[move[0]][move[1]] = is_player_a
+        if ponder and not is_winning_move(next_grid, move) and not is_grid_full(next_grid):
+            ponderer.start(next_grid, not is_player_a)
+        return move
 
-        # Spieler wechseln
-        is_player_a = not is_player_a
+    try:
+        return run_game(GameEngine(columns, rows), name_a, ai.COMPUTER_NAME, records.MODE_COMPUTER, computer_move)
+    finally:
+        ponderer.stop()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    import sys
+    if sys.argv[1:2] == ['simulate']:
+        import simulate
+        simulate.main(sys.argv[2:])
+    elif sys.argv[1:2] == ['book']:
+        opening.main(sys.argv[2:])
+    elif sys.argv[1:2] == ['serve']:
+        import server
+        server.main(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
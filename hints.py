@@ -0,0 +1,101 @@
+import collections
+import time
+
+import patterns
+import zobrist
+
+DEFAULT_TIME_BUDGET = 0.3
+DEFAULT_HINT_COUNT = 3
+CACHE_SIZE = 256
+
+
+class HintEngine:
+    """
+    Suggests moves for the player at turn. Every candidate move is answered with the best
+    reply of the other player, both scored with a patterns.PatternEvaluator that is kept
+    between requests and only updated by the stones that changed since the last request.
+    Suggestions are cached per position.
+    """
+
+    def __init__(self, time_budget=DEFAULT_TIME_BUDGET, count=DEFAULT_HINT_COUNT):
+        """
+        :time_budget: Wall-clock seconds a suggestion may take.
+        :count: Number of suggested moves.
+        """
+        self.time_budget = time_budget
+        self.count = count
+        self.evaluator = None
+        self.grid = None
+        self.cache = collections.OrderedDict()
+
+    def __sync(self, grid):
+        """
+        Updates the evaluator to the grid by the stones that were placed or removed since the last request.
+        """
+        if self.grid is None or (len(self.grid), len(self.grid[0])) != (len(grid), len(grid[0])):
+            self.evaluator = patterns.PatternEvaluator(grid)
+            self.grid = [list(column) for column in grid]
+            return
+
+        for col, column in enumerate(grid):
+            known = self.grid[col]
+            if column == known:
+                continue
+            for row, value in enumerate(column):
+                if value != known[row]:
+                    if known[row] is not None:
+                        self.evaluator.remove(col, row, known[row])
+                    if value is not None:
+                        self.evaluator.place(col, row, value)
+            self.grid[col] = list(column)
+
+    def __is_five(self, col, row, is_player_a):
+        evaluator = self.evaluator
+        stones = evaluator.stones_a if is_player_a else evaluator.stones_b
+        return any(patterns.has_five(stones[line], evaluator.lengths[line])
+                   for line, _ in evaluator.lines_of_cell[col][row])
+
+    def suggest(self, grid, is_player_a, key=None):
+        """
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+        :is_player_a: Boolean that is true if player A is at turn.
+        :key: Zobrist key of the grid if known, e.g. gomoku.GameState.key, saves hashing the grid.
+        :return: List of up to count bi-tuples ((col_index, row_index), score) with the best move
+            first. The score is the pattern score after the move and the best reply, from the
+            view of the player at turn.
+        """
+        key = (len(grid), len(grid[0]), key if key is not None else zobrist.grid_key(grid), is_player_a)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        deadline = time.perf_counter() + self.time_budget
+        self.__sync(grid)
+        evaluator = self.evaluator
+        sign = 1 if is_player_a else -1
+        moves = patterns.candidates(grid)
+
+        # attack and defense value of a move, to try the most promising moves first
+        moves.sort(key=lambda move: sign * (evaluator.move_delta(*move, is_player_a)
+                                            - evaluator.move_delta(*move, not is_player_a)), reverse=True)
+
+        suggestions = []
+        for col, row in moves:
+            if len(suggestions) >= self.count and time.perf_counter() > deadline:
+                break
+
+            evaluator.place(col, row, is_player_a)
+            if self.__is_five(col, row, is_player_a):
+                score = sign * evaluator.score
+            else:
+                score = min((sign * (evaluator.score + evaluator.move_delta(c, r, not is_player_a))
+                             for c, r in moves if (c, r) != (col, row)), default=sign * evaluator.score)
+            evaluator.remove(col, row, is_player_a)
+            suggestions.append(((col, row), score))
+
+        suggestions.sort(key=lambda suggestion: suggestion[1], reverse=True)
+        suggestions = suggestions[:self.count]
+        self.cache[key] = suggestions
+        if len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return suggestions
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import server
+
+# arguments of QUEUE the clients pick from
+KINDS = ['', '12 12', '15 15 remove', '20 20']
+
+
+async def receive(reader, timeout):
+    line = await asyncio.wait_for(reader.readline(), timeout)
+    if not line:
+        raise ConnectionError('connection closed')
+    return line.decode('utf-8').split()
+
+
+async def run_client(number, host, port, max_moves, timeout, generator, totals):
+    """
+    Connects, queues for a random kind of game and places stones on random empty cells until the
+    game ends or max_moves stones were placed by the client, then quits.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await receive(reader, timeout)
+        writer.write(f'NAME bot{number}\nQUEUE {generator.choice(KINDS)}\n'.encode('utf-8'))
+        queued = time.perf_counter()
+        cols = rows = None
+        occupied = set()
+        moves = 0
+        while True:
+            words = await receive(reader, timeout)
+            event = words[0]
+            if event == 'START':
+                totals['waits'].append(time.perf_counter() - queued)
+                cols, rows = int(words[2]), int(words[3])
+            elif event == 'MOVED':
+                occupied.add((int(words[2]), int(words[3])))
+            elif event == 'REMOVED':
+                occupied.discard((int(words[1]), int(words[2])))
+            elif event == 'TURN':
+                if moves == max_moves:
+                    break
+                cell = (generator.randint(1, rows), generator.randint(1, cols))
+                while cell in occupied:
+                    cell = (generator.randint(1, rows), generator.randint(1, cols))
+                writer.write(f'MOVE {cell[0]} {cell[1]}\n'.encode('utf-8'))
+                moves += 1
+            elif event in ('WON', 'DRAW', 'ABORTED', 'TIMEOUT', 'ERROR'):
+                totals[event] += 1
+                break
+        totals['moves'] += moves
+        writer.write(b'QUIT\n')
+        await writer.drain()
+    except (ConnectionError, asyncio.TimeoutError):
+        totals['failed'] += 1
+    finally:
+        writer.close()
+
+
+async def generate_load(clients, host, port, max_moves=20, timeout=10.0, seed=0):
+    """
+    Runs clients at once against a server.
+
+    :return: Dictionary with the numbers of clients, finished games by their end, failed
+        clients and moves, the seconds the clients waited for a game and the elapsed seconds.
+    """
+    generator = random.Random(seed)
+    totals = {'clients': clients, 'waits': [], 'moves': 0, 'failed': 0,
+              'WON': 0, 'DRAW': 0, 'ABORTED': 0, 'TIMEOUT': 0, 'ERROR': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*[run_client(number, host, port, max_moves, timeout, random.Random(generator.random()), totals)
+                           for number in range(clients)])
+    totals['seconds'] = time.perf_counter() - start
+    return totals
+
+
+async def generate_local_load(clients, max_moves=20, timeout=10.0, seed=0):
+    """
+    Starts a server in the process with a temporary scoreboard and runs the clients against it.
+
+    :return: Bi-tuple of the totals of generate_load and the metrics of the matchmaker.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        game_server = server.GameServer(os.path.join(directory, 'scoreboard.dat'), queue_timeout=timeout / 2)
+        port = await game_server.start(port=0)
+        try:
+            totals = await generate_load(clients, '127.0.0.1', port, max_moves, timeout, seed)
+        finally:
+            await game_server.close()
+        return totals, game_server.matchmaker.metrics()
+
+
+def format_totals(totals):
+    waits = totals['waits']
+    return (f"{totals['clients']} clients in {totals['seconds']:.2f}s, {len(waits) // 2} games, "
+            f"{totals['moves'] / totals['seconds']:,.0f} moves/s, "
+            f"wait mean {statistics.mean(waits) if waits else 0:.3f}s max {max(waits, default=0):.3f}s, "
+            f"won {totals['WON']} draw {totals['DRAW']} aborted {totals['ABORTED']} "
+            f"timeout {totals['TIMEOUT']} failed {totals['failed']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs many clients queueing and playing against a game server.')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--moves', type=int, default=20, help='stones per client before it quits')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help='port of a running server, one is started by default')
+    args = parser.parse_args(argv)
+
+    if args.port is None:
+        totals, metrics = asyncio.run(generate_local_load(args.clients, args.moves, args.timeout, args.seed))
+        print(format_totals(totals))
+        print(' '.join(f'{key}={value:.4f}' if type(value) == float else f'{key}={value}'
+                       for key, value in metrics.items()))
+    else:
+        totals = asyncio.run(generate_load(args.clients, args.host, args.port, args.moves, args.timeout, args.seed))
+        print(format_totals(totals))
+    return totals
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import collections
+import heapq
+import itertools
+import time
+
+DEFAULT_TIMEOUT = 60.0
+WAIT_WINDOW = 1000
+
+
+class Ticket:
+    """
+    Place of a player in a queue.
+    """
+
+    __slots__ = ('player', 'key', 'enqueued', 'deadline', 'sequence', 'is_waiting')
+
+    def __init__(self, player, key, enqueued, deadline, sequence):
+        self.player = player
+        self.key = key
+        self.enqueued = enqueued
+        self.deadline = deadline
+        self.sequence = sequence
+        self.is_waiting = True
+
+
+class Matchmaker:
+    """
+    Queues players by the kind of game they want, e.g. (mode, cols, rows), and pairs an
+    arriving player with the player waiting longest for the same kind. Every queue is a heap ordered by the time of
+    entry, and one more heap orders all tickets by their deadline, so entering, pairing and
+    expiring take O(log n). Cancelled and paired tickets stay in the heaps and are skipped
+    when they come up, which keeps cancelling O(1).
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, clock=time.monotonic):
+        """
+        :timeout: Seconds a player waits at most, None to wait forever.
+        :clock: Function returning the current time in seconds.
+        """
+        self.timeout = timeout
+        self.clock = clock
+        self.queues = {}
+        self.deadlines = []
+        self.sequence = itertools.count()
+        self.depths = collections.Counter()
+        self.waits = collections.deque(maxlen=WAIT_WINDOW)
+        self.counts = collections.Counter()
+
+    def __pop(self, key):
+        queue = self.queues.get(key)
+        while queue:
+            _, _, ticket = heapq.heappop(queue)
+            if ticket.is_waiting:
+                return ticket
+        return None
+
+    def __leave(self, ticket):
+        ticket.is_waiting = False
+        self.depths[ticket.key] -= 1
+        if self.depths[ticket.key] == 0:
+            del self.depths[ticket.key]
+            # only skipped tickets are left
+            self.queues.pop(ticket.key, None)
+
+    def peek(self, key):
+        """
+        :return: The ticket that is paired next for the kind of game, or None.
+        """
+        queue = self.queues.get(key)
+        while queue and not queue[0][2].is_waiting:
+            heapq.heappop(queue)
+        return queue[0][2] if queue else None
+
+    def enqueue(self, player, key):
+        """
+        Pairs the player with the player waiting longest for the same kind of game, or queues the player.
+
+        :player: Any object representing the player.
+        :key: Hashable kind of game.
+        :return: Bi-tuple of the ticket of the player and the ticket of the paired player or None.
+            The paired player was first and plays A.
+        """
+        now = self.clock()
+        deadline = now + self.timeout if self.timeout is not None else None
+        ticket = Ticket(player, key, now, deadline, next(self.sequence))
+
+        opponent = self.__pop(key)
+        if opponent is not None:
+            self.__leave(opponent)
+            ticket.is_waiting = False
+            self.waits.append(now - opponent.enqueued)
+            self.waits.append(0.0)
+            self.counts['matched'] += 1
+            return ticket, opponent
+
+        heapq.heappush(self.queues.setdefault(key, []), (now, ticket.sequence, ticket))
+        if deadline is not None:
+            heapq.heappush(self.deadlines, (deadline, ticket.sequence, ticket))
+        self.depths[key] += 1
+        return ticket, None
+
+    def cancel(self, ticket):
+        """
+        :return: True if the ticket was waiting and is cancelled now.
+        """
+        if not ticket.is_waiting:
+            return False
+        self.__leave(ticket)
+        self.counts['cancelled'] += 1
+        return True
+
+    def expire(self, now=None):
+        """
+        Removes the tickets whose deadline passed.
+
+        :now: Current time, clock() by default.
+        :return: List of the expired tickets.
+        """
+        now = self.clock() if now is None else now
+        expired = []
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, _, ticket = heapq.heappop(self.deadlines)
+            if ticket.is_waiting:
+                self.__leave(ticket)
+                expired.append(ticket)
+        self.counts['expired'] += len(expired)
+        return expired
+
+    def depth(self, key=None):
+        """
+        :key: Kind of game, all kinds by default.
+        :return: Number of waiting players.
+        """
+        return self.depths[key] if key is not None else sum(self.depths.values())
+
+    def metrics(self):
+        """
+        :return: Dictionary with the number of waiting players in total and per kind of game,
+            the numbers of pairs, cancelled and expired tickets, and the mean, median, 95th
+            percentile and maximum seconds players waited for their last WAIT_WINDOW pairings.
+        """
+        waits = sorted(self.waits)
+        return {
+            'waiting': self.depth(),
+            'depths': dict(self.depths),
+            'matched': self.counts['matched'],
+            'cancelled': self.counts['cancelled'],
+            'expired': self.counts['expired'],
+            'wait_mean': sum(waits) / len(waits) if waits else 0.0,
+            'wait_p50': waits[len(waits) // 2] if waits else 0.0,
+            'wait_p95': waits[min(len(waits) - 1, len(waits) * 95 // 100)] if waits else 0.0,
+            'wait_max': waits[-1] if waits else 0.0,
+        }
@@ -0,0 +1,342 @@
+import argparse
+import math
+import multiprocessing
+import random
+import time
+
+import patterns
+import zobrist
+
+DEFAULT_TIME_BUDGET = 1.0
+EXPLORATION = 1.0
+# A node with n visits has at most WIDENING_FACTOR * n ** WIDENING_EXPONENT children
+WIDENING_FACTOR = 2.0
+WIDENING_EXPONENT = 0.5
+ROLLOUTS_PER_TASK = 8
+
+EMPTY, STONE_A, STONE_B = 0, 1, 2
+
+
+def _is_five(board, cols, rows, col, row):
+    """
+    :board: Flat column-major bytearray of the cells.
+    :return: True if the stone on (col, row) is part of five in a row. Only the four lines
+        through the stone are inspected.
+    """
+    stone = board[col * rows + row]
+    for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        count = 1
+        for sign in (1, -1):
+            c, r = col + sign * dc, row + sign * dr
+            while 0 <= c < cols and 0 <= r < rows and board[c * rows + r] == stone:
+                count += 1
+                c, r = c + sign * dc, r + sign * dr
+        if count >= 5:
+            return True
+    return False
+
+
+def playout(board, cols, rows, stones, is_player_a, generator):
+    """
+    Plays a game to its end with random moves near the stones, placed on a copy of the board.
+
+    :board: Flat column-major bytearray of the cells, EMPTY, STONE_A or STONE_B.
+    :stones: List of the indices of the occupied cells.
+    :is_player_a: Boolean that is true if player A is at turn.
+    :generator: random.Random instance.
+    :return: STONE_A or STONE_B for the winner, EMPTY on a draw.
+    """
+    board = bytearray(board)
+    stones = list(stones)
+    empties = len(board) - len(stones)
+    while empties > 0:
+        cell = -1
+        if len(stones) > 0:
+            # a random cell near a random stone, like the moves considered by the tree
+            for _ in range(8):
+                col, row = divmod(generator.choice(stones), rows)
+                col += generator.randint(-patterns.NEIGHBORHOOD, patterns.NEIGHBORHOOD)
+                row += generator.randint(-patterns.NEIGHBORHOOD, patterns.NEIGHBORHOOD)
+                if 0 <= col < cols and 0 <= row < rows and board[col * rows + row] == EMPTY:
+                    cell = col * rows + row
+                    break
+        if cell < 0:
+            cell = generator.choice([index for index, value in enumerate(board) if value == EMPTY])
+
+        board[cell] = STONE_A if is_player_a else STONE_B
+        stones.append(cell)
+        empties -= 1
+        if _is_five(board, cols, rows, cell // rows, cell % rows):
+            return board[cell]
+        is_player_a = not is_player_a
+
+    return EMPTY
+
+
+def run_playouts(task):
+    """
+    Runs playouts from one position, in a worker process or in the calling process.
+
+    :task: Tuple (cols, rows, board, stones, is_player_a, number of playouts, seed).
+    :return: Tri-tuple of the wins of A, wins of B and draws.
+    """
+    cols, rows, board, stones, is_player_a, count, seed = task
+    generator = random.Random(seed)
+    results = [0, 0, 0]
+    for _ in range(count):
+        winner = playout(board, cols, rows, stones, is_player_a, generator)
+        results[0 if winner == STONE_A else 1 if winner == STONE_B else 2] += 1
+    return tuple(results)
+
+
+class Node:
+    """
+    Position in the search tree, reached by a move of the player is_player_a.
+    wins counts the playouts won by that player, draws as half wins.
+    """
+
+    __slots__ = ('move', 'parent', 'is_player_a', 'key', 'children', 'untried', 'visits', 'wins', 'winner')
+
+    def __init__(self, move, parent, is_player_a, key):
+        self.move = move
+        self.parent = parent
+        self.is_player_a = is_player_a
+        self.key = key
+        self.children = []
+        # candidate moves not expanded yet, None until the node is visited first
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+        # STONE_A or STONE_B if the move completed five, EMPTY if it filled the grid, None otherwise
+        self.winner = None
+
+
+class MctsEngine:
+    """
+    Monte Carlo tree search with UCT. The children of a node are the empty cells near the
+    stones, added one by one as the node is visited more often (progressive widening), the
+    cells with most stones around them first. Leaves are evaluated by random playouts, which
+    run in a process pool if workers > 0. The tree is kept between moves of a game, so the
+    playouts of the moves that were played are reused.
+    """
+
+    def __init__(self, workers=0, rollouts_per_task=ROLLOUTS_PER_TASK, seed=None):
+        """
+        :workers: Number of worker processes for the playouts, 0 to run them in this process.
+        :rollouts_per_task: Playouts per leaf sent to a worker at once.
+        :seed: Optional seed of the playouts.
+        """
+        self.workers = workers
+        self.rollouts_per_task = rollouts_per_task
+        self.generator = random.Random(seed)
+        self.pool = multiprocessing.Pool(workers) if workers > 0 else None
+        self.root = None
+        self.playouts = 0
+        self.seconds = 0.0
+        self.reused = 0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __find_root(self, grid, key):
+        """
+        :return: Node of the tree with the position of the grid, searched up to two moves
+            below the root, or a new root.
+        """
+        if self.root is not None and (self.cols, self.rows) == (len(grid), len(grid[0])):
+            nodes = [self.root]
+            for _ in range(3):
+                for node in nodes:
+                    if node.key == key:
+                        node.parent = None
+                        return node
+                nodes = [child for node in nodes for child in node.children]
+
+        self.cols, self.rows = len(grid), len(grid[0])
+        stone_count = sum(self.rows - column.count(None) for column in grid)
+        # the root is reached by a move of the player who isn't at turn
+        return Node(None, None, stone_count % 2 == 1, key)
+
+    def __candidates(self, board, stones):
+        cols, rows = self.cols, self.rows
+        if len(stones) == 0:
+            return [(cols // 2) * rows + rows // 2]
+
+        # adjacent stones count more than stones two cells away
+        neighbors = patterns.near_cells(board, stones, cols, rows, EMPTY)
+        # popped from the end, the best cell last
+        return sorted(neighbors, key=lambda cell: (neighbors[cell], -cell))
+
+    def __select(self, board, stones):
+        """
+        Walks down the tree by UCT, expands a child if the node may have more children and
+        places the moves on the board. Visits are counted at once as lost playouts (virtual
+        loss), so the next selection of the same batch prefers other leaves.
+
+        :return: List of the nodes of the path.
+        """
+        node = self.root
+        path = [node]
+        keys = zobrist.zobrist_keys(self.cols, self.rows)
+        while node.winner is None:
+            if node.untried is None:
+                node.untried = self.__candidates(board, stones)
+            allowed = max(1, math.ceil(WIDENING_FACTOR * max(node.visits, 1) ** WIDENING_EXPONENT))
+            if len(node.untried) > 0 and len(node.children) < allowed:
+                cell = node.untried.pop()
+                col, row = divmod(cell, self.rows)
+                is_player_a = not node.is_player_a
+                board[cell] = STONE_A if is_player_a else STONE_B
+                stones.append(cell)
+                child = Node((col, row), node, is_player_a, node.key ^ zobrist.stone_key(keys, col, row, is_player_a))
+                if _is_five(board, self.cols, self.rows, col, row):
+                    child.winner = board[cell]
+                elif len(stones) == len(board):
+                    child.winner = EMPTY
+                node.children.append(child)
+                path.append(child)
+                return path
+
+            if len(node.children) == 0:
+                break
+
+            log_visits = math.log(node.visits + 1)
+            node = max(node.children, key=lambda child: child.wins / (child.visits + 1e-9)
+                       + EXPLORATION * math.sqrt(log_visits / (child.visits + 1e-9)))
+            col, row = node.move
+            board[col * self.rows + row] = STONE_A if node.is_player_a else STONE_B
+            stones.append(col * self.rows + row)
+            path.append(node)
+
+        return path
+
+    def __backpropagate(self, path, wins_a, wins_b, draws):
+        for node in path:
+            node.wins += (wins_a if node.is_player_a else wins_b) + draws / 2
+
+    def choose_move(self, grid, is_player_a, time_budget=DEFAULT_TIME_BUDGET, playouts=None):
+        """
+        Searches until the time budget is used up or the number of playouts is reached.
+
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+        :is_player_a: Boolean that is true if the computer plays player A.
+        :time_budget: Wall-clock seconds the search may take, None for no limit.
+        :playouts: Number of simulations, None for no limit. Leaves with a known result count as
+            simulations without running playouts.
+        :return: Bi-tuple (col_index, row_index) of the most visited move, the most promising
+            candidate if the budget ended before the first playout.
+        """
+        start = time.perf_counter()
+        self.root = self.__find_root(grid, zobrist.grid_key(grid))
+        self.reused = self.root.visits
+        self.root.is_player_a = not is_player_a
+
+        base = bytearray(self.cols * self.rows)
+        base_stones = []
+        for col, column in enumerate(grid):
+            for row, value in enumerate(column):
+                if value is not None:
+                    base[col * self.rows + row] = STONE_A if value else STONE_B
+                    base_stones.append(col * self.rows + row)
+
+        # simulations including known results, and playouts actually run
+        done = played = 0
+        batch = max(1, self.workers)
+        while (playouts is None or done < playouts) and (time_budget is None or time.perf_counter() - start < time_budget):
+            tasks, paths = [], []
+            for _ in range(batch):
+                board, stones = bytearray(base), list(base_stones)
+                path = self.__select(board, stones)
+                leaf = path[-1]
+                count = self.rollouts_per_task
+                for node in path:
+                    node.visits += count
+                if leaf.winner is not None:
+                    # no playouts needed, the result is known
+                    self.__backpropagate(path, count if leaf.winner == STONE_A else 0,
+                                         count if leaf.winner == STONE_B else 0, count if leaf.winner == EMPTY else 0)
+                else:
+                    tasks.append((self.cols, self.rows, bytes(board), stones, not leaf.is_player_a, count,
+                                  self.generator.getrandbits(64)))
+                    paths.append(path)
+                    played += count
+                done += count
+
+            if self.pool is not None:
+                results = self.pool.map(run_playouts, tasks)
+            else:
+                results = [run_playouts(task) for task in tasks]
+            for path, result in zip(paths, results):
+                self.__backpropagate(path, *result)
+
+            if len(self.root.children) == 0:
+                break
+
+        self.playouts = played
+        self.seconds = time.perf_counter() - start
+        if len(self.root.children) == 0:
+            # the budget ended before the first playout or no cell is left
+            cells = self.root.untried or self.__candidates(base, base_stones) or \
+                [cell for cell in range(len(base)) if base[cell] == EMPTY]
+            if len(cells) == 0:
+                raise ValueError("the grid has no empty cell")
+            return divmod(cells[-1], self.rows)
+        best = max(self.root.children, key=lambda child: child.visits)
+        return best.move
+
+    def stats(self):
+        """
+        :return: Dictionary with the playouts and seconds of the last search, playouts per second,
+            the playouts reused from previous searches and the number of workers.
+        """
+        return {
+            'playouts': self.playouts,
+            'seconds': self.seconds,
+            'playouts_per_second': self.playouts / self.seconds if self.seconds > 0 else 0.0,
+            'reused': self.reused,
+            'workers': self.workers,
+        }
+
+
+def benchmark(workers_list, time_budget, size=15):
+    """
+    Measures the playouts per second from the same position with different numbers of workers.
+
+    :return: List of the stats dictionaries.
+    """
+    grid = [[None] * size for _ in range(size)]
+    center = size // 2
+    for index, (col, row) in enumerate([(center, center), (center + 1, center), (center, center + 1)]):
+        grid[col][row] = index % 2 == 0
+
+    results = []
+    for workers in workers_list:
+        with MctsEngine(workers, seed=0) as engine:
+            engine.choose_move(grid, False, time_budget)
+            results.append(engine.stats())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measures the playouts per second of the Monte Carlo tree search.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--size', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    for stats in benchmark(args.workers, args.seconds, args.size):
+        print(f"{stats['workers']} workers: {stats['playouts']} playouts in {stats['seconds']:.2f}s "
+              f"({stats['playouts_per_second']:,.0f} playouts/s)")
+
+
+if __name__ == '__main__':
+    main()
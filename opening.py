@@ -0,0 +1,252 @@
+import argparse
+import os
+import struct
+
+import records
+import zobrist
+
+MAGIC = b"OB"
+VERSION = 1
+
+DEFAULT_DEPTH = 10
+DEFAULT_MIN_GAMES = 2
+
+_HEADER = struct.Struct("<2sBBBB")
+# key, cell of the move, number of games, points of the player at turn in half points
+_ENTRY = struct.Struct("<QHII")
+
+_symmetry_keys_cache = {}
+
+
+def symmetries(cols, rows):
+    """
+    Symmetries of the board as tri-tuples (transpose, mirror columns, mirror rows), applied in
+    this order. Square boards have 8 symmetries of rotations and reflections, other boards
+    only the 4 that don't transpose.
+
+    :return: List of symmetries, starting with the identity.
+    """
+    return [(transpose, mirror_col, mirror_row)
+            for transpose in ([False, True] if cols == rows else [False])
+            for mirror_col in [False, True]
+            for mirror_row in [False, True]]
+
+
+def transform(move, symmetry, cols, rows):
+    """
+    :move: Bi-tuple (col_index, row_index).
+    :symmetry: Symmetry as returned by symmetries.
+    :return: The transformed bi-tuple (col_index, row_index).
+    """
+    col, row = move
+    transpose, mirror_col, mirror_row = symmetry
+    if transpose:
+        col, row = row, col
+    if mirror_col:
+        col = cols - 1 - col
+    if mirror_row:
+        row = rows - 1 - row
+    return col, row
+
+
+def inverse(symmetry):
+    """
+    :return: The symmetry that undoes the given symmetry.
+    """
+    transpose, mirror_col, mirror_row = symmetry
+    # the mirrors are undone before transposing, which swaps their axes
+    return (True, mirror_row, mirror_col) if transpose else symmetry
+
+
+def _symmetry_keys(cols, rows):
+    """
+    :return: List of pairs of column-major key arrays of player A and B per symmetry, holding
+        the Zobrist key of the cell each cell is transformed to.
+    """
+    if (cols, rows) not in _symmetry_keys_cache:
+        keys_a, keys_b = zobrist.zobrist_keys(cols, rows)
+        table = []
+        for symmetry in symmetries(cols, rows):
+            cells = [[transform((col, row), symmetry, cols, rows) for row in range(rows)] for col in range(cols)]
+            table.append(([[keys_a[c][r] for c, r in column] for column in cells],
+                          [[keys_b[c][r] for c, r in column] for column in cells]))
+        _symmetry_keys_cache[(cols, rows)] = table
+
+    return _symmetry_keys_cache[(cols, rows)]
+
+
+def _canonical_keys(stones, cols, rows):
+    """
+    :stones: List of tri-tuples (col_index, row_index, is_player_a).
+    :return: Bi-tuple of the smallest key of all symmetric positions and the list of
+        symmetries leading to it.
+    """
+    keys = []
+    for keys_a, keys_b in _symmetry_keys(cols, rows):
+        key = 0
+        for col, row, is_player_a in stones:
+            key ^= keys_a[col][row] if is_player_a else keys_b[col][row]
+        keys.append(key)
+
+    key = min(keys)
+    all_symmetries = symmetries(cols, rows)
+    return key, [all_symmetries[index] for index, value in enumerate(keys) if value == key]
+
+
+def _grid_stones(grid):
+    return [(col, row, value) for col, column in enumerate(grid) if column.count(None) < len(column)
+            for row, value in enumerate(column) if value is not None]
+
+
+def canonicalize(grid):
+    """
+    Reduces a position under the symmetries of the board: all positions that are rotations
+    or reflections of each other get the same key, e.g. to find duplicate positions.
+
+    :grid: The grid as two-dimensional array of columns and per-column row values.
+    :return: Bi-tuple of the canonical 64-bit key and the symmetry that transforms the
+        position into the canonical one.
+    """
+    key, key_symmetries = _canonical_keys(_grid_stones(grid), len(grid), len(grid[0]))
+    return key, key_symmetries[0]
+
+
+def _canonical_move(stones, move, cols, rows):
+    """
+    :return: Bi-tuple of the canonical key of the position and the move in the canonical position.
+        Of equivalent moves of a symmetric position, the smallest one is taken.
+    """
+    key, key_symmetries = _canonical_keys(stones, cols, rows)
+    return key, min(transform(move, symmetry, cols, rows) for symmetry in key_symmetries)
+
+
+class OpeningBook:
+    """
+    Best known moves of opening positions, keyed by canonical position keys, so a position
+    is found regardless of how it is rotated or reflected on the board.
+    """
+
+    def __init__(self, cols=15, rows=15, max_stones=DEFAULT_DEPTH - 1, entries=None):
+        """
+        :cols: Number of columns of the board of the book.
+        :rows: Number of rows of the board of the book.
+        :max_stones: Largest number of stones of the positions in the book.
+        :entries: Dictionary of canonical keys and tri-tuples (canonical move, number of games,
+            points of the player at turn in half points).
+        """
+        self.cols = cols
+        self.rows = rows
+        self.max_stones = max_stones
+        self.entries = {} if entries is None else entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, grid):
+        """
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+        :return: Bi-tuple (col_index, row_index) of the book move or None if the position isn't in the book.
+        """
+        if len(grid) != self.cols or len(grid[0]) != self.rows:
+            return None
+        if sum(self.rows - column.count(None) for column in grid) > self.max_stones:
+            return None
+
+        key, symmetry = canonicalize(grid)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return transform(entry[0], inverse(symmetry), self.cols, self.rows)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.cols, self.rows, self.max_stones))
+            f.write(b"".join(_ENTRY.pack(key, move[0] * self.rows + move[1], games, points)
+                             for key, (move, games, points) in self.entries.items()))
+
+
+def load_book(path):
+    """
+    :path: Path of the book file.
+    :return: The OpeningBook.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, cols, rows, max_stones = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not an opening book")
+
+    book = OpeningBook(cols, rows, max_stones)
+    for key, cell, games, points in _ENTRY.iter_unpack(memoryview(data)[_HEADER.size:]):
+        book.entries[key] = (divmod(cell, rows), games, points)
+    return book
+
+
+def build_book(game_records, cols=15, rows=15, depth=DEFAULT_DEPTH, min_games=DEFAULT_MIN_GAMES):
+    """
+    Builds a book from finished games: for every position with fewer than depth stones, the
+    move with the best result for the player at turn is taken, if it was played in at least
+    min_games games. Rotated or reflected positions and moves count as the same.
+
+    :game_records: Iterable of records.GameRecords, games of other board sizes are ignored.
+    :cols: Number of columns of the board of the book.
+    :rows: Number of rows of the board of the book.
+    :depth: Number of stones up to which positions are added.
+    :min_games: Number of games a move needs to be added.
+    :return: The OpeningBook.
+    """
+    # canonical key -> canonical move -> [games, half points]
+    statistics = {}
+    for record in game_records:
+        if (record.cols, record.rows) != (cols, rows) or record.result == records.RESULT_RUNNING:
+            continue
+
+        stones = []
+        for move in record.moves:
+            if move is None:
+                if len(stones) > 0:
+                    stones.pop()
+                continue
+            if len(stones) >= depth:
+                break
+
+            is_player_a = len(stones) % 2 == 0
+            if record.result == records.RESULT_DRAW:
+                points = 1
+            elif (record.result == records.RESULT_WON_BY_A) == is_player_a:
+                points = 2
+            else:
+                points = 0
+
+            key, canonical_move = _canonical_move(stones, move, cols, rows)
+            move_statistics = statistics.setdefault(key, {}).setdefault(canonical_move, [0, 0])
+            move_statistics[0] += 1
+            move_statistics[1] += points
+            stones.append((move[0], move[1], is_player_a))
+
+    book = OpeningBook(cols, rows, depth - 1)
+    for key, moves in statistics.items():
+        candidates = [(points / games, games, move) for move, (games, points) in moves.items() if games >= min_games]
+        if len(candidates) > 0:
+            _, games, move = max(candidates)
+            book.entries[key] = (move, games, moves[move][1])
+    return book
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gomoku book',
+                                     description='Builds an opening book from recorded games.')
+    parser.add_argument('games', metavar='GAMES', help='game record file, e.g. written by simulate --record')
+    parser.add_argument('book', metavar='BOOK', help='book file to write')
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH)
+    parser.add_argument('--min-games', type=int, default=DEFAULT_MIN_GAMES)
+    args = parser.parse_args(argv)
+
+    book = build_book(records.read_games(args.games), depth=args.depth, min_games=args.min_games)
+    book.save(args.book)
+    print(f"{len(book)} positions written to {args.book} ({os.path.getsize(args.book)} bytes)")
+    return book
+
+
+if __name__ == '__main__':
+    main()
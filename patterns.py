@@ -0,0 +1,267 @@
+FIVE = 1000000
+OPEN_FOUR = 100000
+FOUR = 10000
+OPEN_THREE = 5000
+# Value of a window of five cells by the number of own stones, for the remaining shapes
+WINDOW_SCORES = [0, 1, 10, 50, 0, 0]
+
+MAX_CACHED_LINES = 1 << 20
+# Distance of the cells around a stone that are candidates for the next move
+NEIGHBORHOOD = 2
+
+_segment_scores = {}
+_line_scores = {}
+_lines_cache = {}
+_neighborhoods_cache = {}
+
+
+def has_five(stones, length):
+    """
+    :stones: Bit mask of the own stones of a line segment.
+    :length: Number of cells of the segment.
+    :return: True if the segment contains five own stones next to each other.
+    """
+    for shift in range(length - 4):
+        if (stones >> shift) & 0b11111 == 0b11111:
+            return True
+    return False
+
+
+def has_open_four(stones, length):
+    """
+    :return: True if the segment contains four own stones with an empty cell on both sides.
+    """
+    for shift in range(length - 5):
+        if (stones >> shift) & 0b111111 == 0b011110:
+            return True
+    return False
+
+
+def segment_score(length, stones):
+    """
+    Scores a maximal line segment of one player, i.e. a part of a line that is bounded by
+    stones of the other player or the border of the grid on both sides.
+    Results are kept in a lookup table indexed by the encoded segment.
+
+    :length: Number of cells of the segment.
+    :stones: Bit mask of the own stones in the segment.
+    :return: Score of the patterns in the segment.
+    """
+    key = (length, stones)
+    if key in _segment_scores:
+        return _segment_scores[key]
+
+    score = 0
+    if length >= 5:
+        empties = [1 << i for i in range(length) if not stones & (1 << i)]
+        if has_five(stones, length):
+            score = FIVE
+        else:
+            # four: one move to five, open four: two different moves to five
+            completions = sum(1 for empty in empties if has_five(stones | empty, length))
+            if completions >= 2:
+                score = OPEN_FOUR
+            else:
+                if completions == 1:
+                    score = FOUR
+                # open three (also broken): one move to an open four
+                if any(has_open_four(stones | empty, length) for empty in empties):
+                    score += OPEN_THREE
+                for shift in range(length - 4):
+                    score += WINDOW_SCORES[((stones >> shift) & 0b11111).bit_count()]
+
+    _segment_scores[key] = score
+    return score
+
+
+def player_line_score(length, own, other):
+    """
+    :return: Sum of the segment scores of the player owning the stones in own on a line.
+    """
+    score = 0
+    start = 0
+    while start < length:
+        # next stone of the other player ends the segment
+        rest = other >> start
+        if rest == 0:
+            end = length
+        else:
+            end = start + (rest & -rest).bit_length() - 1
+        if end - start >= 5:
+            score += segment_score(end - start, (own >> start) & ((1 << (end - start)) - 1))
+        start = end + 1
+    return score
+
+
+def line_score(length, stones_a, stones_b):
+    """
+    Scores a whole line. Results are kept in a lookup table indexed by the encoded line.
+
+    :length: Number of cells of the line.
+    :stones_a: Bit mask of the stones of player A on the line.
+    :stones_b: Bit mask of the stones of player B on the line.
+    :return: Score of the line, positive if it is better for player A.
+    """
+    key = (length, stones_a, stones_b)
+    score = _line_scores.get(key)
+    if score is None:
+        if len(_line_scores) >= MAX_CACHED_LINES:
+            _line_scores.clear()
+        score = player_line_score(length, stones_a, stones_b) - player_line_score(length, stones_b, stones_a)
+        _line_scores[key] = score
+    return score
+
+
+def grid_lines(cols, rows):
+    """
+    Enumerates all rows, columns and diagonals with at least five cells.
+
+    :cols: Number of columns.
+    :rows: Number of rows.
+    :return: Bi-tuple of the list of line lengths and a column-major array that holds, per
+        cell, the four pairs (line_index, position_in_line) of the lines through the cell.
+    """
+    size = (cols, rows)
+    if size not in _lines_cache:
+        lengths = []
+        lines_of_cell = [[[] for _ in range(rows)] for _ in range(cols)]
+        for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            for col in range(cols):
+                for row in range(rows):
+                    # lines start at cells whose predecessor is outside the grid
+                    if 0 <= col - dc < cols and 0 <= row - dr < rows:
+                        continue
+                    cells = []
+                    c, r = col, row
+                    while 0 <= c < cols and 0 <= r < rows:
+                        cells.append((c, r))
+                        c, r = c + dc, r + dr
+                    if len(cells) < 5:
+                        continue
+                    for position, (c, r) in enumerate(cells):
+                        lines_of_cell[c][r].append((len(lengths), position))
+                    lengths.append(len(cells))
+        _lines_cache[size] = (lengths, lines_of_cell)
+
+    return _lines_cache[size]
+
+
+def neighborhoods(cols, rows):
+    """
+    :return: List of tuples of bi-tuples (cell, weight) of the cells within NEIGHBORHOOD cells
+        of each cell, cells numbered col * rows + row. Adjacent cells weigh 2, the others 1.
+    """
+    size = (cols, rows)
+    if size not in _neighborhoods_cache:
+        table = []
+        for col in range(cols):
+            for row in range(rows):
+                table.append(tuple((c * rows + r, 2 if abs(c - col) <= 1 and abs(r - row) <= 1 else 1)
+                                   for c in range(max(0, col - NEIGHBORHOOD), min(cols, col + NEIGHBORHOOD + 1))
+                                   for r in range(max(0, row - NEIGHBORHOOD), min(rows, row + NEIGHBORHOOD + 1))
+                                   if (c, r) != (col, row)))
+        _neighborhoods_cache[size] = table
+
+    return _neighborhoods_cache[size]
+
+
+def near_cells(board, stones, cols, rows, empty=None):
+    """
+    Collects the candidates for the next move of the search, the hints and the tree search.
+
+    :board: Sequence of the cells numbered col * rows + row.
+    :stones: Numbers of the cells with a stone.
+    :empty: Value of an empty cell on the board.
+    :return: Dictionary of the empty cells within NEIGHBORHOOD cells of a stone and their
+        weight, the sum of the weights of the stones as in neighborhoods.
+    """
+    table = neighborhoods(cols, rows)
+    weights = {}
+    for stone in stones:
+        for cell, weight in table[stone]:
+            if board[cell] == empty:
+                weights[cell] = weights.get(cell, 0) + weight
+    return weights
+
+
+def candidates(grid):
+    """
+    :grid: The grid as two-dimensional array of columns and per-column row values.
+    :return: List of bi-tuples (col_index, row_index) of the empty cells within NEIGHBORHOOD
+        cells of a placed stone, the center of an empty grid, or all empty cells if no cell
+        near a stone is empty.
+    """
+    cols, rows = len(grid), len(grid[0])
+    board = [value for column in grid for value in column]
+    stones = [cell for cell, value in enumerate(board) if value is not None]
+    if len(stones) == 0:
+        return [(cols // 2, rows // 2)]
+
+    cells = near_cells(board, stones, cols, rows) or [cell for cell, value in enumerate(board) if value is None]
+    return [divmod(cell, rows) for cell in cells]
+
+
+class PatternEvaluator:
+    """
+    Scores a position by its line patterns (fives, open fours, fours, open threes including
+    broken threes and smaller shapes). The score of every line is kept, so placing or removing
+    a stone only rescores the four lines through its cell.
+    The score is positive if the position is better for player A.
+    """
+
+    def __init__(self, grid):
+        """
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+        """
+        self.cols, self.rows = len(grid), len(grid[0])
+        self.lengths, self.lines_of_cell = grid_lines(self.cols, self.rows)
+        self.stones_a = [0] * len(self.lengths)
+        self.stones_b = [0] * len(self.lengths)
+        for col in range(self.cols):
+            for row in range(self.rows):
+                for line, position in self.lines_of_cell[col][row]:
+                    if grid[col][row] is True:
+                        self.stones_a[line] |= 1 << position
+                    elif grid[col][row] is False:
+                        self.stones_b[line] |= 1 << position
+        self.line_scores = [line_score(length, a, b) for length, a, b in zip(self.lengths, self.stones_a, self.stones_b)]
+        self.score = sum(self.line_scores)
+
+    def __update(self, col, row, is_player_a, is_placed):
+        delta = 0
+        lengths, stones_a, stones_b, line_scores = self.lengths, self.stones_a, self.stones_b, self.line_scores
+        for line, position in self.lines_of_cell[col][row]:
+            bit = 1 << position
+            if is_player_a:
+                stones_a[line] = stones_a[line] | bit if is_placed else stones_a[line] & ~bit
+            else:
+                stones_b[line] = stones_b[line] | bit if is_placed else stones_b[line] & ~bit
+            score = line_score(lengths[line], stones_a[line], stones_b[line])
+            delta += score - line_scores[line]
+            line_scores[line] = score
+        self.score += delta
+        return delta
+
+    def place(self, col, row, is_player_a):
+        """
+        Places a stone on an empty cell and rescores the lines through it.
+
+        :return: Change of the score.
+        """
+        return self.__update(col, row, is_player_a, True)
+
+    def remove(self, col, row, is_player_a):
+        """
+        Removes a stone of the given player and rescores the lines through its cell.
+
+        :return: Change of the score.
+        """
+        return self.__update(col, row, is_player_a, False)
+
+    def move_delta(self, col, row, is_player_a):
+        """
+        :return: Change of the score if the player placed a stone on the empty cell (col, row).
+        """
+        delta = self.place(col, row, is_player_a)
+        self.remove(col, row, is_player_a)
+        return delta
@@ -0,0 +1,231 @@
+import collections
+import os
+import struct
+
+MAGIC = b"GR"
+VERSION = 1
+
+# Game modes
+MODE_STANDARD = 0
+MODE_ADJUSTABLE = 1
+MODE_REMOVE = 2
+MODE_COMPUTER = 3
+MODE_SIMULATION = 4
+
+# Results
+RESULT_RUNNING = 0
+RESULT_WON_BY_A = 1
+RESULT_WON_BY_B = 2
+RESULT_DRAW = 3
+
+REMOVE_1 = 0xFF
+REMOVE_2 = 0xFFFF
+# The number of moves is stored in two bytes
+MAX_MOVES = 0xFFFF
+
+_HEADER = struct.Struct(">2sBBBBB")
+
+# A recorded game. moves is the list of bi-tuples (col_index, row_index) of the placed
+# stones in the order they were played, with None for the removal of the stone placed last.
+GameRecord = collections.namedtuple("GameRecord", "cols rows mode result name_a name_b moves")
+
+
+def move_width(cols, rows):
+    """
+    :return: Number of bytes per move, one byte if all cells and the removal fit into a byte.
+    """
+    return 1 if cols * rows < REMOVE_1 else 2
+
+
+def net_moves(moves):
+    """
+    :moves: Moves as in GameRecord.moves.
+    :return: The placed stones that were not removed again, in the order they were played.
+        They replay to the same grid as the moves.
+    """
+    placed = []
+    for move in moves:
+        if move is None:
+            if len(placed) > 0:
+                placed.pop()
+        else:
+            placed.append(move)
+    return placed
+
+
+def encode_game(record):
+    """
+    Encodes a game as header with board size, mode, result and player names, followed by
+    the number of moves and one or two bytes per move. A game with more than MAX_MOVES moves,
+    possible by placing and removing stones again and again, is stored with its net moves.
+
+    :record: The GameRecord.
+    :return: The encoded game as bytes.
+    """
+    name_a = record.name_a.encode("utf-8")[:255]
+    name_b = record.name_b.encode("utf-8")[:255]
+    moves = record.moves if len(record.moves) <= MAX_MOVES else net_moves(record.moves)
+    cells = [REMOVE_2 if move is None else move[0] * record.rows + move[1] for move in moves]
+
+    data = bytearray(_HEADER.pack(MAGIC, VERSION, record.cols, record.rows, record.mode, record.result))
+    data.append(len(name_a))
+    data += name_a
+    data.append(len(name_b))
+    data += name_b
+    data += struct.pack(">H", len(cells))
+    if move_width(record.cols, record.rows) == 1:
+        data += bytes(REMOVE_1 if cell == REMOVE_2 else cell for cell in cells)
+    else:
+        data += struct.pack(f">{len(cells)}H", *cells)
+    return bytes(data)
+
+
+def write_games(records, path):
+    """
+    Appends games to a file with a single write, so games written at the same time by
+    several games or processes don't interleave.
+
+    :records: List of GameRecords.
+    :path: Path of the game file.
+    """
+    data = b"".join(encode_game(record) for record in records)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def write_game(record, path):
+    write_games([record], path)
+
+
+def decode_moves(data, cols, rows):
+    """
+    :data: Encoded moves.
+    :return: List of moves as in GameRecord.moves.
+    """
+    if move_width(cols, rows) == 1:
+        return [None if cell == REMOVE_1 else divmod(cell, rows) for cell in data]
+    return [None if cell == REMOVE_2 else divmod(cell, rows) for (cell,) in struct.iter_unpack(">H", data)]
+
+
+def decode_game(buffer, offset=0):
+    """
+    Decodes a game from a buffer without copying the buffer, e.g. from a memory-mapped file.
+
+    :buffer: bytes, bytearray, mmap or memoryview holding encoded games.
+    :offset: Position of the game in the buffer.
+    :return: Bi-tuple of the GameRecord and the position after the game.
+    """
+    if offset + _HEADER.size > len(buffer):
+        raise ValueError("game record is cut off")
+    magic, version, cols, rows, mode, result = _HEADER.unpack_from(buffer, offset)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a game record")
+
+    position = offset + _HEADER.size
+    names = []
+    for _ in range(2):
+        if position >= len(buffer):
+            raise ValueError("game record is cut off")
+        length = buffer[position]
+        names.append(bytes(buffer[position + 1:position + 1 + length]).decode("utf-8", errors="replace"))
+        position += 1 + length
+
+    if position + 2 > len(buffer):
+        raise ValueError("game record is cut off")
+    count = struct.unpack_from(">H", buffer, position)[0]
+    position += 2
+    end = position + count * move_width(cols, rows)
+    if end > len(buffer):
+        raise ValueError("game record is cut off")
+
+    moves = decode_moves(memoryview(buffer)[position:end], cols, rows)
+    return GameRecord(cols, rows, mode, result, names[0], names[1], moves), end
+
+
+def read_game(f):
+    """
+    Reads the next game from a binary file.
+
+    :f: Binary file positioned at the start of a game.
+    :return: The GameRecord or None at the end of the file. A game cut off by an interrupted
+        write at the end of the file is treated as the end of the file.
+    """
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+
+    magic, version, cols, rows, mode, result = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a game record")
+
+    names = []
+    for _ in range(2):
+        length = f.read(1)
+        name = f.read(length[0]) if len(length) == 1 else b""
+        if len(length) < 1 or len(name) < length[0]:
+            return None
+        names.append(name.decode("utf-8", errors="replace"))
+
+    count = f.read(2)
+    if len(count) < 2:
+        return None
+    size = struct.unpack(">H", count)[0] * move_width(cols, rows)
+    data = f.read(size)
+    if len(data) < size:
+        return None
+
+    return GameRecord(cols, rows, mode, result, names[0], names[1], decode_moves(data, cols, rows))
+
+
+def read_games(path):
+    """
+    Streams the games of a file one by one, without loading the whole file.
+
+    :path: Path of the game file.
+    :return: Generator of GameRecords.
+    """
+    with open(path, "rb") as f:
+        while True:
+            record = read_game(f)
+            if record is None:
+                return
+            yield record
+
+
+def apply_move(grid, placed, move):
+    """
+    Applies a recorded move to a grid.
+
+    :grid: The grid, changed in place.
+    :placed: List of the stones on the grid in the order they were placed, changed in place.
+    :move: Move as in GameRecord.moves.
+    """
+    if move is None:
+        if len(placed) > 0:
+            col, row = placed.pop()
+            grid[col][row] = None
+    else:
+        col, row = move
+        # a removal passes the turn back, so player A is at turn whenever the number of stones is even
+        grid[col][row] = len(placed) % 2 == 0
+        placed.append(move)
+
+
+def replay(record, move_count=None):
+    """
+    Reconstructs the grid of a recorded game.
+
+    :record: The GameRecord.
+    :move_count: Number of moves to replay, removals included. All moves by default.
+    :return: The grid as two-dimensional array of columns and per-column row values,
+        as used by ui.display_grid.
+    """
+    grid = [[None] * record.rows for _ in range(record.cols)]
+    placed = []
+    moves = record.moves if move_count is None else record.moves[:move_count]
+    for move in moves:
+        apply_move(grid, placed, move)
+    return grid
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+
+import scorelog
+
+
+class ScoreDatabase:
+    """
+    Scoreboard stored in an SQLite database with an index on the score, so leaderboard
+    pages and single players are looked up without loading all players.
+    """
+
+    def __init__(self, path):
+        """
+        :path: Path of the database file, created if it doesn't exist.
+        """
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS scores (name TEXT PRIMARY KEY, score INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, name)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY)")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_result(self, name, points=1):
+        """
+        Adds points to the score of a player.
+
+        :name: Name of the player.
+        :points: Points to add.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO scores (name, score) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET score = score + excluded.score",
+                (name, points))
+
+    def top(self, count, offset=0):
+        """
+        :count: Maximum number of players.
+        :offset: Number of leading players to skip, for paging.
+        :return: List of bi-tuples (name, score) of players with scores > 0, in descending order of score.
+        """
+        return self.connection.execute(
+            "SELECT name, score FROM scores WHERE score > 0 ORDER BY score DESC, name LIMIT ? OFFSET ?",
+            (count, offset)).fetchall()
+
+    def lookup(self, name):
+        """
+        :name: Name of the player.
+        :return: Bi-tuple (rank, score) of the player or None if the player has no score > 0.
+        """
+        row = self.connection.execute("SELECT score FROM scores WHERE name = ? AND score > 0", (name,)).fetchone()
+        if row is None:
+            return None
+
+        score = row[0]
+        better = self.connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE score > ? OR (score = ? AND name < ?)",
+            (score, score, name)).fetchone()[0]
+        return better + 1, score
+
+    def count(self):
+        """
+        :return: Number of players with scores > 0.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM scores WHERE score > 0").fetchone()[0]
+
+    def migrate(self, path=scorelog.SCOREBOARD_FILE):
+        """
+        Adds the scores of a scoreboard file to the database. Every file is imported only once,
+        recognized by its absolute path. A missing or unreadable file is not marked as imported,
+        so it is imported once it exists.
+
+        :path: Path of the scoreboard file.
+        :return: True if the file was imported now.
+        """
+        source = os.path.abspath(path)
+        if self.connection.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone() is not None:
+            return False
+        if not os.path.isfile(path):
+            return False
+
+        scores, record_count, is_readable = scorelog.read_log(path)
+        if record_count == 0 and not is_readable:
+            return False
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (name, score) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET score = score + excluded.score",
+                scores.items())
+            self.connection.execute("INSERT INTO migrations (source) VALUES (?)", (source,))
+        return True
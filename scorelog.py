@@ -0,0 +1,240 @@
+import os
+import pickle
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # no file locking on platforms without fcntl, appends and replaces are still atomic
+    fcntl = None
+
+SCOREBOARD_FILE = "scoreboard.dat"
+COMPACT_AFTER = 200
+
+
+class _Lock:
+    """
+    Advisory lock on a file next to the scoreboard. Appends share the lock, compaction holds
+    it exclusively, so no result is appended to a file that is being replaced.
+    """
+
+    def __init__(self, path, exclusive):
+        self.path = path + ".lock"
+        self.exclusive = exclusive
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.file = open(self.path, "a")
+            fcntl.flock(self.file, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+
+
+def read_log(path=SCOREBOARD_FILE):
+    """
+    Rebuilds the scores from the log. The log is a sequence of pickled records: a dictionary
+    of player names and scores replaces all scores (a scoreboard file of older versions is a
+    single such record), a bi-tuple (name, points) adds points to a player.
+
+    :path: Path of the scoreboard file.
+    :return: Tri-tuple of the dictionary of scores, the number of records read and whether the
+        whole file was readable. Reading stops at the first damaged record, e.g. an interrupted append.
+    """
+    scores = {}
+    record_count = 0
+    try:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    return scores, record_count, True
+                except Exception:
+                    return scores, record_count, False
+
+                if type(record) == dict:
+                    scores = dict(record)
+                elif type(record) == tuple and len(record) == 2:
+                    name, points = record
+                    scores[name] = scores.get(name, 0) + points
+                else:
+                    return scores, record_count, False
+                record_count += 1
+
+    except OSError:
+        return {}, 0, True
+
+
+def write_snapshot(scores, path=SCOREBOARD_FILE):
+    """
+    Replaces the log with a single record of all scores. The scores are written to a temporary
+    file first, which then replaces the log atomically, so an interrupted write never leaves a
+    damaged scoreboard behind.
+
+    :scores: Dictionary of player names and their scores.
+    :path: Path of the scoreboard file.
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        pickle.dump(scores, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+def _is_log(path):
+    """
+    :return: False if the file exists but doesn't start like a pickled record, e.g. a damaged or foreign file.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(1) in (b"", pickle.PROTO)
+    except OSError:
+        return True
+
+
+def append_results(results, path=SCOREBOARD_FILE):
+    """
+    Appends results to the log with a single write, without reading the scoreboard. A file that
+    is not a log is replaced first, results appended behind it could never be read.
+
+    :results: List of bi-tuples (name, points).
+    :path: Path of the scoreboard file.
+    """
+    if not _is_log(path):
+        load(path)
+    records = b"".join(pickle.dumps(result) for result in results)
+    with _Lock(path, exclusive=False):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, records)
+        finally:
+            os.close(fd)
+
+
+def append_result(name, points=1, path=SCOREBOARD_FILE):
+    """
+    Appends one result to the log.
+
+    :name: Name of the player.
+    :points: Points to add to the score of the player.
+    :path: Path of the scoreboard file.
+    """
+    append_results([(name, points)], path)
+
+
+def save(scores, path=SCOREBOARD_FILE):
+    with _Lock(path, exclusive=True):
+        write_snapshot(scores, path)
+
+
+def load(path=SCOREBOARD_FILE):
+    """
+    Rebuilds the scores from the log and compacts the log into a single snapshot record
+    when many results were appended or it is damaged, also if no record at all was readable,
+    so results appended later are readable again.
+
+    :path: Path of the scoreboard file.
+    :return: Dictionary of player names and their scores. Empty if no record was readable.
+    """
+    scores, record_count, is_readable = read_log(path)
+    if record_count > COMPACT_AFTER or not is_readable:
+        with _Lock(path, exclusive=True):
+            # read again, results may have been appended in the meantime
+            scores, record_count, is_readable = read_log(path)
+            write_snapshot(scores, path)
+
+    return scores
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class ScoreboardService:
+    """
+    Keeps the scoreboard in memory and writes results behind: they are collected and
+    appended in one write when enough results are pending, when the flush interval passed,
+    or when the service is closed. The scores are read again when the file was changed by
+    someone else.
+    """
+
+    def __init__(self, path=SCOREBOARD_FILE, flush_interval=5.0, flush_threshold=20):
+        """
+        :path: Path of the scoreboard file.
+        :flush_interval: Seconds after which pending results are written, None to write them
+            only at the threshold or when flush is called, e.g. by an owner with its own schedule.
+        :flush_threshold: Number of pending results that are written immediately.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.pending = []
+        self.timer = None
+        self.lock = threading.RLock()
+        self.__reload()
+
+    def __reload(self):
+        self.saved_scores = load(self.path)
+        self.version = _file_version(self.path)
+
+    def scores(self):
+        """
+        :return: Dictionary of player names and their scores, including pending results.
+        """
+        with self.lock:
+            if _file_version(self.path) != self.version:
+                self.__reload()
+
+            scores = dict(self.saved_scores)
+            for name, points in self.pending:
+                scores[name] = scores.get(name, 0) + points
+            return scores
+
+    def add_result(self, name, points=1):
+        """
+        Adds points to the score of a player, written with the next flush.
+
+        :name: Name of the player.
+        :points: Points to add.
+        """
+        with self.lock:
+            self.pending.append((name, points))
+            if len(self.pending) >= self.flush_threshold:
+                self.flush()
+            elif self.timer is None and self.flush_interval is not None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """
+        Appends all pending results to the file.
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if len(self.pending) == 0:
+                return
+
+            is_current = _file_version(self.path) == self.version
+            append_results(self.pending, self.path)
+            if is_current:
+                # the appended results are the only change, no need to read the file again
+                for name, points in self.pending:
+                    self.saved_scores[name] = self.saved_scores.get(name, 0) + points
+                self.version = _file_version(self.path)
+            self.pending = []
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,554 @@
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+
+import broadcast
+import gomoku
+import matchmaking
+import records
+import scorelog
+
+DEFAULT_PORT = 4242
+MAX_LINE = 1024
+# connections waiting to be accepted, many players connect at once when a tournament starts
+BACKLOG = 1024
+MIN_SIZE, MAX_SIZE = 10, 20
+STANDARD_SIZE = 15
+
+logger = logging.getLogger(__name__)
+EXPIRE_INTERVAL = 1.0
+# seconds after which the wins collected by the scoreboard are written
+FLUSH_INTERVAL = 5.0
+
+MODE_NAMES = {
+    records.MODE_STANDARD: 'standard',
+    records.MODE_ADJUSTABLE: 'adjustable',
+    records.MODE_REMOVE: 'remove',
+}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class Player:
+    """
+    Connection of a player. Lines are written to the buffer of the connection without waiting,
+    the handler of the connection waits for the buffer to drain after every command.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.name = None
+        self.game = None
+        self.ticket = None
+        self.subscription = None
+        self.handler = None
+        self.is_closed = False
+
+    def send(self, *words):
+        if not self.writer.is_closing():
+            self.writer.write((' '.join(str(word) for word in words) + '\n').encode('utf-8'))
+
+
+class Game:
+    """
+    Game of two connected players, played by the rules of gomoku.GameEngine, and its spectators.
+    Cells are sent as "row col" with the numbering of ui.display_grid, like the console input.
+    """
+
+    GLYPHS = {None: '.', True: 'X', False: 'O'}
+
+    def __init__(self, game_id, cols, rows, mode, player_a):
+        self.id = game_id
+        self.mode = mode
+        self.engine = gomoku.GameEngine(cols, rows, allow_remove=mode == records.MODE_REMOVE)
+        self.players = [player_a, None]
+        self.spectators = broadcast.Channel(self.snapshot)
+
+    def is_open(self):
+        return self.players[1] is None
+
+    def player_at_turn(self):
+        return self.players[0] if self.engine.is_player_a else self.players[1]
+
+    def cell(self, move):
+        """
+        :move: Bi-tuple (col_index, row_index).
+        :return: The words "row col" of the cell in the numbering of the console.
+        """
+        col, row = move
+        return self.engine.rows - row, col + 1
+
+    def move(self, words):
+        """
+        :words: The words row and col of a cell in the numbering of the console.
+        :return: Bi-tuple (col_index, row_index).
+        """
+        try:
+            row, col = map(int, words)
+        except ValueError:
+            raise ProtocolError('expected MOVE <row> <col>')
+        return col - 1, self.engine.rows - row
+
+    def snapshot(self):
+        """
+        :return: The words SNAPSHOT <game id> <cols> <rows> <name A> <name B or -> <stones> <cells>,
+            the cells as one word of the rows from top to bottom like ui.display_grid, with . X and O.
+        """
+        engine = self.engine
+        rows = reversed(list(zip(*engine.grid)))
+        cells = ''.join(map(self.GLYPHS.__getitem__, itertools.chain.from_iterable(rows)))
+        name_b = self.players[1].name if self.players[1] is not None else '-'
+        return ('SNAPSHOT', self.id, engine.cols, engine.rows, self.players[0].name, name_b,
+                engine.state.stone_count, cells)
+
+    def broadcast(self, *words):
+        for player in self.players:
+            if player is not None:
+                player.send(*words)
+        self.spectators.publish(*words)
+
+    def finish(self, *words):
+        """
+        Sends the last event of the game to the players and spectators.
+        """
+        for player in self.players:
+            if player is not None:
+                player.send(*words)
+        self.spectators.close(*words)
+
+    def describe(self):
+        return f"{self.id}:{self.engine.cols}x{self.engine.rows}:{MODE_NAMES[self.mode]}"
+
+
+def describe_kind(kind):
+    mode, cols, rows = kind
+    return f"{cols}x{rows}:{MODE_NAMES[mode]}"
+
+
+class GameServer:
+    """
+    Hosts many games on one asyncio event loop, one coroutine per connection and no thread per
+    player. Games live in memory. Wins are added to a scorelog.ScoreboardService, which collects
+    them and appends them to the scoreboard file behind, so the file is never written by two
+    games at once and other processes reading the scoreboard see consistent scores. The scoreboard
+    is loaded when the server starts and flushed every FLUSH_INTERVAL seconds, without a timer
+    thread of its own, so files are read and written by one worker thread, in the order of the
+    commands, and never on the event loop.
+
+    Protocol: one command per line, answered with OK <details> or ERROR <message>, and events
+    sent as they happen:
+
+    NAME <name>               set the name of the player, needed to play
+    NEW [<cols> <rows>] [remove]  open a game, 15x15 without size, answered with OK <game id>
+    LIST [running]            OK <game id>:<cols>x<rows>:<mode> ... of the open or running games
+    JOIN <game id>            join an open game as player B
+    MOVE <row> <col>          place a stone, the cell numbered like ui.display_grid
+    REMOVE                    take back the stone placed last in a game with remove
+    QUEUE [<cols> <rows>] [remove]  wait for a player wanting the same kind of game, the game
+                              starts with START as soon as one is found
+    CANCEL                    leave the queue
+    WATCH <game id>           follow a game as spectator, starting with a SNAPSHOT
+    UNWATCH                   stop following the game
+    STATS                     OK <key>=<value> ... of the queues, see matchmaking.Matchmaker.metrics
+    SCORES [<count>]          OK <name>:<score> ... of the best players
+    QUIT                      leave the game and close the connection
+
+    Events: START <game id> <cols> <rows> <X|O> <name of the other player>, TURN,
+    MOVED <X|O> <row> <col>, REMOVED <row> <col>, WON <name>, DRAW, ABORTED, TIMEOUT when
+    nobody was found in the queue.
+
+    Spectators get the events MOVED, REMOVED, WON, DRAW and ABORTED of the players,
+    STARTED <name A> <name B> and snapshots as described in broadcast.Channel and Game.snapshot.
+    """
+
+    def __init__(self, scoreboard_path=scorelog.SCOREBOARD_FILE, queue_timeout=matchmaking.DEFAULT_TIMEOUT):
+        """
+        :scoreboard_path: Path of the scoreboard file to add the wins to.
+        :queue_timeout: Seconds a player waits in the queue at most.
+        """
+        self.scoreboard_path = scoreboard_path
+        self.scoreboard = None
+        self.matchmaker = matchmaking.Matchmaker(queue_timeout)
+        self.games = {}
+        self.game_ids = itertools.count(1)
+        self.players = set()
+        self.server = None
+        self.expire_task = None
+        self.flush_task = None
+        self.io = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='gomoku-io')
+        self.commands = {
+            'NAME': self.command_name,
+            'NEW': self.command_new,
+            'LIST': self.command_list,
+            'JOIN': self.command_join,
+            'MOVE': self.command_move,
+            'REMOVE': self.command_remove,
+            'QUEUE': self.command_queue,
+            'CANCEL': self.command_cancel,
+            'WATCH': self.command_watch,
+            'UNWATCH': self.command_unwatch,
+            'STATS': self.command_stats,
+            'SCORES': self.command_scores,
+            'QUIT': self.command_quit,
+        }
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """
+        Loads the scoreboard and starts listening. Port 0 picks a free port.
+
+        :return: The port the server listens on.
+        """
+        self.scoreboard = await self.run_io(scorelog.ScoreboardService, self.scoreboard_path, None)
+        self.flush_task = asyncio.create_task(self.flush_scores())
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE, backlog=BACKLOG)
+        self.expire_task = asyncio.create_task(self.expire())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Stops listening, closes all connections and writes the pending scores.
+        """
+        for task in (self.expire_task, self.flush_task):
+            if task is not None:
+                task.cancel()
+        if self.server is not None:
+            self.server.close()
+            handlers = [player.handler for player in self.players]
+            for player in list(self.players):
+                player.writer.close()
+            # the handlers end as soon as their reader sees the closed connection
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self.server.wait_closed()
+        if self.scoreboard is not None:
+            await self.run_io(self.scoreboard.flush)
+        self.io.shutdown()
+
+    def run_io(self, function, *args):
+        """
+        Runs blocking file I/O in the worker thread.
+
+        :return: asyncio.Future of the result.
+        """
+        return asyncio.get_running_loop().run_in_executor(self.io, function, *args)
+
+    def write_behind(self, description, function, *args):
+        """
+        Runs blocking file I/O in the worker thread without waiting for it, failures are logged.
+        """
+        def log_failure(future):
+            if not future.cancelled() and future.exception() is not None:
+                logger.error('%s failed', description, exc_info=future.exception())
+        self.run_io(function, *args).add_done_callback(log_failure)
+
+    async def handle(self, reader, writer):
+        player = Player(writer)
+        player.handler = asyncio.current_task()
+        self.players.add(player)
+        player.send('HELLO gomoku')
+        try:
+            while not player.is_closed:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # line longer than the limit of the reader
+                    player.send('ERROR line too long')
+                    break
+                if not line:
+                    break
+
+                words = line.decode('utf-8', errors='replace').split()
+                if len(words) > 0:
+                    command = self.commands.get(words[0].upper())
+                    try:
+                        if command is None:
+                            raise ProtocolError(f'unknown command {words[0]}')
+                        result = command(player, words[1:])
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except ProtocolError as error:
+                        player.send('ERROR', error)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(player)
+            self.players.discard(player)
+            writer.close()
+
+    async def expire(self):
+        """
+        Removes the players from the queue who waited too long.
+        """
+        while True:
+            await asyncio.sleep(EXPIRE_INTERVAL)
+            for ticket in self.matchmaker.expire():
+                ticket.player.ticket = None
+                ticket.player.send('TIMEOUT')
+
+    async def flush_scores(self):
+        """
+        Writes the wins collected by the scoreboard.
+        """
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            self.write_behind('writing the scoreboard', self.scoreboard.flush)
+
+    def leave(self, player):
+        """
+        Removes the player from the queue, the spectators and its game. A running game is aborted
+        without a winner.
+        """
+        if player.ticket is not None:
+            self.matchmaker.cancel(player.ticket)
+            player.ticket = None
+        self.__unwatch(player)
+        game = player.game
+        if game is None:
+            return
+        for other in game.players:
+            if other is not None and other is not player:
+                other.send('ABORTED')
+                other.game = None
+        game.spectators.close('ABORTED')
+        player.game = None
+        self.games.pop(game.id, None)
+
+    def command_name(self, player, words):
+        if player.game is not None or player.ticket is not None:
+            raise ProtocolError('the name cannot be changed during a game or in the queue')
+        if len(words) != 1:
+            raise ProtocolError('expected NAME <name> without spaces')
+        player.name = words[0]
+        player.send('OK', player.name)
+
+    def __check_free(self, player):
+        if player.name is None:
+            raise ProtocolError('set a name first')
+        if player.game is not None:
+            raise ProtocolError('already in a game')
+        if player.ticket is not None:
+            raise ProtocolError('already in the queue')
+        if player.subscription is not None and player.subscription.is_subscribed():
+            raise ProtocolError('watching a game')
+
+    def __parse_kind(self, words, command):
+        """
+        :words: The words [<cols> <rows>] [remove] of NEW and QUEUE.
+        :return: Tri-tuple (mode, cols, rows).
+        """
+        mode = records.MODE_STANDARD
+        if len(words) > 0 and words[-1].lower() == 'remove':
+            mode = records.MODE_REMOVE
+            words = words[:-1]
+        if len(words) == 0:
+            cols = rows = STANDARD_SIZE
+        else:
+            try:
+                cols, rows = map(int, words)
+            except ValueError:
+                raise ProtocolError(f'expected {command} [<cols> <rows>] [remove]')
+            if not (MIN_SIZE <= cols <= MAX_SIZE and MIN_SIZE <= rows <= MAX_SIZE):
+                raise ProtocolError(f'the grid needs {MIN_SIZE} to {MAX_SIZE} columns and rows')
+            if mode == records.MODE_STANDARD:
+                mode = records.MODE_ADJUSTABLE
+        return mode, cols, rows
+
+    def command_new(self, player, words):
+        self.__check_free(player)
+        mode, cols, rows = self.__parse_kind(words, 'NEW')
+        game = Game(next(self.game_ids), cols, rows, mode, player)
+        self.games[game.id] = game
+        player.game = game
+        player.send('OK', game.id)
+
+    def command_list(self, player, words):
+        is_open = not (len(words) > 0 and words[0].lower() == 'running')
+        player.send('OK', *[game.describe() for game in self.games.values() if game.is_open() == is_open])
+
+    def __game(self, words):
+        try:
+            return self.games[int(words[0])]
+        except (IndexError, ValueError, KeyError):
+            raise ProtocolError('no such game')
+
+    def command_join(self, player, words):
+        self.__check_free(player)
+        game = self.__game(words)
+        if not game.is_open():
+            raise ProtocolError('the game is full')
+        if game.players[0].name == player.name:
+            raise ProtocolError('the players need different names')
+
+        player.send('OK', game.id)
+        self.start_game(game, player)
+
+    def command_queue(self, player, words):
+        self.__check_free(player)
+        kind = self.__parse_kind(words, 'QUEUE')
+        waiting = self.matchmaker.peek(kind)
+        if waiting is not None and waiting.player.name == player.name:
+            raise ProtocolError('a player with the same name is waiting')
+
+        ticket, opponent = self.matchmaker.enqueue(player, kind)
+        player.send('OK')
+        if opponent is None:
+            player.ticket = ticket
+            return
+        opponent.player.ticket = None
+        mode, cols, rows = kind
+        game = Game(next(self.game_ids), cols, rows, mode, opponent.player)
+        self.games[game.id] = game
+        opponent.player.game = game
+        self.start_game(game, player)
+
+    def command_cancel(self, player, words):
+        if player.ticket is None:
+            raise ProtocolError('not in the queue')
+        self.matchmaker.cancel(player.ticket)
+        player.ticket = None
+        player.send('OK')
+
+    def __unwatch(self, player):
+        subscription = player.subscription
+        player.subscription = None
+        if subscription is not None and subscription.is_subscribed():
+            subscription.channel.unsubscribe(subscription)
+            return True
+        return False
+
+    def command_watch(self, player, words):
+        if player.game is not None or player.ticket is not None:
+            raise ProtocolError('cannot watch while playing or in the queue')
+        game = self.__game(words)
+        self.__unwatch(player)
+        player.send('OK', game.id)
+        player.subscription = game.spectators.subscribe(player.writer)
+
+    def command_unwatch(self, player, words):
+        if not self.__unwatch(player):
+            raise ProtocolError('not watching a game')
+        player.send('OK')
+
+    def command_stats(self, player, words):
+        metrics = self.matchmaker.metrics()
+        depths = metrics.pop('depths')
+        player.send('OK', *[f'{key}={value:.3f}' if type(value) == float else f'{key}={value}'
+                            for key, value in metrics.items()],
+                    *[f'{describe_kind(kind)}={depth}' for kind, depth in sorted(depths.items())])
+
+    def start_game(self, game, player_b):
+        """
+        Adds the second player to the game and starts it, player A places the first stone.
+        """
+        player_a = game.players[0]
+        game.players[1] = player_b
+        player_b.game = game
+        engine = game.engine
+        player_a.send('START', game.id, engine.cols, engine.rows, 'X', player_b.name)
+        player_b.send('START', game.id, engine.cols, engine.rows, 'O', player_a.name)
+        player_a.send('TURN')
+        game.spectators.publish('STARTED', player_a.name, player_b.name)
+
+    def __running_game(self, player):
+        game = player.game
+        if game is None or game.is_open():
+            raise ProtocolError('not in a running game')
+        if game.player_at_turn() is not player:
+            raise ProtocolError('not your turn')
+        return game
+
+    def command_move(self, player, words):
+        game = self.__running_game(player)
+        if len(words) != 2:
+            raise ProtocolError('expected MOVE <row> <col>')
+        move = game.move(words)
+        stone = 'X' if game.engine.is_player_a else 'O'
+        try:
+            game.engine.play(move)
+        except ValueError:
+            raise ProtocolError('not an empty cell')
+
+        player.send('OK')
+        game.broadcast('MOVED', stone, *game.cell(move))
+        self.next_turn(game)
+
+    def command_remove(self, player, words):
+        game = self.__running_game(player)
+        try:
+            move = game.engine.remove()
+        except ValueError as error:
+            raise ProtocolError(str(error))
+        if move is None:
+            raise ProtocolError('no stone to remove')
+
+        player.send('OK')
+        game.broadcast('REMOVED', *game.cell(move))
+        self.next_turn(game)
+
+    def next_turn(self, game):
+        engine = game.engine
+        if engine.status() == gomoku.RUNNING:
+            game.player_at_turn().send('TURN')
+            return
+
+        name_a, name_b = game.players[0].name, game.players[1].name
+        if engine.status() == gomoku.DRAW:
+            game.finish('DRAW')
+        else:
+            winner = name_a if engine.status() == gomoku.WON_BY_A else name_b
+            self.write_behind(f'adding the win of {winner}', self.scoreboard.add_result, winner)
+            game.finish('WON', winner)
+        if gomoku.GAME_RECORD_FILE:
+            self.write_behind(f'writing game {game.id}', records.write_game,
+                              engine.record(name_a, name_b, game.mode), gomoku.GAME_RECORD_FILE)
+
+        for player in game.players:
+            player.game = None
+        self.games.pop(game.id, None)
+
+    async def command_scores(self, player, words):
+        try:
+            count = int(words[0]) if len(words) > 0 else 10
+        except ValueError:
+            raise ProtocolError('expected SCORES [<count>]')
+        try:
+            scoreboard = await self.run_io(self.scoreboard.scores)
+        except OSError as error:
+            logger.error('reading the scoreboard failed', exc_info=error)
+            raise ProtocolError('the scoreboard is not available')
+        scores = sorted(((score, name) for name, score in scoreboard.items() if score > 0),
+                        key=lambda item: (-item[0], item[1]))
+        player.send('OK', *[f'{name}:{score}' for score, name in scores[:count]])
+
+    def command_quit(self, player, words):
+        player.send('OK')
+        player.is_closed = True
+
+
+async def serve(host, port):
+    server = GameServer()
+    port = await server.start(host, port)
+    print(f'gomoku server listening on {host}:{port}')
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gomoku serve', description='Hosts games over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import ai
+import gomoku
+import mcts
+import records
+
+DEFAULT_CHUNK_SIZE = 100
+# the grid sizes of the interactive game
+MIN_SIZE, MAX_SIZE = 10, 20
+MCTS_PLAYOUTS = 400
+
+# Monte Carlo tree search of the worker process, its tree is reused between the moves of a game
+_mcts_engine = None
+
+
+def random_policy(state, is_player_a, generator):
+    """
+    Places on a random empty cell.
+
+    :state: gomoku.GameState of the running game.
+    :is_player_a: Boolean that is true if the policy plays player A.
+    :generator: random.Random instance of the worker.
+    :return: Bi-tuple (col_index, row_index) of an empty cell.
+    """
+    grid = state.grid
+    # sampling is fast as long as most cells are empty
+    if state.stone_count < state.cols * state.rows * 0.75:
+        while True:
+            col, row = generator.randrange(state.cols), generator.randrange(state.rows)
+            if grid[col][row] is None:
+                return (col, row)
+
+    return generator.choice([(col, row) for col in range(state.cols) for row in range(state.rows)
+                             if grid[col][row] is None])
+
+
+def neighbor_policy(state, is_player_a, generator):
+    """
+    Places on a random empty cell next to the stone placed last, like a player answering locally.
+    """
+    if len(state.moves) > 0:
+        last_col, last_row = state.moves[-1]
+        cells = [(col, row)
+                 for col in range(max(0, last_col - 1), min(state.cols, last_col + 2))
+                 for row in range(max(0, last_row - 1), min(state.rows, last_row + 2))
+                 if state.grid[col][row] is None]
+        if len(cells) > 0:
+            return generator.choice(cells)
+
+    return random_policy(state, is_player_a, generator)
+
+
+def ai_policy(state, is_player_a, generator):
+    """
+    Plays with the alpha-beta search of the computer opponent with a small time budget.
+    """
+    return ai.choose_move(state.grid, is_player_a, time_budget=0.02)
+
+
+def mcts_policy(state, is_player_a, generator):
+    """
+    Plays with the Monte Carlo tree search with a fixed number of playouts in the worker process.
+    """
+    global _mcts_engine
+    if _mcts_engine is None:
+        _mcts_engine = mcts.MctsEngine(workers=0, seed=generator.getrandbits(32))
+    return _mcts_engine.choose_move(state.grid, is_player_a, time_budget=None, playouts=MCTS_PLAYOUTS)
+
+
+POLICIES = {
+    'random': random_policy,
+    'neighbor': neighbor_policy,
+    'ai': ai_policy,
+    'mcts': mcts_policy,
+}
+
+
+def simulate_game(cols, rows, policy_a, policy_b, generator):
+    """
+    Plays one game headless with the rules of play_game.
+
+    :cols: Number of columns.
+    :rows: Number of rows.
+    :policy_a: Move policy function of player A.
+    :policy_b: Move policy function of player B.
+    :generator: random.Random instance passed to the policies.
+    :return: The gomoku.GameEngine of the finished game.
+    """
+    engine = gomoku.GameEngine(cols, rows)
+    while engine.status() == gomoku.RUNNING:
+        policy = policy_a if engine.is_player_a else policy_b
+        engine.play(policy(engine.state, engine.is_player_a, generator))
+
+    return engine
+
+
+def run_chunk(task):
+    """
+    Plays a chunk of games in a worker process.
+
+    :task: Tuple (cols, rows, policy name of A, policy name of B, number of games, seed, record path).
+        If the record path is not None, the games of the chunk are appended to it in one write.
+    :return: Dictionary with the number of games, wins of A and B, draws and placed stones.
+    """
+    cols, rows, name_a, name_b, games, seed, record_path = task
+    generator = random.Random(seed)
+    policy_a, policy_b = POLICIES[name_a], POLICIES[name_b]
+    result = {'games': games, 'wins_a': 0, 'wins_b': 0, 'draws': 0, 'moves': 0}
+    game_records = []
+    for _ in range(games):
+        engine = simulate_game(cols, rows, policy_a, policy_b, generator)
+        result['moves'] += engine.state.stone_count
+        if engine.status() == gomoku.DRAW:
+            result['draws'] += 1
+        elif engine.status() == gomoku.WON_BY_A:
+            result['wins_a'] += 1
+        else:
+            result['wins_b'] += 1
+        if record_path is not None:
+            game_records.append(engine.record(name_a, name_b, records.MODE_SIMULATION))
+
+    if record_path is not None:
+        records.write_games(game_records, record_path)
+    return result
+
+
+def simulate(games, cols, rows, policy_a='random', policy_b='random', workers=None,
+             chunk_size=DEFAULT_CHUNK_SIZE, seed=0, on_chunk=None, record_path=None):
+    """
+    Plays games in a process pool. The games are split into chunks whose results are
+    streamed back and summed up as soon as a worker finished them.
+
+    :games: Number of games.
+    :cols: Number of columns.
+    :rows: Number of rows.
+    :policy_a: Name of the policy of player A in POLICIES.
+    :policy_b: Name of the policy of player B in POLICIES.
+    :workers: Number of worker processes, by default the number of CPUs.
+    :chunk_size: Number of games per chunk.
+    :seed: Base seed, each chunk gets its own seed derived from it.
+    :on_chunk: Optional function called with the running totals after each chunk.
+    :record_path: Optional path of a file the games are appended to as game records.
+    :return: Dictionary with the totals and the elapsed seconds.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for index, start in enumerate(range(0, games, chunk_size)):
+        tasks.append((cols, rows, policy_a, policy_b, min(chunk_size, games - start), seed * 1000003 + index,
+                      record_path))
+
+    totals = {'games': 0, 'wins_a': 0, 'wins_b': 0, 'draws': 0, 'moves': 0}
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(run_chunk, tasks):
+            for key in result:
+                totals[key] += result[key]
+            totals['seconds'] = time.perf_counter() - start
+            if on_chunk is not None:
+                on_chunk(totals)
+
+    totals['seconds'] = time.perf_counter() - start
+    return totals
+
+
+def format_totals(totals):
+    games = totals['games']
+    return (f"{games} games in {totals['seconds']:.1f}s ({games / totals['seconds']:,.0f} games/s), "
+            f"A won {totals['wins_a'] / games:.1%}, B won {totals['wins_b'] / games:.1%}, "
+            f"draws {totals['draws'] / games:.1%}, {totals['moves'] / games:.1f} stones per game")
+
+
+def parse_size(text):
+    try:
+        cols, rows = map(int, text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected COLSxROWS, e.g. 15x15')
+    if not (MIN_SIZE <= cols <= MAX_SIZE and MIN_SIZE <= rows <= MAX_SIZE):
+        raise argparse.ArgumentTypeError(f'the grid needs {MIN_SIZE} to {MAX_SIZE} columns and rows')
+    return cols, rows
+
+
+def parse_positive(text):
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError('expected a number greater than 0')
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gomoku simulate', description='Runs headless self-play games.')
+    parser.add_argument('--games', type=parse_positive, default=10000)
+    parser.add_argument('--workers', type=parse_positive, default=None)
+    parser.add_argument('--size', type=parse_size, default=(15, 15), help='COLSxROWS, e.g. 15x15')
+    parser.add_argument('--policy-a', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--policy-b', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--chunk-size', type=parse_positive, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', metavar='FILE', default=None, help='append the games as game records')
+    args = parser.parse_args(argv)
+
+    cols, rows = args.size
+    totals = simulate(args.games, cols, rows, args.policy_a, args.policy_b, args.workers, args.chunk_size,
+                      args.seed, on_chunk=lambda totals: print(format_totals(totals), end='\r', flush=True),
+                      record_path=args.record)
+    print(format_totals(totals))
+    return totals
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import os
+
+import archive
+import records
+from gomoku import GameEngine
+from test_records import play
+
+
+def make_records(count):
+    game_records = []
+    for index in range(count):
+        moves = [(index % 10, 0), (index % 10, 1), None, (9 - index % 10, 5), (0, 9)]
+        game_records.append(records.GameRecord(10, 10, records.MODE_REMOVE, records.RESULT_RUNNING,
+                                               f'A{index}', 'B', moves))
+    return game_records
+
+def test_random_access(tmp_path):
+    path = str(tmp_path / 'games.dat')
+    game_records = make_records(50)
+    assert archive.append_games(game_records[:20], path) == 20
+    assert archive.append_games(game_records[20:], path) == 50
+    assert os.path.getsize(archive.index_path(path)) == 50 * 8
+
+    with archive.GameArchive(path) as games:
+        assert len(games) == 50
+        assert games[37] == game_records[37]
+        assert games[-1] == game_records[-1]
+        assert list(games) == game_records
+        assert games.board(12, 3) == records.replay(game_records[12], 3)
+        for number, record in games.sample(5, seed=1):
+            assert record == game_records[number]
+
+def test_index_catches_up_and_rebuilds(tmp_path):
+    path = str(tmp_path / 'games.dat')
+    game_records = make_records(10)
+    archive.append_games(game_records[:4], path)
+    # appended without index, e.g. by simulate --record
+    records.write_games(game_records[4:], path)
+    with open(path, 'ab') as f:
+        f.write(records.encode_game(game_records[0])[:-2])
+    with archive.GameArchive(path) as games:
+        assert len(games) == 10
+        assert games[9] == game_records[9]
+
+    # replaced game file
+    os.remove(path)
+    records.write_games(game_records[:2], path)
+    assert archive.update_index(path) == 2
+
+def test_empty_archive(tmp_path):
+    with archive.GameArchive(str(tmp_path / 'games.dat')) as games:
+        assert len(games) == 0
+        assert list(games.boards([1])) == []
+    # no index is written for a missing game file
+    assert os.listdir(tmp_path) == []
+
+def test_boards_at_move_counts(tmp_path):
+    path = str(tmp_path / 'games.dat')
+    engine = play(GameEngine(10, 10, allow_remove=True), [(0, 0), (1, 0), None, (2, 0), (3, 3)])
+    archive.append_games([engine.record('A', 'B', records.MODE_REMOVE)] + make_records(2), path)
+
+    with archive.GameArchive(path) as games:
+        boards = list(games.boards([5, 0, 2, 3, 99], numbers=[0]))
+        assert [(number, count) for number, count, _ in boards] == [(0, 0), (0, 2), (0, 3), (0, 5)]
+        for number, count, grid in boards:
+            assert grid == records.replay(games[number], count)
+        assert boards[-1][2] == engine.grid
+        assert len(list(games.boards([4]))) == 3
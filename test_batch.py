@@ -0,0 +1,33 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch import evaluate_boards, grids_to_array, random_boards
+from gomoku import is_game_won
+from test_gomoku import empty_grid, full_grid
+
+
+def test_evaluate_boards_lines():
+    grids = [empty_grid(15, 15) for _ in range(5)]
+    for i in range(5):
+        grids[1][i][0] = True            # horizontal
+        grids[2][5][5 + i] = False       # vertical
+        grids[3][1 + i][1 + i] = True    # diagonal up-right
+        grids[4][10 + i][14 - i] = False # diagonal down-right
+    wins_a, wins_b, draws = evaluate_boards(grids_to_array(grids))
+    assert wins_a.tolist() == [False, True, False, True, False]
+    assert wins_b.tolist() == [False, False, True, False, True]
+    assert draws.tolist() == [False] * 5
+
+def test_evaluate_boards_draw_non_square():
+    grid = full_grid(20, 10)
+    wins_a, wins_b, draws = evaluate_boards(grids_to_array([grid]))
+    assert (wins_a[0], wins_b[0], draws[0]) == (False, False, True)
+
+def test_evaluate_boards_matches_is_game_won():
+    for cols, rows in [(10, 10), (13, 17), (20, 20)]:
+        boards = random_boards(300, cols, rows, fill=0.4, seed=cols)
+        grids = [[[None if value == 0 else value == 1 for value in column] for column in board]
+                 for board in boards.tolist()]
+        wins_a, wins_b, _ = evaluate_boards(boards, chunk_size=64)
+        assert list(wins_a | wins_b) == [is_game_won(grid) for grid in grids]
@@ -0,0 +1,34 @@
+import json
+import os
+
+import benchmarks
+from test_gomoku import generate_safe_draw_moves
+
+
+def test_measure():
+    calls = []
+    result = benchmarks.measure(lambda: calls.append(1), min_seconds=0.001, repeat=3)
+    assert result['repeat'] == 3
+    # doubling runs of 1, 2, ..., number calls, then two more runs
+    assert len(calls) == result['number'] * 2 - 1 + result['number'] * 2
+    assert 0 < result['seconds'] <= result['mean_seconds']
+
+def test_draw_moves():
+    for n in (10, 15, 20):
+        assert benchmarks.draw_moves(n) == generate_safe_draw_moves(n)
+
+def test_run_and_compare(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(benchmarks, 'MIN_SECONDS', 0.001)
+    monkeypatch.setattr(benchmarks, 'SIZES', (10,))
+    monkeypatch.setattr(benchmarks, 'SCOREBOARD_SIZES', (10,))
+    monkeypatch.setattr(benchmarks, 'VIEWER_COUNTS', (10,))
+    cwd = os.getcwd()
+    report = benchmarks.main(['play_turn', 'games', 'scoreboard', 'broadcast', '--output', str(tmp_path / 'run.json')])
+    assert os.getcwd() == cwd
+    assert sorted(report['results']) == ['broadcast_move/10', 'game/10x10/draw', 'play_turn/10x10', 'scoreboard_load/10', 'scoreboard_save/10']
+    assert json.loads((tmp_path / 'run.json').read_text())['results'].keys() == report['results'].keys()
+
+    slower = {'results': {name: dict(result, seconds=result['seconds'] * 2) for name, result in report['results'].items()}}
+    lines = benchmarks.compare(report, slower)
+    assert len(lines) == 5 and all(line.endswith('REGRESSION') for line in lines)
+    assert not any('REGRESSION' in line for line in benchmarks.compare(slower, report))
@@ -0,0 +1,68 @@
+from bitboard import BitBoard
+from test_gomoku import empty_grid, full_grid
+from gomoku import GameState, is_game_won
+
+
+def test_grid_round_trip():
+    grid = full_grid(20, 10)
+    grid[3][9] = None
+    board = BitBoard.from_grid(grid)
+    assert board.to_grid() == grid
+    assert board.get(3, 9) == None
+    assert board.get(0, 0) == True
+    assert board.get(0, 2) == False
+
+def test_place_remove_occupied():
+    board = BitBoard(15, 15)
+    board.place(14, 14, False)
+    assert board.is_occupied(14, 14) == True
+    assert board.get(14, 14) == False
+    board.remove(14, 14)
+    assert board.is_occupied(14, 14) == False
+    assert board == BitBoard(15, 15)
+
+def test_has_five_directions():
+    lines = [
+        [(col, 0) for col in range(5)],            # horizontal
+        [(5, row) for row in range(5, 10)],        # vertical
+        [(1 + i, 1 + i) for i in range(5)],        # diagonal up-right
+        [(2 + i, 6 - i) for i in range(5)],        # diagonal down-right
+    ]
+    for line in lines:
+        board = BitBoard(15, 15)
+        for col, row in line:
+            board.place(col, row, False)
+        assert board.has_five(False) == True
+        assert board.has_five(True) == False
+
+def test_has_five_not_across_column_border():
+    # four stones on top of column 0 and one at the bottom of column 1 are adjacent bits
+    board = BitBoard(10, 10)
+    for row in range(6, 10):
+        board.place(0, row, True)
+    board.place(1, 0, True)
+    assert board.has_five(True) == False
+
+def test_has_five_matches_is_game_won():
+    grid = empty_grid(12, 17)
+    moves = [(11, 16), (10, 15), (9, 14), (8, 13), (7, 12)]
+    for col, row in moves:
+        grid[col][row] = True
+        assert BitBoard.from_grid(grid).is_won() == is_game_won(grid)
+
+def test_is_full():
+    board = BitBoard.from_grid(full_grid(7, 6))
+    assert board.is_full() == True
+    board.remove(6, 5)
+    assert board.is_full() == False
+
+def test_game_state_keeps_board():
+    grid = empty_grid(10, 10)
+    state = GameState(grid)
+    for row in range(5):
+        state.place(4, row, True)
+        assert state.board == BitBoard.from_grid(grid)
+    assert state.has_five(True) == True
+    state.remove_last()
+    assert state.board == BitBoard.from_grid(grid)
+    assert state.has_five(True) == False
@@ -0,0 +1,104 @@
+import broadcast
+from test_server import Client, run_with_server, start_game
+
+
+class Writer:
+    def __init__(self):
+        self.lines = []
+        self.buffered = 0
+        self.is_closed = False
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def write(self, data):
+        self.lines += data.decode().splitlines()
+
+    def is_closing(self):
+        return self.is_closed
+
+    def close(self):
+        self.is_closed = True
+
+
+def test_publish_coalesce_and_drop():
+    state = []
+    channel = broadcast.Channel(lambda: ('SNAPSHOT', len(state)), high_water=10, drop_after=3, snapshot_interval=4)
+    fast, slow, stuck = Writer(), Writer(), Writer()
+    for writer in (fast, slow, stuck):
+        channel.subscribe(writer)
+
+    state.append(1)
+    channel.publish('MOVED', 1)
+    slow.buffered = stuck.buffered = 11
+    for move in (2, 3):
+        state.append(move)
+        channel.publish('MOVED', move)
+    slow.buffered = 0
+    state.append(4)
+    channel.publish('MOVED', 4)
+    state.append(5)
+    channel.publish('MOVED', 5)
+    channel.close('WON', 'Ann')
+
+    assert fast.lines == ['SNAPSHOT 0', 'MOVED 1', 'MOVED 2', 'MOVED 3', 'MOVED 4', 'SNAPSHOT 4', 'MOVED 5', 'WON Ann']
+    assert slow.lines == ['SNAPSHOT 0', 'MOVED 1', 'SNAPSHOT 4', 'MOVED 5', 'WON Ann']
+    assert stuck.lines == ['SNAPSHOT 0', 'MOVED 1'] and stuck.is_closed
+    assert channel.counts == {'coalesced': 5, 'dropped': 1}
+    assert channel.subscribers == set()
+
+
+def test_stalled_viewer_is_disconnected():
+    channel = broadcast.Channel(lambda: ('SNAPSHOT',), high_water=10, drop_after=3)
+    stalled, lagging = Writer(), Writer()
+    channel.subscribe(stalled)
+    lagging_subscriber = channel.subscribe(lagging)
+    stalled.buffered = 11
+    for move in range(6):
+        # the lagging viewer drains its buffer in time before missing drop_after events
+        lagging.buffered = 11 if move % 3 < 2 else 0
+        channel.publish('MOVED', move)
+
+    assert stalled.is_closed and stalled.lines == ['SNAPSHOT']
+    assert not lagging.is_closed and lagging_subscriber.is_subscribed()
+    assert lagging.lines == ['SNAPSHOT', 'SNAPSHOT', 'SNAPSHOT']
+    assert channel.counts['dropped'] == 1
+
+
+def test_close_sends_snapshot_to_viewers_behind():
+    channel = broadcast.Channel(lambda: ('SNAPSHOT',), high_water=10)
+    writer = Writer()
+    subscriber = channel.subscribe(writer)
+    writer.buffered = 11
+    channel.publish('MOVED', 1)
+    channel.close('DRAW')
+    assert writer.lines == ['SNAPSHOT', 'SNAPSHOT', 'DRAW']
+    assert not subscriber.is_subscribed()
+
+
+def test_watch_over_server(tmp_path):
+    async def test(game_server, port):
+        ann, bob, game_id = await start_game(port, 'NEW 10 10')
+        for client, event in ((ann, 'START'), (ann, 'TURN'), (bob, 'START')):
+            assert (await client.receive()).startswith(event)
+        viewer = await Client.connect(port)
+        assert await viewer.command('LIST') == 'OK'
+        assert await viewer.command('LIST running') == f'OK {game_id}:10x10:adjustable'
+        assert await ann.command('MOVE 10 1') == 'OK'
+        assert await bob.receive() == 'MOVED X 10 1'
+        assert await bob.receive() == 'TURN'
+        assert await viewer.command(f'WATCH {game_id}') == f'OK {game_id}'
+        assert await viewer.receive() == f'SNAPSHOT {game_id} 10 10 Ann Bob 1 ' + '.' * 90 + 'X' + '.' * 9
+        assert await bob.command('WATCH 1') == 'ERROR cannot watch while playing or in the queue'
+
+        assert await bob.command('MOVE 1 10') == 'OK'
+        assert await viewer.receive() == 'MOVED O 1 10'
+        assert await viewer.command('NAME Cid') == 'OK Cid'
+        assert await viewer.command('NEW') == 'ERROR watching a game'
+        await bob.close()
+        assert await viewer.receive() == 'ABORTED'
+        assert await viewer.command('UNWATCH') == 'ERROR not watching a game'
+        assert game_server.games == {}
+
+    run_with_server(tmp_path, test)
@@ -85,6 +85,13 @@ def test_main_play_game_with_adjustable_size_and_remove_exit(monkeypatch):
     mock_menu_end_with_exit(monkeypatch, [3])
     play_game_with_remove_mock.assert_called_once()
 
+def test_main_play_game_against_computer_exit(monkeypatch):
+    play_game_against_computer_mock = Mock()
+    play_game_against_computer_mock.return_value = None
+    monkeypatch.setattr('gomoku.play_game_against_computer', play_game_against_computer_mock)
+    mock_menu_end_with_exit(monkeypatch, [MENU_COMPUTER])
+    play_game_against_computer_mock.assert_called_once()
+
 def test_main_scoreboard_exit(monkeypatch):
     stdin = io.StringIO('\n')
     monkeypatch.setattr('sys.stdin', stdin)
@@ -113,6 +120,12 @@ def test_menu(monkeypatch):
     assert [menu() for _ in range(5)] == [i for i in range(1, 6)]
     assert stdin.read() == '' # Check that all input was read
 
+def test_menu_computer_choice(monkeypatch):
+    stdin = io.StringIO('6\nC\nc\n5')
+    monkeypatch.setattr('sys.stdin', stdin)
+    assert [menu() for _ in range(3)] == [MENU_COMPUTER, MENU_COMPUTER, 5]
+    assert stdin.read() == ''
+
 def test_menu_interaction(monkeypatch):
     headlines = mock_ui_fn(monkeypatch, 'display_headline')
     menus = mock_ui_fn(monkeypatch, 'display_menu')
@@ -170,6 +183,73 @@ def test_is_grid_full_not():
     grid[1][3] = None
     assert is_grid_full(grid) == False
 
+def test_game_state_is_full():
+    grid = full_grid(7, 6)
+    grid[1][3] = None
+    state = GameState(grid)
+    assert state.stone_count == 41
+    assert state.is_full() == False
+    state.place(1, 3, True)
+    assert state.is_full() == True
+    assert grid[1][3] == True
+
+def test_game_state_remove_last():
+    grid = empty_grid(10, 10)
+    state = GameState(grid)
+    assert state.remove_last() == None
+    state.place(2, 3, True)
+    grid[4][5] = False
+    state.record_move((4, 5))
+    assert state.remove_last() == (4, 5)
+    assert grid[4][5] == None
+    assert state.stone_count == 1
+    assert state.moves == [(2, 3)]
+
+def test_game_engine_win():
+    engine = GameEngine()
+    engine.new_game(12, 10, allow_remove=False)
+    for row in range(4):
+        assert engine.play((0, row)) == RUNNING
+        assert engine.play((1, row)) == RUNNING
+    assert len(engine.legal_moves()) == 112
+    assert engine.play((0, 4)) == WON_BY_A
+    assert engine.status() == WON_BY_A
+    assert engine.legal_moves() == []
+
+def test_game_engine_invalid_moves():
+    engine = GameEngine(10, 10)
+    engine.play((3, 3))
+    for move in [(3, 3), (10, 0), (0, -1)]:
+        try:
+            engine.play(move)
+            assert False, move
+        except ValueError:
+            pass
+    try:
+        engine.remove()
+        assert False
+    except ValueError:
+        pass
+    assert engine.is_player_a == False
+
+def test_game_engine_remove():
+    engine = GameEngine(10, 10, allow_remove=True)
+    assert engine.remove() == None
+    assert engine.is_player_a == True
+    engine.play((2, 2))
+    engine.play((5, 5))
+    assert engine.remove() == (5, 5)
+    assert engine.is_player_a == False
+    assert engine.grid[5][5] == None
+    assert (5, 5) in engine.legal_moves()
+
+def test_game_engine_draw():
+    engine = GameEngine(10, 10)
+    for move in generate_safe_draw_moves(10):
+        row, col = map(int, move.split())
+        engine.play((col - 1, 10 - row))
+    assert engine.status() == DRAW
+
 def test_play_turn(monkeypatch):
     stdin = io.StringIO('-1\n4\n11 3\n')
     monkeypatch.setattr('sys.stdin', stdin)
@@ -200,6 +280,20 @@ def test_play_turn_interaction(monkeypatch):
     display_grid_mock.assert_called_once_with(grid)
     assert prompts == [PROMPT_TURN] * 2
 
+def test_play_turn_hint(monkeypatch):
+    prompts = mock_ui_fn(monkeypatch, 'prompt', ['?', '?', '4 3'])
+    hints = mock_ui_fn(monkeypatch, 'display_hints')
+
+    grid = empty_grid(15, 15)
+    for col in range(4):
+        grid[col][0] = False
+    grid[7][7] = True
+    # player A has to block the four in the bottom row
+    assert play_turn(grid, 'Player A', is_player_a = True, can_remove = False) == (2, 11)
+    assert prompts == [PROMPT_TURN] * 3
+    assert len(hints) == 2 and hints[0] == hints[1]
+    assert hints[0][0][:2] == (15, 5)
+
 def generate_safe_draw_moves(n):
     moves = []
     # pattern repeats every 4 rows
@@ -288,6 +382,51 @@ def test_is_game_won_negative_cases():
     assert is_game_won(grid) == False
 
 
+def test_is_game_won_non_square():
+    # Test a vertical line in the upper rows of a grid with more rows than columns
+    grid = empty_grid(10, 20)
+    for row in range(15, 20):
+        grid[9][row] = True
+    assert is_game_won(grid) == True
+
+
+# test of is_winning_move function
+def test_is_winning_move_middle_stone():
+    # Test that the last stone completes a line when placed in its middle
+    grid = empty_grid(15, 15)
+    for col in [3, 4, 6, 7]:
+        grid[col][2] = False
+    grid[5][2] = False
+    assert is_winning_move(grid, (5, 2)) == True
+
+
+def test_is_winning_move_diagonals():
+    grid = empty_grid(15, 15)
+    for i in range(5):
+        grid[1 + i][1 + i] = True
+        grid[8 + i][12 - i] = False
+    assert is_winning_move(grid, (3, 3)) == True
+    assert is_winning_move(grid, (12, 8)) == True
+
+
+def test_is_winning_move_negative_cases():
+    grid = empty_grid(15, 15)
+    for row in range(4):
+        grid[0][row] = True
+    grid[0][4] = False
+    assert is_winning_move(grid, (0, 3)) == False
+    assert is_winning_move(grid, (0, 4)) == False
+    assert is_winning_move(grid, (7, 7)) == False
+
+
+def test_is_winning_move_non_square():
+    # Test the lines through a stone at the border of a 20x10 grid
+    grid = empty_grid(20, 10)
+    for col in range(15, 20):
+        grid[col][9] = True
+    assert is_winning_move(grid, (19, 9)) == True
+
+
 ##########################  GAME TEST ON STANDARD BOARD ##########################
 def test_play_standard_size_game_draw(monkeypatch):
     moves = generate_safe_draw_moves(15)
@@ -409,6 +548,17 @@ def test_play_game_win(monkeypatch):
     assert play_game() == 'Player A'
     assert stdin.read() == '' # Check that all input was read
 
+def test_play_game_non_square_win(monkeypatch):
+    # horizontal win on the top row of a 20x10 grid
+    inputs = ['20', '10', 'Player A', 'Player B',
+              '10 16', '1 1', '10 17', '1 2', '10 18', '1 3', '10 19', '1 4', '10 20',
+              '', '']
+    stdin = io.StringIO('\n'.join(inputs))
+    monkeypatch.setattr('sys.stdin', stdin)
+    assert play_game() == 'Player A'
+    assert stdin.read() == '' # Check that all input was read
+    remove_file(SCOREBOARD_FILE)
+
 def test_play_game_interaction_win(monkeypatch):
     TOTAL_TURNS = 9
     TURNS_A_AND_B_PAIRS = 4
@@ -539,6 +689,120 @@ def test_play_game_with_remove_interaction_win(monkeypatch):
 
     assert prompts == expected_prompts_list
 
+def test_play_game_with_remove_on_empty_grid(monkeypatch):
+    # removing on an empty grid keeps player A at turn
+    prompts = mock_ui_fn(monkeypatch, 'prompt', ['10', '10', 'Player A', 'Player B', '-1',
+                                                 '1 1', '2 1', '1 2', '2 2', '1 3', '2 3', '1 4', '2 4', '1 5',
+                                                 ''])
+    messages = mock_ui_fn(monkeypatch, 'display_message')
+
+    assert play_game_with_remove() == 'Player A'
+    assert messages[:2] == [message_turn('Player A', 'X')] * 2
+    remove_file(SCOREBOARD_FILE)
+
+##########################  GAME AGAINST COMPUTER TEST ##########################
+
+def test_choose_move_wins_and_blocks():
+    grid = empty_grid(15, 15)
+    for row in range(4):
+        grid[3][row] = True
+        grid[9][5 + row] = False
+    # the computer completes its own line instead of blocking
+    assert ai.choose_move(grid, is_player_a=False) in [(9, 4), (9, 9)]
+    grid[9][4] = True
+    grid[9][9] = True
+    # the computer blocks the four of player A
+    assert ai.choose_move(grid, is_player_a=False) == (3, 4)
+
+def test_choose_move_time_budget(monkeypatch):
+    # a clock advancing by a millisecond whenever it is read, independent of the speed of the machine
+    ticks = iter(range(10 ** 9))
+    monkeypatch.setattr(ai, 'clock', lambda: next(ticks) / 1000)
+    grid = empty_grid(20, 20)
+    for col, row in [(9, 9), (10, 10), (10, 9), (8, 8), (11, 9), (9, 10)]:
+        grid[col][row] = (col + row) % 2 == 0
+    move = ai.choose_move(grid, is_player_a=True, time_budget=0.2)
+    assert next(ticks) / 1000 < 0.2
+    assert grid[move[0]][move[1]] is None
+
+def test_ponderer_answers_likely_reply():
+    grid = empty_grid(15, 15)
+    for row in range(3):
+        grid[3][row] = True
+    grid[9][5], grid[10][10], grid[12][3] = False, False, False
+    ponderer = ai.Ponderer(zobrist.TranspositionTable(), max_depth=3)
+    # player A is at turn and extends the three at the border to a four
+    ponderer.start(grid, is_player_a=True)
+    assert ponderer.done.wait(timeout=60)
+    grid[3][3] = True
+    assert ponderer.take(grid, time_budget=0.02) == (3, 4)
+    assert ponderer.thread is None
+    grid[3][3], grid[0][14] = None, True
+    assert ponderer.take(grid) is None
+
+def test_ponderer_stops_at_once():
+    grid = [[None if (col + row) % 4 else (col * row) % 3 == 0 for row in range(20)] for col in range(20)]
+    ponderer = ai.Ponderer(zobrist.TranspositionTable(), max_depth=20)
+    ponderer.start(grid, is_player_a=True)
+    assert ponderer.updated.wait(timeout=60)
+    # the search to depth 20 would take far too long, it returns only when it is cancelled
+    ponderer.stop()
+    assert ponderer.thread is None
+    assert not ponderer.done.is_set()
+
+def test_play_game_against_computer_uses_pondering(monkeypatch):
+    choose_move = ai.choose_move
+    searches = []
+    def choose_move_mock(*args, **kwargs):
+        searches.append(args[0])
+        return choose_move(*args, **kwargs)
+    monkeypatch.setattr(ai, 'choose_move', choose_move_mock)
+    ponderers = []
+    class Ponderer(ai.Ponderer):
+        def __init__(self, table):
+            super().__init__(table, max_depth=3)
+            ponderers.append(self)
+        def take(self, grid, time_budget, key):
+            # the engine passes its incremental key instead of hashing the grid again
+            assert key == zobrist.grid_key(grid)
+            return super().take(grid, time_budget, key)
+    monkeypatch.setattr(ai, 'Ponderer', Ponderer)
+    mock_ui_fn(monkeypatch, 'display_headline')
+    mock_ui_fn(monkeypatch, 'display_message')
+    grids = mock_ui_fn(monkeypatch, 'display_grid')
+    inputs = iter(['10', '10', 'Player A', '5 5'])
+    def prompt(message):
+        if message != PROMPT_TURN or len(grids) == 1:
+            return next(inputs)
+        if len(grids) == 3:
+            raise EOFError()
+        # think until the computer answered the likely moves
+        assert ponderers[-1].done.wait(timeout=60)
+        col, row = ai.Position(grids[-1]).ordered_moves(True)[0]
+        return f'{10 - row} {col + 1}'
+    monkeypatch.setattr(ui, 'prompt', prompt)
+
+    try:
+        play_game_against_computer(time_budget=0.02)
+    except EOFError:
+        pass
+    # the second move of the computer was found while player A was thinking
+    assert len(searches) == 1
+
+def test_play_game_against_computer_interaction(monkeypatch):
+    monkeypatch.setattr(ai, 'choose_move', lambda grid, is_player_a, *args, **kwargs: (9, 9 - grid[9].count(False)))
+    headlines = mock_ui_fn(monkeypatch, 'display_headline')
+    messages = mock_ui_fn(monkeypatch, 'display_message')
+    prompts = mock_ui_fn(monkeypatch, 'prompt', ['10', '10', 'Computer', 'Player A',
+                                                 '1 1', '2 1', '3 1', '4 1', '6 1', ''])
+
+    assert play_game_against_computer() == 'Computer'
+    assert headlines == [HEADLINE_SIZE, HEADLINE_NAMES] + [HEADLINE_TURN] * 5 + [HEADLINE_WIN]
+    assert messages == [message_turn('Player A', 'X')] * 5 + [message_won('Computer')]
+    assert prompts == [prompt_size(True), prompt_size(False), prompt_name(True), prompt_name(True)] + \
+                      [PROMPT_TURN] * 5 + [PROMPT_RETURN_MENU]
+    remove_file(SCOREBOARD_FILE)
+
 ##########################  END TO END TEST ##########################
 
 def test_end_to_end(monkeypatch):
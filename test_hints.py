@@ -0,0 +1,42 @@
+import time
+
+import hints
+import patterns
+from gomoku import GameState
+from test_gomoku import empty_grid
+
+
+def test_suggest_win_and_block():
+    engine = hints.HintEngine(count=2)
+    grid = empty_grid(15, 15)
+    for row in range(4):
+        grid[3][row] = True
+        grid[10][row + 5] = False
+    # player B completes its own line instead of blocking
+    suggestions = engine.suggest(grid, is_player_a=False)
+    assert sorted(move for move, _ in suggestions) == [(10, 4), (10, 9)]
+    assert all(score > patterns.OPEN_FOUR for _, score in suggestions)
+    # player A wins too
+    assert engine.suggest(grid, is_player_a=True)[0][0] == (3, 4)
+
+def test_cache_and_incremental_evaluation():
+    engine = hints.HintEngine()
+    grid = empty_grid(20, 20)
+    assert [move for move, _ in engine.suggest(grid, True)] == [(10, 10)]
+
+    grid[10][10], grid[11][11] = True, False
+    suggestions = engine.suggest(grid, True)
+    assert engine.suggest(grid, True) is suggestions
+    # the incremental key of the game finds the same entry
+    assert engine.suggest(grid, True, GameState(grid).key) is suggestions
+
+    grid[11][11], grid[9][12] = None, False
+    engine.suggest(grid, True)
+    assert engine.evaluator.score == patterns.PatternEvaluator(grid).score
+
+def test_time_budget():
+    engine = hints.HintEngine(time_budget=0.1)
+    grid = [[(col * 7 + row * 3) % 5 == 0 if (col + row) % 3 else None for row in range(20)] for col in range(20)]
+    start = time.perf_counter()
+    assert len(engine.suggest(grid, True)) == 3
+    assert time.perf_counter() - start < 0.5
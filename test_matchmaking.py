@@ -0,0 +1,99 @@
+import asyncio
+
+import matchmaking
+import server
+from test_server import Client, run_with_server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_pairs_longest_waiting_of_same_kind():
+    clock = Clock()
+    matchmaker = matchmaking.Matchmaker(timeout=10, clock=clock)
+    standard, small = (0, 15, 15), (1, 10, 10)
+
+    assert matchmaker.enqueue('ann', standard)[1] is None
+    clock.now = 1
+    assert matchmaker.enqueue('bob', small)[1] is None
+    assert matchmaker.depth() == 2
+    assert matchmaker.depth(standard) == 1
+
+    clock.now = 2
+    ticket, opponent = matchmaker.enqueue('cid', standard)
+    assert (opponent.player, ticket.player) == ('ann', 'cid')
+    assert matchmaker.peek(standard) is None
+    assert matchmaker.enqueue('dan', standard)[1] is None
+    clock.now = 4
+    assert matchmaker.enqueue('eve', small)[1].player == 'bob'
+    assert matchmaker.peek(standard).player == 'dan'
+    assert matchmaker.depth() == 1
+
+    metrics = matchmaker.metrics()
+    assert metrics['matched'] == 2
+    assert metrics['depths'] == {standard: 1}
+    assert metrics['wait_max'] == 3
+    assert metrics['wait_mean'] == (2 + 0 + 3 + 0) / 4
+
+def test_cancel_and_expire():
+    clock = Clock()
+    matchmaker = matchmaking.Matchmaker(timeout=10, clock=clock)
+    kind = (0, 15, 15)
+    ann = matchmaker.enqueue('ann', kind)[0]
+    clock.now = 5
+    bob = matchmaker.enqueue('bob', kind + (1,))[0]
+    cid = matchmaker.enqueue('cid', kind + (2,))[0]
+
+    assert matchmaker.cancel(ann)
+    assert not matchmaker.cancel(ann)
+    assert matchmaker.peek(kind) is None
+    dan = matchmaker.enqueue('dan', kind)[0]
+
+    assert matchmaker.expire(14.9) == []
+    assert matchmaker.cancel(cid)
+    assert matchmaker.expire(15) == [bob, dan]
+    assert matchmaker.depth() == 0
+    metrics = matchmaker.metrics()
+    assert (metrics['cancelled'], metrics['expired'], metrics['matched']) == (2, 2, 0)
+
+
+def test_queue_over_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'EXPIRE_INTERVAL', 0.05)
+
+    async def test(game_server, port):
+        ann = await Client.connect(port, 'Ann')
+        bob = await Client.connect(port, 'Bob')
+        cid = await Client.connect(port, 'Cid')
+        assert await ann.command('QUEUE 12 12 remove') == 'OK'
+        assert await ann.command('QUEUE') == 'ERROR already in the queue'
+        assert await ann.command('NEW') == 'ERROR already in the queue'
+        assert await cid.command('QUEUE') == 'OK'
+        assert await bob.command('STATS') == ('OK waiting=2 matched=0 cancelled=0 expired=0 wait_mean=0.000 '
+                                              'wait_p50=0.000 wait_p95=0.000 wait_max=0.000 '
+                                              '15x15:standard=1 12x12:remove=1')
+        assert await cid.command('CANCEL') == 'OK'
+        assert await cid.command('CANCEL') == 'ERROR not in the queue'
+
+        assert await bob.command('QUEUE 12 12 remove') == 'OK'
+        game_id = next(iter(game_server.games))
+        assert await bob.receive() == f'START {game_id} 12 12 O Ann'
+        assert await ann.receive() == f'START {game_id} 12 12 X Bob'
+        assert await ann.receive() == 'TURN'
+        assert game_server.games[game_id].mode == server.records.MODE_REMOVE
+        assert await ann.command('MOVE 1 1') == 'OK'
+
+        game_server.matchmaker.timeout = 0.1
+        assert await cid.command('QUEUE 10 10') == 'OK'
+        assert await cid.receive() == 'TIMEOUT'
+        assert await cid.command('QUEUE') == 'OK'
+        await cid.close()
+        await asyncio.sleep(0.05)
+        assert game_server.matchmaker.depth() == 0
+        assert game_server.matchmaker.metrics()['expired'] == 1
+
+    run_with_server(tmp_path, test)
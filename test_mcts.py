@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+import mcts
+from test_gomoku import empty_grid, full_grid
+
+
+def test_playout_ends_with_five_or_draw():
+    board = bytearray(10 * 10)
+    generator = random.Random(1)
+    results = mcts.run_playouts((10, 10, bytes(board), [], True, 20, 1))
+    assert sum(results) == 20
+    # one move left, it completes five for player A
+    board = bytearray([mcts.STONE_A if index % 2 else mcts.STONE_B for index in range(25)])
+    for index in range(4):
+        board[index * 5 + 2] = mcts.STONE_A
+    board[4 * 5 + 2] = mcts.EMPTY
+    stones = [index for index in range(25) if board[index] != mcts.EMPTY]
+    assert mcts.playout(board, 5, 5, stones, True, generator) == mcts.STONE_A
+    assert mcts.playout(board, 5, 5, stones, False, generator) == mcts.EMPTY
+
+def test_choose_move_completes_five():
+    grid = empty_grid(15, 15)
+    for row in range(4):
+        grid[3][row + 2] = False
+        grid[9][row + 5] = True
+    grid[0][0] = True
+    with mcts.MctsEngine(seed=1) as engine:
+        assert engine.choose_move(grid, is_player_a=False, time_budget=None, playouts=400) in [(3, 1), (3, 6)]
+        assert 0 < engine.stats()['playouts'] <= 400
+
+def test_choose_move_without_budget():
+    grid = empty_grid(10, 10)
+    grid[4][4] = True
+    with mcts.MctsEngine(seed=1) as engine:
+        col, row = engine.choose_move(grid, is_player_a=False, time_budget=0)
+        assert grid[col][row] is None and abs(col - 4) <= 1 and abs(row - 4) <= 1
+        assert engine.stats()['playouts'] == 0
+        with pytest.raises(ValueError):
+            engine.choose_move([[(col + row // 2) % 2 == 0 for row in range(10)] for col in range(10)], True)
+
+def test_known_results_are_not_counted_as_playouts():
+    # player A completes five with the only move left
+    grid = full_grid(5, 5)
+    for col in range(4):
+        grid[col][2] = True
+    grid[4][2] = None
+    with mcts.MctsEngine(seed=1) as engine:
+        assert engine.choose_move(grid, is_player_a=True, time_budget=None, playouts=80) == (4, 2)
+        assert engine.stats()['playouts'] == 0
+
+def test_tree_reuse():
+    grid = empty_grid(15, 15)
+    grid[7][7], grid[8][8] = True, False
+    with mcts.MctsEngine(seed=1) as engine:
+        col, row = engine.choose_move(grid, is_player_a=True, time_budget=None, playouts=800)
+        assert engine.stats()['reused'] == 0
+        grid[col][row] = True
+        reply = max(engine.root.children, key=lambda child: child.visits)
+        reply = max(reply.children, key=lambda child: child.visits).move
+        grid[reply[0]][reply[1]] = False
+        move = engine.choose_move(grid, is_player_a=True, time_budget=None, playouts=100)
+        assert engine.stats()['reused'] > 0
+        assert grid[move[0]][move[1]] is None
+
+def test_worker_processes():
+    grid = empty_grid(10, 10)
+    grid[5][5] = True
+    with mcts.MctsEngine(workers=1, seed=1) as engine:
+        move = engine.choose_move(grid, is_player_a=False, time_budget=5, playouts=64)
+        stats = engine.stats()
+    assert grid[move[0]][move[1]] is None
+    assert stats['playouts'] >= 64 and stats['workers'] == 1 and stats['playouts_per_second'] > 0
@@ -0,0 +1,58 @@
+import opening
+import records
+from test_gomoku import empty_grid
+
+
+def transformed_grid(grid, symmetry):
+    cols, rows = len(grid), len(grid[0])
+    result = empty_grid(cols, rows)
+    for col in range(cols):
+        for row in range(rows):
+            new_col, new_row = opening.transform((col, row), symmetry, cols, rows)
+            result[new_col][new_row] = grid[col][row]
+    return result
+
+def test_symmetries():
+    assert len(opening.symmetries(15, 15)) == 8
+    assert len(opening.symmetries(15, 10)) == 4
+    for symmetry in opening.symmetries(15, 15):
+        for move in [(0, 0), (3, 11), (14, 2)]:
+            assert opening.transform(opening.transform(move, symmetry, 15, 15), opening.inverse(symmetry), 15, 15) == move
+
+def test_canonicalize_is_symmetry_invariant():
+    grid = empty_grid(15, 15)
+    grid[7][7], grid[8][7], grid[9][10] = True, False, True
+    key, symmetry = opening.canonicalize(grid)
+    assert key == opening.canonicalize(transformed_grid(grid, symmetry))[0] # canonical position itself
+    for other in opening.symmetries(15, 15):
+        assert opening.canonicalize(transformed_grid(grid, other))[0] == key
+
+    # same stones of the other player are another position
+    grid[9][10] = False
+    assert opening.canonicalize(grid)[0] != key
+
+def test_build_and_lookup_book(tmp_path):
+    won = records.GameRecord(15, 15, records.MODE_SIMULATION, records.RESULT_WON_BY_A, 'a', 'b',
+                             [(7, 7), (8, 8), (7, 8), (6, 6)])
+    lost = records.GameRecord(15, 15, records.MODE_SIMULATION, records.RESULT_WON_BY_B, 'a', 'b',
+                              [(7, 7), (7, 6), (0, 0)])
+    # the second game is a reflection of the first one
+    mirrored = records.GameRecord(15, 15, records.MODE_SIMULATION, records.RESULT_WON_BY_A, 'a', 'b',
+                                  [(7, 7), (6, 8), (7, 8), (8, 6)])
+    book = opening.build_book([won, lost, mirrored, mirrored._replace(cols=10, rows=10)], depth=3, min_games=1)
+
+    path = str(tmp_path / 'book.dat')
+    book.save(path)
+    book = opening.load_book(path)
+    assert book.max_stones == 2
+
+    grid = empty_grid(15, 15)
+    assert book.lookup(grid) == (7, 7)
+    grid[7][7] = True
+    # B lost both games after a diagonal neighbor and won after an orthogonal one
+    assert book.lookup(grid) in [(7, 6), (7, 8), (6, 7), (8, 7)]
+    grid[6][8] = False
+    assert book.lookup(grid) in [(7, 8), (7, 6), (6, 7), (8, 7)]
+    grid[7][8] = True
+    assert book.lookup(grid) is None # deeper than the book
+    assert book.lookup(empty_grid(10, 10)) is None
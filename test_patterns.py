@@ -0,0 +1,69 @@
+import random
+
+import patterns
+from patterns import PatternEvaluator, line_score, segment_score
+from test_gomoku import empty_grid
+
+
+def mask(line, stone):
+    return sum(1 << i for i, cell in enumerate(line) if cell == stone)
+
+def score(line):
+    # X: player A, O: player B, _: empty
+    return line_score(len(line), mask(line, 'X'), mask(line, 'O'))
+
+def test_line_patterns():
+    assert score('__XXXXX__') >= patterns.FIVE
+    assert patterns.OPEN_FOUR <= score('__XXXX___') < patterns.FIVE
+    assert patterns.FOUR <= score('_OXXXX___') < patterns.OPEN_FOUR
+    assert patterns.FOUR <= score('__XX_XX__') < patterns.OPEN_FOUR
+    assert patterns.OPEN_THREE <= score('___XXX___') < patterns.FOUR
+    assert patterns.OPEN_THREE <= score('__X_XX___') < patterns.FOUR
+    assert score('OXXX__O') < patterns.OPEN_THREE
+    assert score('_OXXXXO__') == -score('_XOOOOX__')
+
+def test_dead_segments_score_nothing():
+    assert segment_score(4, 0b1111) == 0
+    assert score('OXXXXO') == 0
+
+def test_evaluator_incremental_matches_full():
+    generator = random.Random(7)
+    grid = empty_grid(13, 17)
+    evaluator = PatternEvaluator(grid)
+    is_player_a = True
+    moves = generator.sample([(c, r) for c in range(13) for r in range(17)], 80)
+    for col, row in moves:
+        evaluator.place(col, row, is_player_a)
+        grid[col][row] = is_player_a
+        is_player_a = not is_player_a
+        assert evaluator.score == PatternEvaluator(grid).score
+    for col, row in reversed(moves[40:]):
+        evaluator.remove(col, row, grid[col][row])
+        grid[col][row] = None
+    assert evaluator.score == PatternEvaluator(grid).score
+
+def test_move_delta():
+    grid = empty_grid(15, 15)
+    for col in range(5, 9):
+        grid[col][7] = False
+    evaluator = PatternEvaluator(grid)
+    score = evaluator.score
+    assert evaluator.move_delta(9, 7, False) < -patterns.FIVE / 2
+    assert evaluator.move_delta(9, 7, True) > evaluator.move_delta(0, 0, True)
+    assert evaluator.score == score
+
+
+def test_candidates():
+    grid = empty_grid(10, 10)
+    assert patterns.candidates(grid) == [(5, 5)]
+    grid[0][0] = True
+    grid[1][1] = False
+    assert sorted(patterns.candidates(grid)) == sorted((c, r) for c in range(4) for r in range(4)
+                                                       if (c, r) not in ((0, 0), (1, 1)))
+    board = [value for column in grid for value in column]
+    weights = patterns.near_cells(board, [0, 11], 10, 10)
+    # adjacent to both stones
+    assert weights[1] == 4
+    # adjacent to one stone, two cells away from the other
+    assert weights[2] == 3
+    assert weights[33] == 1
@@ -0,0 +1,64 @@
+import io
+
+import records
+from gomoku import GameEngine, WON_BY_A
+from test_gomoku import empty_grid
+
+
+def play(engine, moves):
+    for move in moves:
+        if move is None:
+            engine.remove()
+        else:
+            engine.play(move)
+    return engine
+
+def test_encode_decode_sizes():
+    for cols, rows, width in [(10, 10, 1), (15, 15, 1), (20, 20, 2), (20, 13, 2)]:
+        record = records.GameRecord(cols, rows, records.MODE_REMOVE, records.RESULT_DRAW, 'Ann', 'Bøb',
+                                    [(0, 0), (cols - 1, rows - 1), None, (3, 4)])
+        data = records.encode_game(record)
+        assert len(data) == 7 + 4 + 5 + 2 + 4 * width # 'ø' takes two bytes
+        assert records.read_game(io.BytesIO(data)) == record
+
+def test_write_and_stream_games(tmp_path):
+    path = str(tmp_path / 'games.dat')
+    engine = play(GameEngine(12, 10), [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2), (0, 3), (1, 3), (0, 4)])
+    assert engine.status() == WON_BY_A
+    records.write_game(engine.record('Ann', 'Bob', records.MODE_ADJUSTABLE), path)
+    records.write_games([records.GameRecord(20, 20, records.MODE_STANDARD, records.RESULT_RUNNING, 'C', 'D', [(19, 19)])] * 3, path)
+
+    games = records.read_games(path)
+    first = next(games)
+    assert (first.cols, first.rows, first.result, first.name_a) == (12, 10, records.RESULT_WON_BY_A, 'Ann')
+    assert records.replay(first) == engine.grid
+    assert len(list(games)) == 3
+
+def test_interrupted_write_ends_stream(tmp_path):
+    path = str(tmp_path / 'games.dat')
+    record = records.GameRecord(15, 15, records.MODE_STANDARD, records.RESULT_RUNNING, 'A', 'B', [(7, 7), (7, 8)])
+    with open(path, 'wb') as f:
+        f.write(records.encode_game(record) + records.encode_game(record)[:-1])
+    assert list(records.read_games(path)) == [record]
+
+def test_replay_with_remove():
+    engine = play(GameEngine(10, 10, allow_remove=True), [None, (1, 1), (2, 2), None, (3, 3), (4, 4), None, None, (5, 5)])
+    record = engine.record('A', 'B', records.MODE_REMOVE)
+    assert record.moves == [(1, 1), (2, 2), None, (3, 3), (4, 4), None, None, (5, 5)]
+    assert records.replay(record) == engine.grid
+    grid = empty_grid(10, 10)
+    grid[1][1] = True
+    grid[3][3] = False
+    assert records.replay(record, move_count=4) == grid
+
+def test_encode_long_game_with_remove():
+    moves = [(0, 0)] + [(1, 1), None] * (records.MAX_MOVES // 2)
+    assert len(moves) == records.MAX_MOVES
+    record = records.GameRecord(15, 15, records.MODE_REMOVE, records.RESULT_DRAW, 'A', 'B', moves)
+    assert records.decode_game(records.encode_game(record))[0] == record
+
+    # one more move no longer fits, the net moves replay to the same grid
+    longer = record._replace(moves=moves + [(2, 2)])
+    decoded = records.decode_game(records.encode_game(longer))[0]
+    assert decoded.moves == [(0, 0), (2, 2)]
+    assert records.replay(decoded) == records.replay(longer)
@@ -0,0 +1,61 @@
+import os
+
+import gomoku
+import scorelog
+from scoredb import ScoreDatabase
+from test_gomoku import mock_ui_fn
+
+
+def test_top_lookup_count(tmp_path):
+    with ScoreDatabase(str(tmp_path / 'scores.db')) as database:
+        for name, wins in [('Ann', 3), ('Bob', 1), ('Cid', 3), ('Dan', 2)]:
+            for _ in range(wins):
+                database.add_result(name)
+        database.add_result('Eve', 0)
+
+        assert database.count() == 4
+        assert database.top(3) == [('Ann', 3), ('Cid', 3), ('Dan', 2)]
+        assert database.top(3, offset=3) == [('Bob', 1)]
+        assert database.lookup('Cid') == (2, 3)
+        assert database.lookup('Bob') == (4, 1)
+        assert database.lookup('Eve') == None
+
+def test_migrate_once(tmp_path):
+    scoreboard_file = str(tmp_path / 'scoreboard.dat')
+    scorelog.save({'Ann': 2, 'Bob': 0}, scoreboard_file)
+    with ScoreDatabase(str(tmp_path / 'scores.db')) as database:
+        database.add_result('Ann')
+        assert database.migrate(scoreboard_file) == True
+        assert database.migrate(scoreboard_file) == False
+        assert database.top(10) == [('Ann', 3)]
+
+def test_migrate_file_appearing_later(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'sub').mkdir()
+    with ScoreDatabase(str(tmp_path / 'scores.db')) as database:
+        assert database.migrate('scoreboard.dat') == False
+        scorelog.save({'Ann': 2}, 'scoreboard.dat')
+        assert database.migrate('scoreboard.dat') == True
+        # the same file from another working directory
+        monkeypatch.chdir(tmp_path / 'sub')
+        assert database.migrate(os.path.join('..', 'scoreboard.dat')) == False
+        assert database.top(10) == [('Ann', 2)]
+
+def test_display_score_database_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gomoku, 'SCOREBOARD_DATABASE', str(tmp_path / 'scores.db'))
+    monkeypatch.setattr(gomoku, 'SCOREBOARD_PAGE_SIZE', 2)
+    for name in ['Ann', 'Ann', 'Ann', 'Bob', 'Bob', 'Cid', 'Dan', 'Dan', 'Dan', 'Dan', 'Eve']:
+        gomoku.record_win(name)
+
+    rankings = []
+    monkeypatch.setattr(gomoku.ui, 'display_ranking', lambda highscore, first_rank: rankings.append((highscore, first_rank)))
+    prompts = mock_ui_fn(monkeypatch, 'prompt', ['', '', ''])
+    gomoku.display_score_database()
+    assert rankings == [([('Dan', 4), ('Ann', 3)], 1), ([('Bob', 2), ('Cid', 1)], 3), ([('Eve', 1)], 5)]
+    assert prompts[-1] == 'Please press ENTER to return to the menu'
+
+    rankings.clear()
+    mock_ui_fn(monkeypatch, 'prompt', ['q'])
+    gomoku.display_score_database()
+    assert len(rankings) == 1
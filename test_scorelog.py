@@ -0,0 +1,98 @@
+import os
+import pickle
+
+import scorelog
+
+
+def test_append_and_load(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    assert scorelog.load(path) == {}
+    scorelog.append_result('Player A', path=path)
+    scorelog.append_result('Player B', path=path)
+    scorelog.append_result('Player A', path=path)
+    assert scorelog.load(path) == {'Player A': 2, 'Player B': 1}
+    assert scorelog.read_log(path)[1] == 3
+
+def test_legacy_pickle_file(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    with open(path, 'wb') as f:
+        pickle.dump({'Player A': 3}, f)
+    scorelog.append_result('Player A', path=path)
+    assert scorelog.load(path) == {'Player A': 4}
+
+def test_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(scorelog, 'COMPACT_AFTER', 5)
+    path = str(tmp_path / 'scoreboard.dat')
+    scorelog.save({'Player A': 1}, path)
+    for _ in range(6):
+        scorelog.append_result('Player B', path=path)
+    size = os.path.getsize(path)
+    assert scorelog.load(path) == {'Player A': 1, 'Player B': 6}
+    assert scorelog.read_log(path) == ({'Player A': 1, 'Player B': 6}, 1, True)
+    assert os.path.getsize(path) < size
+
+def test_interrupted_append(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    scorelog.append_result('Player A', path=path)
+    with open(path, 'ab') as f:
+        f.write(pickle.dumps(('Player B', 1))[:-3])
+    assert scorelog.read_log(path) == ({'Player A': 1}, 1, False)
+    assert scorelog.load(path) == {'Player A': 1}
+    # the damaged end was compacted away, new results are readable again
+    scorelog.append_result('Player B', path=path)
+    assert scorelog.load(path) == {'Player A': 1, 'Player B': 1}
+
+def test_invalid_file(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    with open(path, 'w') as f:
+        f.write('Non-empty file')
+    assert scorelog.load(path) == {}
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+
+def test_appends_to_damaged_file(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    with open(path, 'wb') as f:
+        f.write(b'garbage')
+    scorelog.append_result('Player A', path=path)
+    scorelog.append_result('Player B', path=path)
+    assert scorelog.load(path) == {'Player A': 1, 'Player B': 1}
+
+    # an interrupted first append is replaced when the scoreboard is loaded
+    with open(path, 'wb') as f:
+        f.write(pickle.dumps(('Player A', 1))[:-3])
+    assert scorelog.load(path) == {}
+    scorelog.append_result('Player B', path=path)
+    assert scorelog.load(path) == {'Player B': 1}
+    assert scorelog.read_log(path) == ({'Player B': 1}, 2, True)
+
+def test_service_writes_behind(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    service = scorelog.ScoreboardService(path, flush_interval=60, flush_threshold=3)
+    service.add_result('Player A')
+    service.add_result('Player B')
+    assert service.scores() == {'Player A': 1, 'Player B': 1}
+    assert not os.path.exists(path)
+    service.add_result('Player A') # threshold reached
+    assert scorelog.read_log(path) == ({'Player A': 2, 'Player B': 1}, 3, True)
+    service.add_result('Player C')
+    service.close()
+    assert scorelog.load(path) == {'Player A': 2, 'Player B': 1, 'Player C': 1}
+    assert service.timer == None
+
+def test_service_flushes_on_timer(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    service = scorelog.ScoreboardService(path, flush_interval=0.01)
+    service.add_result('Player A')
+    service.timer.join(1)
+    assert scorelog.load(path) == {'Player A': 1}
+    assert service.pending == []
+
+def test_service_reloads_changed_file(tmp_path):
+    path = str(tmp_path / 'scoreboard.dat')
+    scorelog.save({'Player A': 1}, path)
+    service = scorelog.ScoreboardService(path, flush_threshold=1)
+    service.add_result('Player B')
+    assert service.scores() == {'Player A': 1, 'Player B': 1}
+    scorelog.append_result('Player A', path=path) # another process
+    service.add_result('Player B', 2)
+    assert service.scores() == {'Player A': 2, 'Player B': 3}
@@ -0,0 +1,169 @@
+import asyncio
+
+import scorelog
+import server
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port, name=None):
+        client = cls(*await asyncio.open_connection('127.0.0.1', port))
+        assert await client.receive() == 'HELLO gomoku'
+        if name is not None:
+            assert await client.command(f'NAME {name}') == f'OK {name}'
+        return client
+
+    async def receive(self):
+        return (await asyncio.wait_for(self.reader.readline(), 5)).decode().rstrip('\n')
+
+    async def command(self, line):
+        self.writer.write((line + '\n').encode())
+        return await self.receive()
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def run_with_server(tmp_path, test):
+    async def run():
+        game_server = server.GameServer(str(tmp_path / 'scoreboard.dat'))
+        port = await game_server.start(port=0)
+        try:
+            await test(game_server, port)
+        finally:
+            await game_server.close()
+        return game_server.scoreboard
+    return asyncio.run(run())
+
+async def start_game(port, new='NEW'):
+    ann = await Client.connect(port, 'Ann')
+    bob = await Client.connect(port, 'Bob')
+    reply = await ann.command(new)
+    assert reply.startswith('OK ')
+    game_id = reply.split()[1]
+    assert await bob.command(f'JOIN {game_id}') == f'OK {game_id}'
+    return ann, bob, game_id
+
+def test_game_to_win(tmp_path):
+    async def test(game_server, port):
+        ann, bob, game_id = await start_game(port, 'NEW 10 12')
+        assert await ann.receive() == f'START {game_id} 10 12 X Bob'
+        assert await ann.receive() == 'TURN'
+        assert await bob.receive() == f'START {game_id} 10 12 O Ann'
+
+        for index in range(4):
+            assert await ann.command(f'MOVE 12 {index + 1}') == 'OK'
+            assert await ann.receive() == f'MOVED X 12 {index + 1}'
+            assert await bob.receive() == f'MOVED X 12 {index + 1}'
+            assert await bob.receive() == 'TURN'
+            assert await ann.command('MOVE 1 1') == 'ERROR not your turn'
+            assert await bob.command(f'MOVE 12 {index + 1}') == 'ERROR not an empty cell'
+            assert await bob.command('REMOVE') == 'ERROR the game is played without remove'
+            assert await bob.command(f'MOVE 1 {index + 1}') == 'OK'
+            assert await bob.receive() == f'MOVED O 1 {index + 1}'
+            assert await ann.receive() == f'MOVED O 1 {index + 1}'
+            assert await ann.receive() == 'TURN'
+
+        assert await ann.command('MOVE 12 5') == 'OK'
+        assert await ann.receive() == 'MOVED X 12 5'
+        assert await ann.receive() == 'WON Ann'
+        assert await bob.receive() == 'MOVED X 12 5'
+        assert await bob.receive() == 'WON Ann'
+        assert game_server.games == {}
+        assert await bob.command('SCORES') == 'OK Ann:1'
+        # flushed by the server through its worker thread, not by a timer thread
+        assert game_server.scoreboard.timer is None
+        assert await bob.command('QUIT') == 'OK'
+        await ann.close()
+
+    scoreboard = run_with_server(tmp_path, test)
+    assert scorelog.load(scoreboard.path) == {'Ann': 1}
+
+def test_remove_and_abort(tmp_path):
+    async def test(game_server, port):
+        ann, bob, game_id = await start_game(port, 'NEW 10 10 remove')
+        for _ in range(2):
+            await ann.receive()
+        await bob.receive()
+        assert await ann.command('REMOVE') == 'ERROR no stone to remove'
+        assert await ann.command('MOVE 5 5') == 'OK'
+        for client in (ann, bob):
+            assert await client.receive() == 'MOVED X 5 5'
+        assert await bob.receive() == 'TURN'
+        assert await bob.command('REMOVE') == 'OK'
+        for client in (ann, bob):
+            assert await client.receive() == 'REMOVED 5 5'
+        # the turn passes back to player A
+        assert await ann.receive() == 'TURN'
+
+        await ann.close()
+        assert await bob.receive() == 'ABORTED'
+        assert game_server.games == {}
+        assert await bob.command('NEW') == 'OK 2'
+
+    run_with_server(tmp_path, test)
+
+def test_failed_record_write_is_logged(tmp_path, monkeypatch, caplog):
+    # the game file is a directory, so writing it fails
+    monkeypatch.setattr(server.gomoku, 'GAME_RECORD_FILE', str(tmp_path))
+
+    async def test(game_server, port):
+        ann, bob, game_id = await start_game(port, 'NEW 10 10')
+        for client in (ann, ann, bob):
+            await client.receive()
+        for index in range(5):
+            assert await ann.command(f'MOVE 10 {index + 1}') == 'OK'
+            assert await ann.receive() == f'MOVED X 10 {index + 1}'
+            assert await bob.receive() == f'MOVED X 10 {index + 1}'
+            if index < 4:
+                assert await bob.receive() == 'TURN'
+                assert await bob.command(f'MOVE 1 {index + 1}') == 'OK'
+                for client in (bob, ann):
+                    assert await client.receive() == f'MOVED O 1 {index + 1}'
+                assert await ann.receive() == 'TURN'
+        assert await ann.receive() == 'WON Ann'
+        assert await bob.receive() == 'WON Ann'
+        assert await bob.command('SCORES') == 'OK Ann:1'
+
+    run_with_server(tmp_path, test)
+    assert 'writing game 1 failed' in caplog.text
+
+def test_commands_checked(tmp_path):
+    async def test(game_server, port):
+        client = await Client.connect(port)
+        assert await client.command('NEW') == 'ERROR set a name first'
+        assert await client.command('DANCE') == 'ERROR unknown command DANCE'
+        assert await client.command('NAME Ann') == 'OK Ann'
+        assert await client.command('NEW 9 9') == 'ERROR the grid needs 10 to 20 columns and rows'
+        assert await client.command('JOIN 7') == 'ERROR no such game'
+        assert await client.command('NEW') == 'OK 1'
+        assert await client.command('NEW') == 'ERROR already in a game'
+        assert await client.command('MOVE 1 1') == 'ERROR not in a running game'
+        assert await client.command('LIST') == 'OK 1:15x15:standard'
+
+        other = await Client.connect(port, 'Ann')
+        assert await other.command('JOIN 1') == 'ERROR the players need different names'
+        other.writer.write(b'x' * (server.MAX_LINE * 2) + b'\n')
+        assert await other.receive() == 'ERROR line too long'
+        assert await other.receive() == ''
+
+    run_with_server(tmp_path, test)
+
+def test_many_connections(tmp_path):
+    async def test(game_server, port):
+        clients = [await Client.connect(port, f'player{index}') for index in range(200)]
+        for index in range(0, 200, 2):
+            assert (await clients[index].command('NEW')).startswith('OK')
+        replies = await asyncio.gather(*[clients[index + 1].command(f'JOIN {index // 2 + 1}')
+                                         for index in range(0, 200, 2)])
+        assert all(reply.startswith('OK') for reply in replies)
+        assert len(game_server.players) == 200 and len(game_server.games) == 100
+        for client in clients:
+            await client.close()
+
+    run_with_server(tmp_path, test)
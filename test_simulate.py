@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+import gomoku
+import records
+import simulate
+
+
+def test_simulate_game_random():
+    engine = simulate.simulate_game(10, 12, simulate.random_policy, simulate.random_policy, random.Random(1))
+    moves = engine.state.stone_count
+    assert 9 <= moves <= 120
+    if engine.status() != gomoku.DRAW:
+        assert (engine.status() == gomoku.WON_BY_A) == (moves % 2 == 1) # player A places the odd stones
+
+def test_run_chunk_totals():
+    result = simulate.run_chunk((10, 10, 'random', 'neighbor', 20, 3, None))
+    assert result['games'] == 20
+    assert result['wins_a'] + result['wins_b'] + result['draws'] == 20
+    assert result == simulate.run_chunk((10, 10, 'random', 'neighbor', 20, 3, None)) # same seed, same games
+
+def test_simulate_pool():
+    chunks = []
+    totals = simulate.simulate(25, 10, 10, workers=2, chunk_size=10, on_chunk=lambda totals: chunks.append(totals['games']))
+    assert totals['games'] == 25
+    assert totals['wins_a'] + totals['wins_b'] + totals['draws'] == 25
+    assert sorted(chunks)[-1] == 25 and len(chunks) == 3
+
+def test_main_arguments(capsys):
+    totals = simulate.main(['--games', '4', '--workers', '1', '--size', '10x11', '--policy-b', 'neighbor'])
+    assert totals['games'] == 4
+    assert '4 games' in capsys.readouterr().out
+
+def test_main_rejects_invalid_arguments(capsys):
+    for argv in (['--games', '0'], ['--games', '-1'], ['--size', '9x15'], ['--size', '15x21'], ['--size', '15'],
+                 ['--workers', '0'], ['--workers', '-1']):
+        with pytest.raises(SystemExit):
+            simulate.main(argv)
+    assert capsys.readouterr().out == ''
+
+def test_simulate_records(tmp_path):
+    path = str(tmp_path / 'games.dat')
+    totals = simulate.simulate(12, 15, 15, workers=2, chunk_size=5, record_path=path)
+    games = list(records.read_games(path))
+    assert len(games) == 12
+    assert sum(len(game.moves) for game in games) == totals['moves']
+    assert sum(game.result == records.RESULT_WON_BY_A for game in games) == totals['wins_a']
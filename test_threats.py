@@ -0,0 +1,60 @@
+import ai
+import threats
+from gomoku import is_winning_move
+from test_gomoku import empty_grid
+
+
+def grid_with(stones_a, stones_b, cols=15, rows=15):
+    grid = empty_grid(cols, rows)
+    for col, row in stones_a:
+        grid[col][row] = True
+    for col, row in stones_b:
+        grid[col][row] = False
+    return grid
+
+def vcf_grid():
+    # no four yet, the win takes eight fours in a row
+    return grid_with([(3, 6), (3, 10), (6, 6), (6, 7), (6, 10), (7, 10), (8, 7), (9, 4)],
+                     [(4, 5), (4, 10), (4, 11), (7, 4), (7, 5), (7, 11), (10, 7), (10, 10)])
+
+def assert_forced_win(grid, is_player_a, line):
+    # every move of the player is a four whose only completion is blocked, the last one is five
+    assert len(line) % 2 == 1
+    for index, (col, row) in enumerate(line):
+        assert grid[col][row] is None
+        is_attacker = index % 2 == 0
+        grid[col][row] = is_player_a if is_attacker else not is_player_a
+        assert is_winning_move(grid, (col, row)) == (index == len(line) - 1)
+        if is_attacker and index < len(line) - 1:
+            completions = threats.ThreatSolver(grid).fives(is_player_a)
+            assert line[index + 1] in completions and len(completions) <= 2
+
+def test_immediate_five():
+    grid = grid_with([(3, 0), (3, 1), (3, 2), (3, 3)], [(9, 9), (9, 8), (9, 7), (9, 6)])
+    assert threats.find_forced_win(grid, False) in [[(9, 5)], [(9, 10)]]
+
+def test_continuous_fours():
+    grid = vcf_grid()
+    solver = threats.ThreatSolver(grid)
+    line = solver.solve(True)
+    assert line is not None and len(line) > 7
+    assert_forced_win(grid, True, line)
+    stats = solver.stats()
+    assert stats['complete'] and stats['nodes'] >= 2 and stats['nodes_per_second'] > 0
+
+def test_block_of_other_five_first():
+    # player B has a four, player A must block it and can't start with a four elsewhere
+    grid = grid_with([(3, 3), (4, 3), (5, 3), (6, 3), (0, 14)], [(9, 0), (9, 1), (9, 2), (9, 3), (2, 3), (7, 3)])
+    assert threats.find_forced_win(grid, True) is None
+    grid = grid_with([(3, 3), (4, 3), (5, 3), (10, 4), (10, 5), (10, 6)], [(9, 0), (9, 1), (9, 2), (9, 3), (2, 3)])
+    assert threats.find_forced_win(grid, True) is None
+
+def test_node_limit():
+    grid = vcf_grid()
+    solver = threats.ThreatSolver(grid)
+    assert solver.solve(True, node_limit=5) is None
+    assert not solver.stats()['complete']
+
+def test_choose_move_plays_forced_win():
+    grid = vcf_grid()
+    assert ai.choose_move(grid, True, time_budget=0.01) == threats.find_forced_win(grid, True)[0]
@@ -0,0 +1,73 @@
+import io
+
+import ui
+from test_gomoku import empty_grid
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+def turn(grid, player_name='Ann'):
+    ui.display_turn_start(player_name, True)
+    ui.display_grid(grid)
+
+def test_grid_lines_match_display(capsys):
+    grid = empty_grid(12, 10)
+    grid[0][0], grid[11][9], grid[4][5] = True, False, False
+    ui.display_grid(grid)
+    out = capsys.readouterr().out
+    assert out == '\n'.join(ui.grid_lines(grid)) + '\n'
+    lines = out.split('\n')
+    assert lines[0] == '    1   2   3   4   5   6   7   8   9  10  11  12  '
+    assert lines[1] == '1 |' + '   |' * 11 + ' O |'
+    assert lines[10] == '10| X |' + '   |' * 11
+
+def test_grid_lines_use_cached_template():
+    grid = empty_grid(15, 15)
+    lines = ui.grid_lines(grid)
+    assert (15, 15) in ui._templates
+    grid[7][7] = True
+    changed = ui.grid_lines(grid)
+    assert [index for index in range(len(lines)) if lines[index] != changed[index]] == [8]
+    assert changed[8] == '8 |' + '   |' * 7 + ' X |' + '   |' * 7
+
+def test_differential_rendering(monkeypatch):
+    monkeypatch.setenv('LINES', '50')
+    terminal = Terminal()
+    monkeypatch.setattr('sys.stdout', terminal)
+    monkeypatch.setattr('builtins.input', lambda message: '')
+    ui.set_differential(True)
+    try:
+        grid = empty_grid(20, 20)
+        turn(grid)
+        ui.prompt('Please enter row and column')
+        first = terminal.getvalue()
+        assert first.startswith('\x1b[H\x1b[2J') and 'GOMOKU' in first
+
+        grid[3][4] = True
+        terminal.seek(0)
+        terminal.truncate()
+        turn(grid)
+        ui.prompt('Please enter row and column')
+        update = terminal.getvalue()
+        # grid row 16 from the top below headline, message and column numbers, fourth cell
+        assert update == '\x1b[21;17HX\x1b[27;1H\x1b[J'
+        assert len(update) < 50 < len(first) / 20
+
+        # another player name only rewrites the changed characters of the message
+        terminal.seek(0)
+        terminal.truncate()
+        turn(grid, 'Bob')
+        assert terminal.getvalue() == '\x1b[3;1HBob'
+    finally:
+        ui.set_differential(False)
+
+def test_differential_falls_back_without_terminal(capsys):
+    ui.set_differential(True)
+    try:
+        ui.display_headline('gomoku')
+        ui.display_grid(empty_grid(10, 10))
+        assert '\x1b' not in capsys.readouterr().out
+    finally:
+        ui.set_differential(False)
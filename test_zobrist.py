@@ -0,0 +1,66 @@
+import ai
+import zobrist
+from gomoku import GameState
+from test_gomoku import empty_grid, full_grid
+
+
+def test_grid_key_empty_and_order_independent():
+    grid = empty_grid(15, 15)
+    assert zobrist.grid_key(grid) == 0
+    keys = zobrist.zobrist_keys(15, 15)
+    key = zobrist.stone_key(keys, 3, 4, True) ^ zobrist.stone_key(keys, 7, 7, False)
+    grid[7][7] = False
+    grid[3][4] = True
+    assert zobrist.grid_key(grid) == key
+    assert zobrist.stone_key(keys, 3, 4, True) != zobrist.stone_key(keys, 3, 4, False)
+
+def test_game_state_key_incremental():
+    grid = full_grid(10, 12)
+    grid[2][3] = None
+    grid[5][5] = None
+    state = GameState(grid)
+    key = state.key
+    state.place(2, 3, True)
+    state.place(5, 5, False)
+    assert state.key == zobrist.grid_key(grid)
+    state.remove_last()
+    state.remove_last()
+    assert state.key == key
+
+def test_position_key_incremental():
+    position = ai.Position(full_grid(10, 10))
+    assert position.key == zobrist.grid_key(full_grid(10, 10))
+    key = position.key
+    position.undo()
+    position.undo()
+    assert position.key != key
+    position.place(9, 9, True)
+    position.place(9, 8, False)
+    assert position.key == zobrist.grid_key(position.grid)
+
+def test_transposition_table_depth_preferred():
+    table = zobrist.TranspositionTable(size=4)
+    table.store(1, 3, 10, zobrist.EXACT, (0, 0))
+    table.store(5, 2, 20, zobrist.LOWER, (1, 1))   # same slot, shallower: rejected
+    assert table.probe(1) == (1, 3, 10, zobrist.EXACT, (0, 0))
+    assert table.probe(5) == None
+    table.store(5, 4, 30, zobrist.UPPER, (2, 2))   # same slot, deeper: replaces
+    assert table.probe(5) == (5, 4, 30, zobrist.UPPER, (2, 2))
+    table.store(5, 1, 40, zobrist.EXACT, (3, 3))   # same position: always replaced
+    assert table.probe(5)[1:] == (1, 40, zobrist.EXACT, (3, 3))
+
+    stats = table.stats()
+    assert stats['size'] == 4
+    assert stats['used'] == 1
+    assert (stats['probes'], stats['hits'], stats['stores']) == (4, 3, 3)
+    assert (stats['replacements'], stats['rejections']) == (1, 1)
+    assert table.hit_rate() == 0.75
+
+def test_choose_move_with_table():
+    grid = empty_grid(15, 15)
+    for row in range(4):
+        grid[3][row] = True
+    grid[9][9] = False
+    table = zobrist.TranspositionTable()
+    assert ai.choose_move(grid, is_player_a=False, table=table) == (3, 4)
+    assert table.stats()['stores'] > 0
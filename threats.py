@@ -0,0 +1,252 @@
+import sys
+import time
+
+import patterns
+import records
+import zobrist
+
+DEFAULT_NODE_LIMIT = 100000
+MAX_FOURS = 40
+
+_threats_cache = {}
+_cells_cache = {}
+
+
+class NodeLimitReached(Exception):
+    pass
+
+
+def cells_of_lines(cols, rows):
+    """
+    :return: List of the cells (col_index, row_index) of every line of patterns.grid_lines.
+    """
+    if (cols, rows) not in _cells_cache:
+        lengths, lines_of_cell = patterns.grid_lines(cols, rows)
+        cells = [[None] * length for length in lengths]
+        for col in range(cols):
+            for row in range(rows):
+                for line, position in lines_of_cell[col][row]:
+                    cells[line][position] = (col, row)
+        _cells_cache[(cols, rows)] = cells
+
+    return _cells_cache[(cols, rows)]
+
+
+def line_threats(length, own, other):
+    """
+    Finds the fives and fours a player can make on a line. Results are kept in a lookup table
+    indexed by the encoded line.
+
+    :length: Number of cells of the line.
+    :own: Bit mask of the stones of the player on the line.
+    :other: Bit mask of the stones of the other player on the line.
+    :return: Bi-tuple of the set of positions that complete five and the set of pairs
+        (position, completion) of moves that make a four together with the position
+        that then completes five.
+    """
+    key = (length, own, other)
+    threats = _threats_cache.get(key)
+    if threats is None:
+        if len(_threats_cache) >= patterns.MAX_CACHED_LINES:
+            _threats_cache.clear()
+        fives, fours = set(), set()
+        for shift in range(length - 4):
+            window = 0b11111 << shift
+            if other & window:
+                continue
+            empties = [position for position in range(shift, shift + 5) if not own & (1 << position)]
+            if len(empties) == 1:
+                fives.add(empties[0])
+            elif len(empties) == 2:
+                fours.add((empties[0], empties[1]))
+                fours.add((empties[1], empties[0]))
+        threats = (fives, fours)
+        _threats_cache[key] = threats
+    return threats
+
+
+class ThreatSolver:
+    """
+    Victory by continuous fours (VCF): the player at turn makes a four with every move, so the
+    other player has to block the only cell that completes five, until the player gets two cells
+    to complete five at once. Since every answer is forced, only the fours of the attacker are
+    searched, which finds forced wins much faster than a full search.
+    A line is only accepted if the blocks don't let the other player win first.
+    """
+
+    def __init__(self, grid):
+        """
+        :grid: The grid as two-dimensional array of columns and per-column row values.
+            The grid is copied, the solver does not modify it.
+        """
+        self.cols, self.rows = len(grid), len(grid[0])
+        self.lengths, self.lines_of_cell = patterns.grid_lines(self.cols, self.rows)
+        self.cells_of_line = cells_of_lines(self.cols, self.rows)
+
+        self.stones = {True: [0] * len(self.lengths), False: [0] * len(self.lengths)}
+        self.keys = zobrist.zobrist_keys(self.cols, self.rows)
+        self.key = 0
+        for col in range(self.cols):
+            for row in range(self.rows):
+                if grid[col][row] is not None:
+                    self.place(col, row, grid[col][row])
+
+        self.nodes = 0
+        self.seconds = 0.0
+        self.is_complete = True
+
+    def place(self, col, row, is_player_a):
+        for line, position in self.lines_of_cell[col][row]:
+            self.stones[is_player_a][line] |= 1 << position
+        self.key ^= zobrist.stone_key(self.keys, col, row, is_player_a)
+
+    def remove(self, col, row, is_player_a):
+        for line, position in self.lines_of_cell[col][row]:
+            self.stones[is_player_a][line] &= ~(1 << position)
+        self.key ^= zobrist.stone_key(self.keys, col, row, is_player_a)
+
+    def fives(self, is_player_a, lines=None):
+        """
+        :lines: Indices of the lines to inspect, all lines by default.
+        :return: Set of cells on which the player completes five.
+        """
+        own, other = self.stones[is_player_a], self.stones[not is_player_a]
+        cells = set()
+        for line in range(len(self.lengths)) if lines is None else lines:
+            for position in line_threats(self.lengths[line], own[line], other[line])[0]:
+                cells.add(self.cells_of_line[line][position])
+        return cells
+
+    def fours(self, is_player_a):
+        """
+        :return: List of bi-tuples (move, completion) of the moves that make a four, moves that
+            make several fours first.
+        """
+        own, other = self.stones[is_player_a], self.stones[not is_player_a]
+        moves = {}
+        for line, length in enumerate(self.lengths):
+            if own[line] == 0:
+                continue
+            for position, completion in line_threats(length, own[line], other[line])[1]:
+                move = self.cells_of_line[line][position]
+                moves.setdefault(move, []).append(self.cells_of_line[line][completion])
+        return [(move, completions[0])
+                for move, completions in sorted(moves.items(), key=lambda item: len(item[1]), reverse=True)]
+
+    def __lines(self, col, row):
+        return [line for line, _ in self.lines_of_cell[col][row]]
+
+    def __attack(self, is_player_a, blocks, depth, node_limit, failed):
+        """
+        :blocks: Set of cells on which the other player completes five. The player has no such cell.
+        :return: The winning line or None.
+        """
+        self.nodes += 1
+        if self.nodes > node_limit:
+            raise NodeLimitReached()
+
+        # a five of the other player has to be blocked, which only helps if the block is a four
+        if len(blocks) > 1 or depth >= MAX_FOURS or self.key in failed:
+            return None
+
+        for (col, row), _ in self.fours(is_player_a):
+            if len(blocks) > 0 and (col, row) not in blocks:
+                continue
+
+            self.place(col, row, is_player_a)
+            completions = sorted(self.fives(is_player_a, self.__lines(col, row)))
+            line = None
+            if len(completions) >= 2:
+                # the other player can only block one of them
+                line = [(col, row), completions[0], completions[1]]
+            elif len(completions) == 1:
+                block_col, block_row = completions[0]
+                self.place(block_col, block_row, not is_player_a)
+                # the player had no five before and the only one is blocked now, but the block may give the other player one
+                rest = self.__attack(is_player_a, self.fives(not is_player_a, self.__lines(block_col, block_row)),
+                                     depth + 1, node_limit, failed)
+                self.remove(block_col, block_row, not is_player_a)
+                if rest is not None:
+                    line = [(col, row), (block_col, block_row)] + rest
+            self.remove(col, row, is_player_a)
+            if line is not None:
+                return line
+
+        failed.add(self.key)
+        return None
+
+    def solve(self, is_player_a, node_limit=DEFAULT_NODE_LIMIT):
+        """
+        Searches a forced win by continuous fours for the player at turn.
+
+        :is_player_a: Boolean that is true if player A is at turn.
+        :node_limit: Maximum number of searched positions.
+        :return: List of bi-tuples (col_index, row_index) of the moves of the winning line, the
+            moves of the player alternating with the forced blocks and ending with the five,
+            or None if no forced win was found. is_complete is False if the node limit was reached.
+        """
+        self.nodes = 0
+        self.is_complete = True
+        start = time.perf_counter()
+        try:
+            wins = self.fives(is_player_a)
+            if len(wins) > 0:
+                self.nodes = 1
+                return [min(wins)]
+            return self.__attack(is_player_a, self.fives(not is_player_a), 0, node_limit, set())
+        except NodeLimitReached:
+            self.is_complete = False
+            return None
+        finally:
+            self.seconds = time.perf_counter() - start
+
+    def stats(self):
+        """
+        :return: Dictionary with the number of positions searched by the last solve, its
+            seconds, positions per second and whether the search was complete.
+        """
+        return {
+            'nodes': self.nodes,
+            'seconds': self.seconds,
+            'nodes_per_second': self.nodes / self.seconds if self.seconds > 0 else 0.0,
+            'complete': self.is_complete,
+        }
+
+
+def find_forced_win(grid, is_player_a, node_limit=DEFAULT_NODE_LIMIT):
+    """
+    :grid: The grid as two-dimensional array of columns and per-column row values.
+    :is_player_a: Boolean that is true if player A is at turn.
+    :node_limit: Maximum number of searched positions.
+    :return: The winning line as returned by ThreatSolver.solve or None.
+    """
+    return ThreatSolver(grid).solve(is_player_a, node_limit)
+
+
+def main(argv=None):
+    """
+    Searches a forced win in a recorded game: python threats.py FILE GAME [MOVES]
+    """
+    import archive
+
+    argv = sys.argv[1:] if argv is None else argv
+    with archive.GameArchive(argv[0]) as games:
+        record = games[int(argv[1])]
+        grid = records.replay(record, int(argv[2]) if len(argv) > 2 else None)
+
+    stone_count = sum(record.rows - column.count(None) for column in grid)
+    is_player_a = stone_count % 2 == 0
+    solver = ThreatSolver(grid)
+    line = solver.solve(is_player_a)
+    name = record.name_a if is_player_a else record.name_b
+    if line is None:
+        print(f"no forced win for {name}")
+    else:
+        print(f"forced win for {name}: " + ", ".join(f"{record.rows - row} {col + 1}" for col, row in line))
+    stats = solver.stats()
+    print(f"{stats['nodes']} nodes in {stats['seconds'] * 1000:.1f} ms ({stats['nodes_per_second']:,.0f} nodes/s)"
+          + ("" if stats['complete'] else ", node limit reached"))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,126 @@
+import itertools
+import shutil
+import sys
+
+# Differential rendering: the screen is not cleared, every line is written at its position and
+# only the characters that changed since the last screen are written. Only used on a terminal.
+differential = False
+# Lines on the screen since the last clear, None if unknown
+_screen = None
+# Index of the next line to write
+_line = 0
+
+# Frame templates of display_grid per (cols, rows)
+_templates = {}
+_GLYPHS = {None: ' ', True: 'X', False: 'O'}
+
+
+def set_differential(enabled):
+    """
+    Switches the differential rendering on or off. If STDOUT is not a terminal, the screens
+    are written in full anyway.
+
+    :enabled: Boolean that is true to render differentially.
+    """
+    global differential, _screen, _line
+    differential = enabled
+    _screen = None
+    _line = 0
+
+def __is_differential():
+    return differential and sys.stdout.isatty()
+
+def __write(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+def __diff_lines(lines):
+    """
+    Builds the escape sequences that turn the lines of the screen from the current line on into
+    the given lines, writing only the changed characters, and updates the screen model.
+    If the lines don't fit on the terminal, they are written as text and the screen becomes unknown.
+
+    :lines: List of strings without line breaks.
+    :return: The text to write.
+    """
+    global _screen, _line
+    if _screen is None or _line + len(lines) >= shutil.get_terminal_size().lines:
+        text = '' if _screen is None else f'\x1b[{_line + 1};1H\x1b[J'
+        _screen = None
+        return text + ''.join(line + '\n' for line in lines)
+
+    parts = []
+    for line in lines:
+        old = _screen[_line] if _line < len(_screen) else None
+        if old is None or len(old) != len(line):
+            parts.append(f'\x1b[{_line + 1};1H{line}\x1b[K')
+        else:
+            start = None
+            for index in range(len(line) + 1):
+                is_changed = index < len(line) and line[index] != old[index]
+                if is_changed and start is None:
+                    start = index
+                elif not is_changed and start is not None:
+                    parts.append(f'\x1b[{_line + 1};{start + 1}H{line[start:index]}')
+                    start = None
+
+        if _line < len(_screen):
+            _screen[_line] = line
+        else:
+            _screen.append(line)
+        _line += 1
+    return ''.join(parts)
+
+def __display_lines(lines):
+    """
+    Displays lines, differentially if enabled, in a single write.
+    """
+    if __is_differential():
+        __write(__diff_lines(lines))
+    else:
+        print('\n'.join(lines))
+
 def __clear():
     """
     Clears the screen
     """
-    print('\n' * 15)
+    global _screen, _line
+    if __is_differential():
+        if _screen is None:
+            __write('\x1b[H\x1b[2J')
+            _screen = []
+        # start again at the top, unchanged lines are not written again
+        _line = 0
+    else:
+        print('\n' * 15)
+
+def __frame_template(cols, rows):
+    """
+    Builds the static frame of a grid once per size: column numbers, row numbers and cell
+    borders, with a {} placeholder per cell. The cells are in display order, from the top row
+    to the bottom row and from left to right.
+
+    :return: The template string without the trailing empty line.
+    """
+    size = (cols, rows)
+    if size not in _templates:
+        lines = ['   ' + ''.join([f'{i:2d}  ' for i in range(1, cols + 1)])]
+        for row in range(rows):
+            # Adjust spacing for row numbers
+            lines.append(f'{row + 1:<2d}|' + ' {} |' * cols)
+        _templates[size] = '\n'.join(lines)
+
+    return _templates[size]
+
+def grid_lines(grid):
+    """
+    :grid: The grid as in display_grid.
+    :return: List of the lines of the grid as displayed by display_grid.
+    """
+    # rows of the grid from the top row to the bottom row
+    rows = reversed(list(zip(*grid)))
+    glyphs = map(_GLYPHS.__getitem__, itertools.chain.from_iterable(rows))
+    return __frame_template(len(grid), len(grid[0])).format(*glyphs).split('\n') + ['']
 
 def display_grid(grid):
     """
@@ -13,17 +131,7 @@ def display_grid(grid):
         from left to right and bottom to top. None indicates empty fields, True coins
         of player A and False coins of player B.
     """
-    cols, rows = len(grid), len(grid[0])
-    print('   ', ''.join([f'{i:2d}  ' for i in range(1, cols + 1)]), sep='')
-    for row in range(rows):
-        row_values = [grid[col][rows - row - 1] for col in range(cols)] 
-        row_symbols = ['X' if v else 'O' if v == False else ' ' for v in row_values]
-        # Adjust spacing for row numbers
-        if row < 9: 
-            print(row+1, ' ', '|', ''.join([f' {s} |' for s in row_symbols]), sep='')
-        else: 
-            print(row+1, '|', ''.join([f' {s} |' for s in row_symbols]), sep='')
-    print('')
+    __display_lines(grid_lines(grid))
 
 def display_headline(headline):
     """
@@ -32,7 +140,7 @@ def display_headline(headline):
     :headline: Headline string to display.
     """
     __clear()
-    print(headline.upper(), '\n', sep='')
+    __display_lines([headline.upper(), ''])
 
 def display_menu(items):
     """
@@ -48,7 +156,7 @@ def display_message(message):
 
     :message: The message string to display.
     """
-    print(message, '\n', sep='')
+    __display_lines(message.split('\n') + [''])
 
 def display_scoreboard(scoreboard):
     """
@@ -56,12 +164,32 @@ def display_scoreboard(scoreboard):
 
     :scoreboard: The scoreboard as dictionary of player names and their scores as integers.
     """
-    if len(scoreboard) == 0:
+    # Descendingly sorted list of bi-tuple (name, score)
+    highscore = sorted(scoreboard.items(), key=lambda x:x[1], reverse=True)
+    display_ranking(highscore)
+
+def display_ranking(highscore, first_rank=1):
+    """
+    Displays a page of the scoreboard.
+
+    :highscore: List of bi-tuples (name, score) in descending order of score.
+    :first_rank: Rank of the first player in the list.
+    """
+    if len(highscore) == 0:
         display_message('no scores available')
     else:
-        # Descendingly sorted list of bi-tuple (name, score)
-        highscore = sorted(scoreboard.items(), key=lambda x:x[1], reverse=True)
-        display_message('\n'.join([f'{i + 1}. {name} ({score})' for i, (name, score) in enumerate(highscore)]))
+        display_message('\n'.join([f'{first_rank + i}. {name} ({score})' for i, (name, score) in enumerate(highscore)]))
+
+def display_hints(hints):
+    """
+    Displays suggested moves.
+
+    :hints: List of tri-tuples (row, column, score) in the numbering of display_grid, best move first.
+    """
+    if len(hints) == 0:
+        display_message('no suggestions available')
+    else:
+        display_message('suggested moves: ' + ', '.join([f"'{row} {col}' ({score:+d})" for row, col, score in hints]))
 
 def display_turn_start(player_name, is_player_a):
     """
@@ -81,4 +209,11 @@ def prompt(message):
     :message: Message to show first.
     :return: String read from STDIN without tailing \n linefeed character.
     """
+    global _line
+    if __is_differential() and _screen is not None:
+        # clear what is left below and continue after the line of the input
+        __write(f'\x1b[{_line + 1};1H\x1b[J')
+        del _screen[_line:]
+        _screen.append(None)
+        _line += 1
     return input(f'{message}: ').rstrip('\n')
\ No newline at end of file
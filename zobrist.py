@@ -0,0 +1,134 @@
+import random
+
+# Bound types of stored scores
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+DEFAULT_TABLE_SIZE = 1 << 18
+
+_keys_cache = {}
+
+
+def zobrist_keys(cols, rows, seed=20251204):
+    """
+    Returns random 64-bit keys per cell and player. The key of a position is the XOR of
+    the keys of all its stones, so it can be updated with one XOR per placed or removed stone.
+    The keys are the same for every call with the same board size and seed.
+
+    :cols: Number of columns.
+    :rows: Number of rows.
+    :seed: Seed of the random number generator.
+    :return: Bi-tuple of column-major arrays of the keys of player A and player B.
+    """
+    size = (cols, rows, seed)
+    if size not in _keys_cache:
+        generator = random.Random(seed)
+        keys_a = [[generator.getrandbits(64) for _ in range(rows)] for _ in range(cols)]
+        keys_b = [[generator.getrandbits(64) for _ in range(rows)] for _ in range(cols)]
+        _keys_cache[size] = (keys_a, keys_b)
+
+    return _keys_cache[size]
+
+
+def grid_key(grid):
+    """
+    Computes the key of a grid from scratch.
+
+    :grid: The grid as two-dimensional array of columns and per-column row values.
+    :return: The 64-bit Zobrist key of the position.
+    """
+    keys_a, keys_b = zobrist_keys(len(grid), len(grid[0]))
+    key = 0
+    for col, column in enumerate(grid):
+        for row, value in enumerate(column):
+            if value is True:
+                key ^= keys_a[col][row]
+            elif value is False:
+                key ^= keys_b[col][row]
+    return key
+
+
+def stone_key(keys, col, row, is_player_a):
+    """
+    :keys: Keys as returned by zobrist_keys.
+    :return: The key to XOR into a position key when a stone is placed on or removed from (col, row).
+    """
+    return keys[0][col][row] if is_player_a else keys[1][col][row]
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results by position key. Each key maps to one slot, and a
+    slot holding another position is only replaced by a result searched at least as deep.
+    """
+
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        """
+        :size: Number of slots, rounded up to a power of two.
+        """
+        self.size = 1 << max(0, size - 1).bit_length()
+        self.mask = self.size - 1
+        self.slots = [None] * self.size
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejections = 0
+
+    def probe(self, key):
+        """
+        :key: Zobrist key of the position.
+        :return: Stored entry (key, depth, score, bound, best_move) or None.
+        """
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Stores a search result, preferring deeper results over shallower ones of other positions.
+
+        :key: Zobrist key of the position.
+        :depth: Remaining search depth the score was computed with.
+        :score: Score from the perspective of the player to move.
+        :bound: EXACT, LOWER or UPPER.
+        :best_move: Best move found as bi-tuple (col_index, row_index) or None.
+        """
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is not None and entry[0] != key:
+            if entry[1] > depth:
+                self.rejections += 1
+                return
+            self.replacements += 1
+
+        self.slots[index] = (key, depth, score, bound, best_move)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.probes = self.hits = self.stores = self.replacements = self.rejections = 0
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        """
+        :return: Dictionary of usage statistics to size the table.
+        """
+        used = sum(1 for entry in self.slots if entry is not None)
+        return {
+            'size': self.size,
+            'used': used,
+            'fill_rate': used / self.size,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hit_rate(),
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'rejections': self.rejections,
+        }